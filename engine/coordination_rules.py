@@ -0,0 +1,252 @@
+"""
+Coordination Rules (logic-only)
+
+Declarative coordination checks shared by the TCC and OC/EF engines:
+
+  pairs        (downstream, upstream, pair type); the CTI comes from the pair
+               type (or a per-pair override)
+  time limits  minimum operating time and maximum clearing time per relay
+  min_cti_ms   lowest CTI a study may be graded with (validate_cti)
+
+A RuleSet is compiled once per relay naming into index arrays
+(compile_rules, cached), and evaluate() checks every pair and time limit for
+any number of trip-time results at once (NaN = relay does not trip; a pair
+is evaluated only when both relays trip, as build_coordination_report has
+always done).
+
+Site-specific rule sets are plain JSON (load_rules), so network audits can
+change pairs and CTIs without code edits:
+
+  {"min_cti_ms": 120,
+   "cti": {"feeder-incomer": 0.15, "feeder-hv": 0.3, "incomer-hv": 0.15},
+   "pairs": [["Q1", "Q4", "feeder-incomer"], {"downstream": "Q4", "upstream": "Q5", "cti": 0.2}],
+   "time_limits": [{"relays": ["Q4", "Q5"], "max_time": 1.0, "label": "clearing"}]}
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+# numpy is imported inside compile_rules()/evaluate(), like the engines that use them.
+
+
+@dataclass(frozen=True, slots=True)
+class PairRule:
+    downstream: str
+    upstream: str
+    pair_type: str = ""
+    cti: Optional[float] = None   # s; overrides the pair type's CTI
+
+
+@dataclass(frozen=True, slots=True)
+class TimeLimit:
+    relays: Tuple[str, ...]
+    min_time: Optional[float] = None   # s; relay must not trip faster
+    max_time: Optional[float] = None   # s; relay must clear within
+    label: str = ""
+
+
+@dataclass(frozen=True, slots=True)
+class RuleSet:
+    pairs: Tuple[PairRule, ...]
+    cti: Tuple[Tuple[str, float], ...] = ()   # (pair type, CTI s)
+    time_limits: Tuple[TimeLimit, ...] = ()
+    min_cti_ms: float = 120.0
+    name: str = ""
+
+    def pair_cti(self, rule: PairRule) -> float:
+        if rule.cti is not None:
+            return float(rule.cti)
+        for t, v in self.cti:
+            if t == rule.pair_type:
+                return float(v)
+        raise ValueError(f"No CTI for pair type '{rule.pair_type}' ({rule.downstream}->{rule.upstream}).")
+
+    def relays(self) -> Tuple[str, ...]:
+        """Relay names the rules refer to, in first-use order."""
+        names = [n for p in self.pairs for n in (p.downstream, p.upstream)]
+        names += [r for t in self.time_limits for r in t.relays]
+        return tuple(dict.fromkeys(names))
+
+    def checks(self) -> list:
+        """[(downstream, upstream, cti)] in rule order."""
+        return [(p.downstream, p.upstream, self.pair_cti(p)) for p in self.pairs]
+
+
+# ---------------- default (TCC tool) rules ----------------
+CTI_TYPES = (("feeder-incomer", 0.150), ("feeder-hv", 0.300), ("incomer-hv", 0.150))
+
+DEFAULT_RULES = RuleSet(
+    pairs=tuple(
+        [PairRule(q, "Q4", "feeder-incomer") for q in ("Q1", "Q2", "Q3")]
+        + [PairRule(q, "Q5", "feeder-hv") for q in ("Q1", "Q2", "Q3")]
+        + [PairRule("Q4", "Q5", "incomer-hv")]
+    ),
+    cti=CTI_TYPES,
+    name="default",
+)
+
+
+def grid_rules(cti_ms: float, feeders: str = "FEEDERS (slowest)") -> RuleSet:
+    """OC/EF grid grading chain (feeders -> incomer -> HV) at the study CTI."""
+    cti_s = cti_ms / 1000.0
+    return RuleSet(
+        pairs=(PairRule(feeders, "INCOMER Q4 (LV)", "grid"), PairRule("INCOMER Q4 (LV)", "HV SIDE Q5 (HV)", "grid")),
+        cti=(("grid", cti_s),),
+        name="grid",
+    )
+
+
+def validate_cti(cti_ms: float, rules: RuleSet = DEFAULT_RULES) -> tuple[bool, str | None]:
+    if cti_ms < rules.min_cti_ms:
+        return False, f"CTI must be greater than or equal to {rules.min_cti_ms:g}ms."
+    return True, None
+
+
+# ---------------- loading ----------------
+def _opt_float(v) -> Optional[float]:
+    return None if v is None else float(v)
+
+
+def rules_from_dict(d: dict) -> RuleSet:
+    pairs = []
+    for p in d.get("pairs", ()):
+        if isinstance(p, dict):
+            pairs.append(PairRule(str(p["downstream"]), str(p["upstream"]), str(p.get("type", "")),
+                                  _opt_float(p.get("cti"))))
+        else:
+            d_, u, t = p
+            pairs.append(PairRule(str(d_), str(u), str(t)) if isinstance(t, str) else PairRule(str(d_), str(u), "", float(t)))
+    limits = [
+        TimeLimit(tuple(str(r) for r in t["relays"]), _opt_float(t.get("min_time")), _opt_float(t.get("max_time")),
+                  str(t.get("label", "")))
+        for t in d.get("time_limits", ())
+    ]
+    rules = RuleSet(
+        pairs=tuple(pairs),
+        cti=tuple((str(k), float(v)) for k, v in d.get("cti", {}).items()),
+        time_limits=tuple(limits),
+        min_cti_ms=float(d.get("min_cti_ms", DEFAULT_RULES.min_cti_ms)),
+        name=str(d.get("name", "")),
+    )
+    rules.checks()   # every pair must resolve to a CTI
+    return rules
+
+
+def load_rules(source) -> RuleSet:
+    """RuleSet from a JSON path, file object or already-parsed dict."""
+    if isinstance(source, RuleSet):
+        return source
+    if isinstance(source, dict):
+        return rules_from_dict(source)
+    if hasattr(source, "read"):
+        return rules_from_dict(json.load(source))
+    with open(source, "r", encoding="utf-8") as f:
+        return rules_from_dict(json.load(f))
+
+
+def rules_to_dict(rules: RuleSet) -> dict:
+    return {
+        "name": rules.name,
+        "min_cti_ms": rules.min_cti_ms,
+        "cti": dict(rules.cti),
+        "pairs": [
+            {"downstream": p.downstream, "upstream": p.upstream, "type": p.pair_type, "cti": p.cti}
+            for p in rules.pairs
+        ],
+        "time_limits": [
+            {"relays": list(t.relays), "min_time": t.min_time, "max_time": t.max_time, "label": t.label}
+            for t in rules.time_limits
+        ],
+    }
+
+
+# ---------------- compiled evaluation ----------------
+@dataclass(frozen=True, slots=True)
+class CompiledRules:
+    names: Tuple[str, ...]
+    d_idx: object        # (n_pairs,) int arrays into names
+    u_idx: object
+    cti: object          # (n_pairs,) s
+    limit_idx: object    # (n_limits,) relay index of each expanded time limit
+    min_time: object     # (n_limits,) s, -inf when unset
+    max_time: object     # (n_limits,) s, +inf when unset
+    limit_labels: Tuple[str, ...]
+    pairs: Tuple[Tuple[str, str], ...]
+
+
+def _limit_label(t: TimeLimit) -> str:
+    if t.min_time is not None and t.max_time is not None:
+        return "time window"
+    return "min time" if t.min_time is not None else "clearing time"
+
+
+@lru_cache(maxsize=64)
+def compile_rules(rules: RuleSet, names: Tuple[str, ...]) -> CompiledRules:
+    """Index arrays for a relay naming (cached); pairs/limits naming unknown relays are skipped."""
+    import numpy as np
+
+    idx = {n: i for i, n in enumerate(names)}
+    pairs = [(p, rules.pair_cti(p)) for p in rules.pairs if p.downstream in idx and p.upstream in idx]
+    limits = [(t, r) for t in rules.time_limits for r in t.relays if r in idx]
+    return CompiledRules(
+        names=tuple(names),
+        d_idx=np.array([idx[p.downstream] for p, _ in pairs], dtype=int),
+        u_idx=np.array([idx[p.upstream] for p, _ in pairs], dtype=int),
+        cti=np.array([c for _, c in pairs], dtype=float),
+        limit_idx=np.array([idx[r] for _, r in limits], dtype=int),
+        min_time=np.array([-math.inf if t.min_time is None else t.min_time for t, _ in limits], dtype=float),
+        max_time=np.array([math.inf if t.max_time is None else t.max_time for t, _ in limits], dtype=float),
+        limit_labels=tuple(t.label or _limit_label(t) for t, _ in limits),
+        pairs=tuple((p.downstream, p.upstream) for p, _ in pairs),
+    )
+
+
+def evaluate(compiled: CompiledRules, trip_times, tol: float = 0.0) -> dict:
+    """
+    trip_times: (..., n_relays) s, NaN where a relay does not trip.
+    tol: slack on the CTI comparison (for margins of rounded setting times).
+
+    Returns arrays over the leading axes:
+      margin      (..., n_pairs) upstream - downstream
+      evaluated   (..., n_pairs) both relays trip
+      pair_ok     (..., n_pairs) evaluated and margin >= CTI
+      limit_time  (..., n_limits) trip time of each time-limited relay
+      limit_ok    (..., n_limits) not tripping, or min_time <= t <= max_time
+                  (a relay with a max_time that does not trip fails)
+      ok          (...) every evaluated pair and every limit holds
+    """
+    import numpy as np
+
+    t = np.asarray(trip_times, dtype=float)
+    margin = t[..., compiled.u_idx] - t[..., compiled.d_idx]
+    evaluated = ~np.isnan(margin)
+    pair_ok = evaluated & (margin >= compiled.cti - tol)
+
+    lt = t[..., compiled.limit_idx]
+    tripped = ~np.isnan(lt)
+    limit_ok = np.where(
+        tripped,
+        (lt >= compiled.min_time) & (lt <= compiled.max_time),
+        ~np.isfinite(compiled.max_time),
+    )
+    ok = (pair_ok | ~evaluated).all(axis=-1) & limit_ok.all(axis=-1)
+    return {
+        "margin": margin,
+        "evaluated": evaluated,
+        "pair_ok": pair_ok,
+        "limit_time": lt,
+        "limit_ok": limit_ok,
+        "ok": ok,
+    }
+
+
+def evaluate_trip_dict(rules: RuleSet, trip_times: dict, names: Sequence[str]) -> Tuple[CompiledRules, dict]:
+    """Single result given as {"Q1": t, ...} (missing = does not trip)."""
+    compiled = compile_rules(rules, tuple(names))
+    t = [trip_times.get(n, math.nan) for n in names]
+    return compiled, evaluate(compiled, t)
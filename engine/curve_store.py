@@ -0,0 +1,221 @@
+"""
+Memory-Mapped Curve Store (logic-only)
+
+On-disk store for network-wide TCC datasets with a fixed layout:
+
+  curves.npy      (n_scenarios, n_relays, n_currents)  merged trip-time curves
+  trip_times.npy  (n_scenarios, n_relays)              trip time at the fault, NaN if none
+  fault_used.npy  (n_scenarios,)                       clamped fault current, NaN if none
+  filled.npy      (n_scenarios,) bool                  scenario has been written
+  labels.npy      (n_scenarios,)                       scenario label (e.g. substation name)
+  currents.npy    (n_currents,)                        shared current axis
+
+Every array is a .npy memory map, so batch runners write scenarios in place
+one at a time and readers slice them zero-copy; resident memory does not
+grow with the number of stored studies. The directory is also a valid
+export bundle (engine.export.load_bundle).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Iterable, Optional
+
+import numpy as np
+
+from engine.export import BUNDLE_FORMAT, BUNDLE_MANIFEST
+
+STORE_KIND = "tcc_curve_store"
+LABEL_LENGTH = 64   # default max label length (characters)
+
+
+class CurveStore:
+    ARRAYS = ("currents", "curves", "trip_times", "fault_used", "filled", "labels")
+
+    def __init__(self, path: str, arrays: dict, meta: dict, writable: bool):
+        self.path = path
+        self.meta = meta
+        self.writable = writable
+        self.currents = arrays["currents"]
+        self.curves = arrays["curves"]
+        self.trip_times = arrays["trip_times"]
+        self.fault_used = arrays["fault_used"]
+        self.filled = arrays["filled"]
+        self.labels = arrays["labels"]
+
+    # ---------------- create / open ----------------
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        n_scenarios: int,
+        n_relays: int = 5,
+        currents=None,
+        dtype: str = "f8",
+        meta: Optional[dict] = None,
+        label_length: int = LABEL_LENGTH,
+    ) -> "CurveStore":
+        """
+        Allocates a new store. Curve files are sparse: unwritten scenarios read
+        as zeros and cost no disk pages; check filled before using a scenario.
+
+        currents: shared current axis; defaults to the compute_tcc_plot axis.
+        dtype: curve dtype; "f4" halves the size when plot precision is enough.
+        label_length: longest scenario label the store accepts.
+        """
+        if currents is None:
+            from engine.tcc_engine import tcc_currents
+
+            currents = tcc_currents()
+        currents = np.asarray(currents, dtype=float)
+        os.makedirs(path, exist_ok=True)
+
+        shapes = {
+            "currents": (currents.shape, "f8"),
+            "curves": ((n_scenarios, n_relays, currents.size), dtype),
+            "trip_times": ((n_scenarios, n_relays), "f8"),
+            "fault_used": ((n_scenarios,), "f8"),
+            "filled": ((n_scenarios,), "?"),
+            "labels": ((n_scenarios,), f"U{int(label_length)}"),
+        }
+        arrays = {}
+        for name, (shape, dt) in shapes.items():
+            arrays[name] = np.lib.format.open_memmap(
+                os.path.join(path, name + ".npy"), mode="w+", dtype=dt, shape=shape
+            )
+        arrays["currents"][:] = currents
+        arrays["trip_times"][:] = np.nan
+        arrays["fault_used"][:] = np.nan
+
+        meta = dict(meta or {}, kind=STORE_KIND)
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "arrays": {name: {"shape": list(a.shape), "dtype": a.dtype.str} for name, a in arrays.items()},
+            "meta": meta,
+        }
+        with open(os.path.join(path, BUNDLE_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+
+        store = cls(path, arrays, meta, writable=True)
+        store.flush()
+        return store
+
+    @classmethod
+    def open(cls, path: str, mode: str = "r") -> "CurveStore":
+        """mode: "r" read-only, "r+" to keep writing scenarios."""
+        if mode not in ("r", "r+"):
+            raise ValueError("CurveStore.open mode must be 'r' or 'r+'.")
+        with open(os.path.join(path, BUNDLE_MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("meta", {}).get("kind") != STORE_KIND:
+            raise ValueError(f"{path} is not a TCC curve store.")
+        arrays = {
+            name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mode, allow_pickle=False)
+            for name in cls.ARRAYS
+        }
+        return cls(path, arrays, manifest["meta"], writable=(mode == "r+"))
+
+    # ---------------- shape ----------------
+    @property
+    def capacity(self) -> int:
+        return self.curves.shape[0]
+
+    @property
+    def n_relays(self) -> int:
+        return self.curves.shape[1]
+
+    @property
+    def label_length(self) -> int:
+        return self.labels.dtype.itemsize // np.dtype("U1").itemsize
+
+    def __len__(self) -> int:
+        """Number of written scenarios."""
+        return int(np.count_nonzero(self.filled))
+
+    def next_free(self) -> int:
+        free = np.flatnonzero(~self.filled)
+        if not free.size:
+            raise IndexError("Curve store is full.")
+        return int(free[0])
+
+    # ---------------- write ----------------
+    def write(self, index: int, curves, trip_times=None, fault_used=None, label: str = ""):
+        """Writes one scenario in place. curves: (n_relays, n_currents)."""
+        if not self.writable:
+            raise PermissionError("Curve store was opened read-only.")
+        curves = np.asarray(curves)
+        if curves.shape != self.curves.shape[1:]:
+            raise ValueError(f"Expected curves of shape {self.curves.shape[1:]}, got {curves.shape}.")
+        if len(label) > self.label_length:
+            raise ValueError(f"Label longer than {self.label_length} characters: {label[:20]}...")
+
+        self.curves[index] = curves
+        self.trip_times[index] = np.nan if trip_times is None else np.asarray(trip_times, dtype=float)
+        self.fault_used[index] = np.nan if fault_used is None else float(fault_used)
+        self.labels[index] = label
+        self.filled[index] = True
+
+    def append(self, curves, trip_times=None, fault_used=None, label: str = "") -> int:
+        index = self.next_free()
+        self.write(index, curves, trip_times, fault_used, label)
+        return index
+
+    def flush(self):
+        for name in self.ARRAYS:
+            arr = getattr(self, name)
+            if isinstance(arr, np.memmap):
+                arr.flush()
+
+    # ---------------- read (zero-copy views) ----------------
+    def scenario(self, index: int) -> np.ndarray:
+        """(n_relays, n_currents) view of one scenario."""
+        return self.curves[index]
+
+    def current_slice(self, lo: float, hi: float) -> slice:
+        """Index range of the current axis covering [lo, hi] A."""
+        return slice(int(np.searchsorted(self.currents, lo, "left")),
+                     int(np.searchsorted(self.currents, hi, "right")))
+
+    def slice(self, scenarios=slice(None), relays=slice(None), currents=slice(None)) -> np.ndarray:
+        """
+        Basic-slice view curves[scenarios, relays, currents]; stays a memory map
+        (no copy) when every index is a slice or an int.
+        """
+        return self.curves[scenarios, relays, currents]
+
+    def find(self, label: str) -> int:
+        hits = np.flatnonzero(self.filled & (self.labels == label))
+        if not hits.size:
+            raise KeyError(label)
+        return int(hits[0])
+
+
+def store_tcc_batch(store: CurveStore, studies: Iterable[dict], flush_every: int = 256) -> int:
+    """
+    Runs compute_tcc_plot for each study and appends it to the store.
+
+    studies: dicts with keys mva, lv, hv, z, fault, relays and optional label.
+    Returns the number of scenarios written.
+    """
+    from engine.tcc_engine import compute_tcc_plot
+
+    written = 0
+    for study in studies:
+        currents, curves, trip_times, _, _, fault_used = compute_tcc_plot(
+            float(study["mva"]),
+            float(study["lv"]),
+            float(study["hv"]),
+            float(study["z"]),
+            float(study["fault"]) if study.get("fault") else None,
+            study["relays"],
+        )
+        if currents.shape != store.currents.shape or not np.array_equal(currents, store.currents):
+            raise ValueError("Store current axis does not match compute_tcc_plot().")
+        tt = [trip_times.get(f"Q{i+1}", np.nan) for i in range(store.n_relays)]
+        store.append(np.vstack(curves), tt, fault_used, study.get("label", ""))
+        written += 1
+        if written % flush_every == 0:
+            store.flush()
+    store.flush()
+    return written
@@ -0,0 +1,283 @@
+"""
+Relay Device Catalogue (logic-only)
+
+Setting ranges and step sizes of the relay models in use, and vectorized
+snapping of computed settings onto them. Pickups are ranged in multiples of
+the CT primary (xIn), TMS and DT times in their own units.
+
+The engines return continuous settings (e.g. round(..., 3) TMS); the snap
+functions put every setting of a study on the device grid in one array pass
+and re-evaluate coordination with the values that will actually be entered
+in the relay.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine.coordination_rules import PairRule, RuleSet, compile_rules, evaluate, grid_rules
+from engine.inverse import quantize
+
+Range = Tuple[float, float, float]  # (lo, hi, step)
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceModel:
+    name: str
+    pickup: Range      # IDMT pickup, xIn
+    tms: Range
+    dt_pickup: Range   # DT pickup, xIn
+    dt_time: Range     # s
+    curves: Tuple[str, ...] = ("Standard Inverse", "Very Inverse", "Extremely Inverse")
+
+
+DEVICES: Dict[str, DeviceModel] = {
+    d.name: d
+    for d in (
+        DeviceModel(
+            name="Generic Numerical",
+            pickup=(0.05, 4.0, 0.01),
+            tms=(0.01, 1.5, 0.005),
+            dt_pickup=(0.05, 40.0, 0.01),
+            dt_time=(0.0, 60.0, 0.01),
+        ),
+        DeviceModel(
+            name="Generic Static",
+            pickup=(0.1, 2.5, 0.05),
+            tms=(0.025, 1.0, 0.025),
+            dt_pickup=(0.5, 30.0, 0.5),
+            dt_time=(0.0, 10.0, 0.05),
+        ),
+        DeviceModel(
+            name="Generic Electromechanical",
+            pickup=(0.5, 2.0, 0.25),
+            tms=(0.05, 1.0, 0.05),
+            dt_pickup=(1.0, 20.0, 1.0),
+            dt_time=(0.0, 3.0, 0.1),
+        ),
+    )
+}
+
+DEFAULT_DEVICE = "Generic Numerical"
+
+
+def get_device(device) -> DeviceModel:
+    if isinstance(device, DeviceModel):
+        return device
+    try:
+        return DEVICES[device]
+    except KeyError:
+        raise ValueError(f"Unknown device model: {device}") from None
+
+
+# ---------------- snapping ----------------
+def snap_pickup(pickup_a, ct, rng: Range) -> np.ndarray:
+    """Primary pickup (A) snapped to the nearest device step (ranged in xIn of ct)."""
+    ct = np.asarray(ct, dtype=float)
+    lo, hi, step = rng
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xin = np.asarray(pickup_a, dtype=float) / ct
+    return np.where(ct > 0, quantize(xin, lo, hi, step, mode="nearest") * ct, np.nan)
+
+
+def snap_tms(tms, rng: Range) -> np.ndarray:
+    """TMS rounded up onto the device grid (never faster than computed)."""
+    return quantize(tms, *rng, mode="up")
+
+
+def snap_dt_time(t, rng: Range) -> np.ndarray:
+    return quantize(t, *rng, mode="nearest")
+
+
+def _float_or_nan(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def snap_relays(relays: List[dict], cts: Sequence[float], device=DEFAULT_DEVICE) -> List[dict]:
+    """
+    TCC-tool relay dicts with every stage snapped to the device (cts: CT
+    primary per relay, A). Returns new dicts; unset DT values stay as given.
+    """
+    dev = get_device(device)
+    unsupported = sorted({r["curve"] for r in relays if r["idmt_on"]} - set(dev.curves))
+    if unsupported:
+        raise ValueError(f"{dev.name} does not support: {', '.join(unsupported)}")
+
+    ct = np.asarray(cts, dtype=float)
+    col = {k: np.array([_float_or_nan(r[k]) for r in relays]) for k in
+           ("pickup", "tms", "dt1_pickup", "dt1_time", "dt2_pickup", "dt2_time")}
+    snapped = {
+        "pickup": snap_pickup(col["pickup"], ct, dev.pickup),
+        "tms": snap_tms(col["tms"], dev.tms),
+        "dt1_pickup": snap_pickup(col["dt1_pickup"], ct, dev.dt_pickup),
+        "dt1_time": snap_dt_time(col["dt1_time"], dev.dt_time),
+        "dt2_pickup": snap_pickup(col["dt2_pickup"], ct, dev.dt_pickup),
+        "dt2_time": snap_dt_time(col["dt2_time"], dev.dt_time),
+    }
+
+    stage_of = {"pickup": "idmt_on", "tms": "idmt_on", "dt1_pickup": "dt1_on", "dt1_time": "dt1_on",
+                "dt2_pickup": "dt2_on", "dt2_time": "dt2_on"}
+    out = []
+    for i, r in enumerate(relays):
+        r2 = dict(r)
+        for k, v in snapped.items():
+            if r[stage_of[k]] and not np.isnan(v[i]):
+                r2[k] = round(float(v[i]), 6)
+        out.append(r2)
+    return out
+
+
+def snapped_tcc_coordination(
+    MVA: float,
+    LV: float,
+    HV: float,
+    Z: float,
+    fault_current: float,
+    relays: List[dict],
+    cts: Sequence[float],
+    device=DEFAULT_DEVICE,
+):
+    """
+    Snaps the TCC relays and re-runs the coordination check at the fault.
+    Returns (snapped_relays, trip_times, report_text, results_table).
+    """
+    from engine.tcc_engine import build_coordination_report, tcc_relay_bank, transformer_calculations
+
+    if not fault_current:
+        raise ValueError("A fault current is required to check snapped settings.")
+
+    snapped = snap_relays(relays, cts, device)
+    flc_lv, isc_lv, hv_factor = transformer_calculations(MVA, LV, HV, Z)
+    fault = min(float(fault_current), float(isc_lv)) if isc_lv else float(fault_current)
+    _, bank = tcc_relay_bank(snapped, hv_factor)
+    t = bank.trip_times(np.array([fault]))[:, 0]
+    trip_times = {f"Q{i+1}": round(float(v), 3) for i, v in enumerate(t) if not np.isnan(v)}
+    report, results = build_coordination_report(trip_times, flc_lv, isc_lv, fault)
+    return snapped, trip_times, report, results
+
+
+# ---------------- OC/EF grid settings ----------------
+def grid_cts(feeders: List[dict], q4_ct: float, q5_ct: float) -> Dict[str, float]:
+    """Equipment name (as in calculate_grid()["settings"]) -> CT primary."""
+    cts = {f"FEEDER Q{i+1}": float(f["ct"]) for i, f in enumerate(feeders)}
+    cts["INCOMER Q4 (LV)"] = float(q4_ct)
+    cts["HV SIDE Q5 (HV)"] = float(q5_ct)
+    return cts
+
+
+def grid_parallel_cts(feeders: List[dict], transformers: List[dict], coupler_ct: Optional[float] = None) -> Dict[str, float]:
+    """grid_cts() for calculate_grid_parallel(): per-transformer incomer / HV CTs and the coupler."""
+    cts = {f"FEEDER Q{i+1}": float(f["ct"]) for i, f in enumerate(feeders)}
+    for i, t in enumerate(transformers):
+        cts[f"INCOMER T{i+1} (LV)"] = float(t["q4_ct"])
+        cts[f"HV SIDE T{i+1} (HV)"] = float(t["q5_ct"])
+    if coupler_ct:
+        cts["BUS COUPLER"] = float(coupler_ct)
+    return cts
+
+
+def _grid_fault_levels(result: dict, eq: np.ndarray) -> np.ndarray:
+    """Fault current each equipment was graded at (single or parallel result)."""
+    if "if_tx" not in result:
+        return np.where(eq == "HV SIDE Q5 (HV)", float(result["if_hv"]), float(result["if_lv"]))
+    levels = {"BUS COUPLER": result["if_coupler"]}
+    for i, (f_lv, f_hv) in enumerate(zip(result["if_tx"], result["if_hv"])):
+        levels[f"INCOMER T{i+1} (LV)"] = f_lv
+        levels[f"HV SIDE T{i+1} (HV)"] = f_hv
+    return np.array([float(levels.get(e) or result["if_lv"]) for e in eq])
+
+
+def _grid_chain_rules(eq: np.ndarray, cti_ms: float, feeders: str = "FEEDERS (slowest)") -> RuleSet:
+    """
+    Grading pairs of a grid result: slowest feeder -> (coupler ->) each
+    incomer -> its HV relay. For a single transformer this is grid_rules().
+    """
+    base = grid_rules(cti_ms, feeders)
+    names = list(dict.fromkeys(str(e) for e in eq))
+    incomers = [n for n in names if n.startswith("INCOMER")]
+    hv = [n for n in names if n.startswith("HV SIDE")]
+    below = feeders
+    pairs = []
+    if "BUS COUPLER" in names:
+        pairs.append(PairRule(feeders, "BUS COUPLER", "grid"))
+        below = "BUS COUPLER"
+    pairs += [PairRule(below, n, "grid") for n in incomers]
+    pairs += [PairRule(i, h, "grid") for i, h in zip(incomers, hv)]
+    return RuleSet(pairs=tuple(pairs), cti=base.cti, name=base.name)
+
+
+def snap_grid_settings(result: dict, cts: Dict[str, float], cti_ms: float, device=DEFAULT_DEVICE) -> dict:
+    """
+    Snaps calculate_grid() or calculate_grid_parallel() settings to the
+    device and re-evaluates the IDMT stages at the engine's fault levels
+    (if_lv for feeders and Q4, if_hv for Q5; each transformer's share and the
+    coupler current in parallel results) with the same 1.05 multiple floor.
+
+    Returns {"settings": [same tuple layout, snapped values, re-evaluated times],
+             "clamped": [(equipment, fault_type, stage)] outside the device range
+                        (pickup, TMS or DT time),
+             "checks": [(fault_type, downstream, upstream, margin_s, cti_s, ok)]}
+    """
+    dev = get_device(device)
+    rows = result["settings"]
+    n = len(rows)
+    eq = np.array([r[0] for r in rows])
+    ftype = np.array([r[1] for r in rows])
+    idmt = np.array([r[2].endswith("(IDMT)") for r in rows])
+    pickup = np.array([float(r[3]) for r in rows])
+    tms = np.array([np.nan if r[5] is None else float(r[5]) for r in rows])
+    time_s = np.array([float(r[6]) for r in rows])
+    ct = np.array([cts.get(e, np.nan) for e in eq])
+    fault = _grid_fault_levels(result, eq)
+
+    p_snap = np.where(idmt, snap_pickup(pickup, ct, dev.pickup), snap_pickup(pickup, ct, dev.dt_pickup))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        xin = pickup / ct
+    lo = np.where(idmt, dev.pickup[0], dev.dt_pickup[0])
+    hi = np.where(idmt, dev.pickup[1], dev.dt_pickup[1])
+    out_of_range = (
+        (xin < lo) | (xin > hi)
+        | (idmt & ((tms < dev.tms[0]) | (tms > dev.tms[1])))
+        | (~idmt & ((time_s < dev.dt_time[0]) | (time_s > dev.dt_time[1])))
+    )
+    p_snap = np.where(np.isnan(p_snap), pickup, p_snap)
+    tms_snap = np.where(idmt, snap_tms(np.where(idmt, tms, dev.tms[0]), dev.tms), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_idmt = tms_snap * (0.14 / (np.maximum(1.05, fault / p_snap) ** 0.02 - 1.0))
+        ratio = np.where(ct > 0, np.round(p_snap / ct, 2), 0.0)
+    t_snap = np.where(idmt, np.round(t_idmt, 3), snap_dt_time(time_s, dev.dt_time))
+
+    settings = [
+        (str(eq[i]), str(ftype[i]), rows[i][2], round(float(p_snap[i]), 2), float(ratio[i]),
+         round(float(tms_snap[i]), 3) if idmt[i] else None, float(t_snap[i]))
+        for i in range(n)
+    ]
+
+    # Grading chain per fault type: slowest feeder, then each upstream relay (NaN where absent)
+    rules = _grid_chain_rules(eq, cti_ms)
+    relays = rules.relays()
+    compiled = compile_rules(rules, relays)
+    is_feeder = np.char.startswith(eq.astype(str), "FEEDER")
+    masks = [is_feeder] + [eq == name for name in relays[1:]]
+    chain = np.full((2, len(relays)), np.nan)
+    for j, ft in enumerate(("OC", "EF")):
+        sel = idmt & (ftype == ft)
+        for k, mask in enumerate(masks):
+            if (sel & mask).any():
+                chain[j, k] = t_snap[sel & mask].max()
+    ev = evaluate(compiled, chain, tol=1e-9)
+    checks = [
+        (ft, d, u, round(float(ev["margin"][j, p]), 3), float(compiled.cti[p]), bool(ev["pair_ok"][j, p]))
+        for j, ft in enumerate(("OC", "EF"))
+        for p, (d, u) in enumerate(compiled.pairs)
+        if ev["evaluated"][j, p]
+    ]
+
+    clamped = [(str(eq[i]), str(ftype[i]), rows[i][2]) for i in np.flatnonzero(out_of_range)]
+    return {"device": dev.name, "settings": settings, "clamped": clamped, "checks": checks}
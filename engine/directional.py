@@ -0,0 +1,274 @@
+"""
+Directional Ring Coordination (logic-only)
+
+Closed-ring model for directional overcurrent grading. The source feeds bus 0
+of a ring of n buses; section i joins bus i to bus i+1 (mod n) and carries
+two relays, each looking into its section:
+
+  CW i   at bus i,   forward = clockwise (towards bus i+1)
+  CCW i  at bus i+1, forward = counter-clockwise (towards bus i)
+
+A fault at ring position p (ohms clockwise from the source bus) is fed over
+both paths, in inverse proportion to their impedance. Relays between the
+source and the fault on the clockwise path carry the clockwise share, the
+others the counter-clockwise share; each sees it flowing forward or reverse
+depending on its end of the section. Impedances are magnitudes (no angles),
+like the Isc = FLC / Z estimates of the other engines.
+
+Close to the source one path carries too little current for its primary to
+pick up; that end clears sequentially, after the other primary has opened
+and the whole fault current flows over the remaining path.
+
+Every fault position of a study is evaluated in one array pass: currents and
+flow signs are (n_faults, n_relays) and trip times come from the directional
+RelayBank. grade_ring() sets the TMS of each direction's chain in turn, each
+step vectorized over the fault positions of its downstream section.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from engine.models import RelayBank, RelaySettings, merged_trip_time
+
+DIRECTION_CHAINS = ("CW", "CCW")
+DEFAULT_POSITIONS = (0.01, 0.25, 0.5, 0.75, 0.99)   # fault points per section (fraction of its length)
+
+
+def relay_names(n_sections: int) -> List[str]:
+    """Bank order: CW 1..n, then CCW 1..n."""
+    return [f"{c} {i+1}" for c in DIRECTION_CHAINS for i in range(n_sections)]
+
+
+def source_impedance(lv_kv: float, source_isc: float) -> float:
+    """Source impedance (ohm) from the three-phase fault level (A) at the source bus."""
+    if lv_kv <= 0 or source_isc <= 0:
+        raise ValueError("Voltage and source fault current must be positive.")
+    return (lv_kv * 1000.0) / (math.sqrt(3.0) * source_isc)
+
+
+def fault_positions(section_z: Sequence[float], positions: Sequence[float] = DEFAULT_POSITIONS):
+    """
+    Fault points along the ring: (p, section) arrays, p in ohms clockwise
+    from the source bus, section the faulted section index.
+    """
+    z = np.asarray(section_z, dtype=float)
+    if z.ndim != 1 or z.size < 2 or np.any(z <= 0):
+        raise ValueError("A ring needs at least two sections with positive impedance.")
+    frac = np.asarray(positions, dtype=float)
+    if np.any((frac <= 0) | (frac >= 1)):
+        raise ValueError("Fault positions must lie strictly inside their section (0 < x < 1).")
+    start = np.concatenate(([0.0], np.cumsum(z)[:-1]))
+    p = (start[:, None] + frac[None, :] * z[:, None]).ravel()
+    section = np.repeat(np.arange(z.size), frac.size)
+    return p, section
+
+
+def ring_fault_currents(lv_kv: float, source_isc: float, section_z: Sequence[float], p, section) -> dict:
+    """
+    Currents of every relay for every fault point.
+
+    Returns {"fault": (F,) total fault current, "current": (F, 2n) A,
+             "flow": (F, 2n) +1 forward / -1 reverse, "path": (F, 2n) 0 = CW path, 1 = CCW path,
+             "current_open": (F, 2n) A once the other path's primary has opened}
+    """
+    z = np.asarray(section_z, dtype=float)
+    n = z.size
+    z_ring = float(z.sum())
+    p = np.asarray(p, dtype=float)
+    section = np.asarray(section, dtype=int)
+
+    za, zb = p, z_ring - p
+    v_ph = (lv_kv * 1000.0) / math.sqrt(3.0)
+    zs = source_impedance(lv_kv, source_isc)
+    fault = v_ph / (zs + za * zb / z_ring)
+    i_cw = fault * zb / z_ring       # clockwise share
+    i_ccw = fault * za / z_ring
+
+    idx = np.arange(n)[None, :]
+    k = section[:, None]
+    # CW relay i: on the clockwise path for sections up to the faulted one
+    cw_path = idx <= k
+    cw_cur = np.where(cw_path, i_cw[:, None], i_ccw[:, None])
+    cw_flow = np.where(cw_path, 1, -1)
+    # CCW relay i: on the counter-clockwise path from the faulted section on
+    ccw_path = idx >= k
+    ccw_cur = np.where(ccw_path, i_ccw[:, None], i_cw[:, None])
+    ccw_flow = np.where(ccw_path, 1, -1)
+
+    path = np.hstack((np.where(cw_path, 0, 1), np.where(ccw_path, 1, 0)))
+    return {
+        "fault": fault,
+        "current": np.hstack((cw_cur, ccw_cur)),
+        "flow": np.hstack((cw_flow, ccw_flow)),
+        "path": path,
+        "current_open": np.where(path == 0, (v_ph / (zs + za))[:, None], (v_ph / (zs + zb))[:, None]),
+    }
+
+
+def _chain_trip_times(bank: RelayBank, current, flow) -> np.ndarray:
+    """(F, R) trip times of the bank's relays for per-fault currents and flows."""
+    cols = {name: v[:, 0] for name, v in bank.columns().items()}
+    t = merged_trip_time(np.asarray(current, dtype=float) / bank.scale, **cols)
+    return np.where(bank.released(np.asarray(flow).T).T, t, np.nan)
+
+
+def ring_coordination(
+    lv_kv: float,
+    source_isc: float,
+    section_z: Sequence[float],
+    relays: Sequence[dict],
+    cti_ms: float,
+    positions: Sequence[float] = DEFAULT_POSITIONS,
+) -> dict:
+    """
+    Evaluates directional grading at every fault point of the ring.
+
+    relays: 2n relay dicts in relay_names() order (each with a "direction";
+    "forward" for ring relays, "non-directional" is allowed at the source).
+
+    For every fault and path, the primary is the faulted section's relay on
+    that path; margin = fastest other relay carrying the same path current -
+    primary. A relay that sees reverse flow and is not blocked shows up as a
+    negative margin.
+
+    Returns {"names", "p", "section", "fault", "trip_times" (F, 2n) closed ring,
+             "primary" (F, 2), "sequential" (F, 2), "primary_time" (F, 2)
+             (from the instant the path carries the fault), "margin" (F, 2),
+             "backup" (F, 2) index of the fastest other relay, "ok" (F, 2)}
+    """
+    z = np.asarray(section_z, dtype=float)
+    n = z.size
+    if len(relays) != 2 * n:
+        raise ValueError(f"A {n}-section ring needs {2 * n} relays (got {len(relays)}).")
+    bank = RelayBank([RelaySettings.from_dict(r) for r in relays])
+
+    p, section = fault_positions(z, positions)
+    f = ring_fault_currents(lv_kv, source_isc, z, p, section)
+    t_ring = _chain_trip_times(bank, f["current"], f["flow"])
+    t_open = _chain_trip_times(bank, f["current_open"], f["flow"])
+
+    primary = np.stack((section, section + n), axis=1)               # (F, 2): CW k, CCW k
+    rows = np.arange(p.size)[:, None]
+    # A path whose primary does not pick up in the closed ring clears after the other end opened
+    sequential = np.isnan(t_ring[rows, primary]) & ~np.isnan(t_ring[rows, primary[:, ::-1]])
+    t_primary = np.where(sequential, t_open[rows, primary], t_ring[rows, primary])
+
+    margin = np.empty((p.size, 2))
+    backup = np.empty((p.size, 2), dtype=int)
+    for j in range(2):
+        t = np.where(sequential[:, j:j + 1], t_open, t_ring)
+        t_inf = np.where(np.isnan(t), np.inf, t)
+        other = np.where(f["path"] == j, t_inf, np.inf)
+        other[np.arange(p.size), primary[:, j]] = np.inf
+        backup[:, j] = other.argmin(axis=1)
+        with np.errstate(invalid="ignore"):
+            margin[:, j] = other.min(axis=1) - t_primary[:, j]
+
+    cti_s = cti_ms / 1000.0
+    ok = ~np.isnan(t_primary) & (margin >= cti_s - 1e-9)
+    return {
+        "names": relay_names(n),
+        "p": p,
+        "section": section,
+        "fault": f["fault"],
+        "trip_times": t_ring,
+        "primary": primary,
+        "sequential": sequential,
+        "primary_time": t_primary,
+        "margin": margin,
+        "backup": backup,
+        "ok": ok,
+    }
+
+
+def grade_ring(
+    lv_kv: float,
+    source_isc: float,
+    section_z: Sequence[float],
+    pickups: Sequence[float],
+    cti_ms: float,
+    curve: str = "Standard Inverse",
+    min_tms: float = 0.025,
+    positions: Sequence[float] = DEFAULT_POSITIONS,
+) -> List[dict]:
+    """
+    Forward-directional IDMT settings for all ring relays.
+
+    Each direction is graded as the radial feeder it becomes for faults on
+    that path: CW n is the last relay of the clockwise chain (next to the
+    source on the return side) and gets min_tms; CW i then needs cti over
+    CW i+1 at every fault point of section i+1, where both carry the same
+    current, with the ring closed and after the far end has opened. CCW is
+    graded the other way round. TMS values are rounded up to
+    3 decimals like calculate_grid().
+
+    pickups: 2n primary pickups (A) in relay_names() order.
+    Returns 2n relay dicts for ring_coordination().
+    """
+    from engine.inverse import curve_constants, solve_tms
+
+    z = np.asarray(section_z, dtype=float)
+    n = z.size
+    pickups = np.asarray(pickups, dtype=float)
+    if pickups.shape != (2 * n,) or np.any(pickups <= 0):
+        raise ValueError(f"Need {2 * n} positive pickups.")
+    p, section = fault_positions(z, positions)
+    f = ring_fault_currents(lv_kv, source_isc, z, p, section)
+    # Closed ring and after the other end opened (sequential clearing)
+    I = np.concatenate((f["current"], f["current_open"]))
+    section = np.concatenate((section, section))
+    cti_s = cti_ms / 1000.0
+    k, alpha = curve_constants(curve)
+
+    def relay(i, tms):
+        return {"idmt_on": True, "pickup": float(pickups[i]), "tms": float(tms), "curve": curve,
+                "direction": "forward"}
+
+    tms = np.full(2 * n, np.nan)
+    # (relay, downstream relay, downstream section) from the far end towards the source
+    order = [(n - 1, None, None)] + [(i, i + 1, i + 1) for i in range(n - 2, -1, -1)]
+    order += [(n, None, None)] + [(n + i, n + i - 1, i - 1) for i in range(1, n)]
+    for r, d, sec in order:
+        if d is None:
+            tms[r] = min_tms
+            continue
+        sel = section == sec
+        with np.errstate(divide="ignore", invalid="ignore"):
+            M = I[sel, d] / pickups[d]
+            t_down = np.where(M > 1.0, tms[d] * k / (M ** alpha - 1.0), np.nan)
+        need = solve_tms(t_down + cti_s, I[sel, r], pickups[r], curve)
+        t_max = float(np.nanmax(need)) if np.any(~np.isnan(need)) else min_tms
+        tms[r] = max(min_tms, math.ceil(t_max * 1000.0 - 1e-9) / 1000.0)
+
+    return [relay(i, tms[i]) for i in range(2 * n)]
+
+
+def ring_report(result: dict, cti_ms: Optional[float] = None) -> str:
+    names = result["names"]
+    lines = ["Directional Ring Coordination", "=" * 29]
+    lines.append(f"Fault points: {result['p'].size}  Sections: {len(names) // 2}")
+    lines.append("")
+    bad = np.flatnonzero(~result["ok"].all(axis=1))
+    for f in bad:
+        sec = int(result["section"][f]) + 1
+        for j, chain in enumerate(DIRECTION_CHAINS):
+            if result["ok"][f, j]:
+                continue
+            prim = names[result["primary"][f, j]]
+            t_p = result["primary_time"][f, j]
+            if np.isnan(t_p):
+                lines.append(f"Section {sec} @ {result['p'][f]:.3f} ohm: {prim} does not trip - NOT OK")
+                continue
+            m = result["margin"][f, j]
+            seq = " sequential" if result["sequential"][f, j] else ""
+            lines.append(
+                f"Section {sec} @ {result['p'][f]:.3f} ohm ({chain}{seq}): {prim} {t_p:.3f}s, "
+                f"{names[result['backup'][f, j]]} margin {m:.3f}s NOT OK"
+            )
+    if not bad.size:
+        lines.append("All fault points discriminate" + (f" (CTI {cti_ms:.0f} ms)." if cti_ms else "."))
+    return "\n".join(lines)
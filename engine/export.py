@@ -0,0 +1,146 @@
+"""
+Columnar Result Export (logic-only)
+
+Writes TCC curve arrays, trip times and OC/EF setting tables in NumPy's
+binary formats, so downstream analysis reloads them instead of re-running
+the engines or parsing CSV.
+
+  save_npz()     single file (download / archive); loads eagerly.
+  save_bundle()  directory of .npy files + manifest.json; load_bundle()
+                 memory-maps every array, so slicing a network-wide curve
+                 set only touches the pages it reads.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BUNDLE_MANIFEST = "manifest.json"
+BUNDLE_FORMAT = 1
+
+RELAY_SETTINGS_DTYPE = np.dtype([
+    ("relay", "U8"),
+    ("idmt_on", "?"),
+    ("pickup", "f8"),
+    ("tms", "f8"),
+    ("curve", "U20"),
+    ("dt1_on", "?"),
+    ("dt1_pickup", "f8"),
+    ("dt1_time", "f8"),
+    ("dt2_on", "?"),
+    ("dt2_pickup", "f8"),
+    ("dt2_time", "f8"),
+])
+
+GRID_SETTINGS_DTYPE = np.dtype([
+    ("equipment", "U24"),
+    ("fault_type", "U2"),
+    ("stage", "U12"),
+    ("pickup_a", "f8"),
+    ("ratio", "f8"),
+    ("tms", "f8"),      # NaN for DT stages
+    ("time_s", "f8"),
+])
+
+
+def _float(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def relay_settings_table(relays: List[dict]) -> np.ndarray:
+    rows = [
+        (
+            f"Q{i+1}",
+            bool(r["idmt_on"]), _float(r["pickup"]), _float(r["tms"]), r["curve"],
+            bool(r["dt1_on"]), _float(r["dt1_pickup"]), _float(r["dt1_time"]),
+            bool(r["dt2_on"]), _float(r["dt2_pickup"]), _float(r["dt2_time"]),
+        )
+        for i, r in enumerate(relays)
+    ]
+    return np.array(rows, dtype=RELAY_SETTINGS_DTYPE)
+
+
+def tcc_arrays(currents, merged_curves, trip_times: Dict[str, float], relays: Optional[List[dict]] = None,
+               fault_used: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Columnar view of a compute_tcc_plot() result.
+
+    curves: (n_relays, n_currents); trip_times: (n_relays,), NaN where the relay does not trip;
+    fault_used: (1,), NaN when no fault was given.
+    """
+    curves = np.vstack([np.asarray(c, dtype=float) for c in merged_curves])
+    n = curves.shape[0]
+    arrays = {
+        "currents": np.asarray(currents, dtype=float),
+        "curves": curves,
+        "trip_times": np.array([trip_times.get(f"Q{i+1}", np.nan) for i in range(n)], dtype=float),
+        "fault_used": np.array([np.nan if fault_used is None else fault_used], dtype=float),
+    }
+    if relays is not None:
+        arrays["relay_settings"] = relay_settings_table(relays)
+    return arrays
+
+
+def grid_settings_table(result: dict) -> np.ndarray:
+    """Structured array from calculate_grid()["settings"]."""
+    rows = [
+        (eq, ft, stage, _float(p), _float(ratio), np.nan if tms is None else _float(tms), _float(t))
+        for eq, ft, stage, p, ratio, tms, t in result["settings"]
+    ]
+    return np.array(rows, dtype=GRID_SETTINGS_DTYPE)
+
+
+def save_npz(target, arrays: Dict[str, np.ndarray], compressed: bool = False):
+    """target: path or binary file object."""
+    (np.savez_compressed if compressed else np.savez)(target, **arrays)
+
+
+def npz_bytes(arrays: Dict[str, np.ndarray], compressed: bool = True) -> bytes:
+    buf = io.BytesIO()
+    save_npz(buf, arrays, compressed=compressed)
+    return buf.getvalue()
+
+
+def load_npz(source) -> Dict[str, np.ndarray]:
+    with np.load(source, allow_pickle=False) as z:
+        return {k: z[k] for k in z.files}
+
+
+def save_bundle(path: str, arrays: Dict[str, np.ndarray], meta: Optional[dict] = None):
+    """Writes one .npy per array into directory path (created if needed)."""
+    os.makedirs(path, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), np.ascontiguousarray(arr), allow_pickle=False)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "arrays": {name: {"shape": list(np.shape(a)), "dtype": np.asarray(a).dtype.str} for name, a in arrays.items()},
+        "meta": meta or {},
+    }
+    with open(os.path.join(path, BUNDLE_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+
+def load_bundle(path: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """Loads a bundle; with mmap=True arrays are read-only memory maps."""
+    with open(os.path.join(path, BUNDLE_MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format: {manifest.get('format')}")
+    mode = "r" if mmap else None
+    return {
+        name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mode, allow_pickle=False)
+        for name in manifest["arrays"]
+    }
+
+
+def bundle_meta(path: str) -> dict:
+    with open(os.path.join(path, BUNDLE_MANIFEST), encoding="utf-8") as f:
+        return json.load(f)["meta"]
@@ -0,0 +1,268 @@
+"""
+Fault Sweep Along Feeders (logic-only)
+
+Coordination is otherwise checked at a single bus fault. Here the fault is
+moved along each feeder cable: at distance x (km) from the LV bus the
+three-phase fault current is
+
+  I(x) = V_ph / |jXs + (r + jx) * x|
+
+with Xs the (reactive) source impedance behind the bus fault level and
+r, x the cable resistance and reactance per km. For a fault on feeder j
+the current flows through that feeder's relay and the incomer / HV relays
+upstream of it; every other relay sees no fault current.
+
+All feeders and fault points are evaluated in one array pass: currents are
+(feeders, points), trip times (feeders, points, relays) from the RelayBank
+columns, and grading margins come from the coordination rules
+(engine.coordination_rules), as in build_coordination_report(). Trip times are
+rounded to ms like the coordination report. The result names, per feeder,
+the worst margin along the cable (pair and location) and the reach of the
+feeder relay (how far out it still trips).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List, Sequence
+
+import numpy as np
+
+from engine.coordination_rules import DEFAULT_RULES, PairRule, RuleSet, compile_rules, evaluate, grid_rules
+from engine.directional import source_impedance
+from engine.models import RelayBank, RelaySettings, merged_trip_time
+
+DEFAULT_POINTS = 50
+CABLE_FIELDS = ("r_ohm_km", "x_ohm_km", "length_km")
+TCC_FEEDERS = ("Q1", "Q2", "Q3")
+TCC_UPSTREAM = ("Q4", "Q5")
+
+
+def cable_arrays(cables: Sequence[dict]):
+    """(r, x, length) arrays from [{"r_ohm_km", "x_ohm_km", "length_km"}, ...]."""
+    a = np.array([[float(c[k]) for k in CABLE_FIELDS] for c in cables], dtype=float).reshape(-1, 3)
+    if not np.isfinite(a).all() or np.any(a < 0) or np.any(a[:, 2] <= 0):
+        raise ValueError("Cable R and X must be non-negative and lengths positive.")
+    return a[:, 0], a[:, 1], a[:, 2]
+
+
+def sweep_currents(lv_kv: float, source_isc: float, cables: Sequence[dict], points: int = DEFAULT_POINTS) -> dict:
+    """
+    Fault currents along every feeder.
+
+    Returns {"x": (F, P) km from the bus, "current": (F, P) A}; point 0 is the
+    bus fault (source_isc), the last point the cable end.
+    """
+    if points < 2:
+        raise ValueError("A sweep needs at least two fault points.")
+    r, x, length = cable_arrays(cables)
+    xs = source_impedance(lv_kv, source_isc)
+    d = length[:, None] * np.linspace(0.0, 1.0, points)[None, :]
+    v_ph = (lv_kv * 1000.0) / math.sqrt(3.0)
+    return {"x": d, "current": v_ph / np.hypot(r[:, None] * d, xs + x[:, None] * d)}
+
+
+def sweep_trip_times(bank: RelayBank, current, carrying) -> np.ndarray:
+    """
+    (F, P, R) trip times: current (F, P) seen by the relays flagged in
+    carrying (F, R) bool, NaN for the others and where no stage operates.
+    """
+    cols = {name: v[:, 0] for name, v in bank.columns().items()}
+    t = merged_trip_time(np.asarray(current, dtype=float)[:, :, None] / bank.scale, **cols)
+    # Python round per element, as the report does: np.round differs on ms ties
+    t_ms = np.array([round(float(v), 3) for v in t.ravel()]).reshape(t.shape)
+    return np.where(np.asarray(carrying, dtype=bool)[:, None, :], t_ms, np.nan)
+
+
+def fault_sweep(
+    lv_kv: float,
+    source_isc: float,
+    cables: Sequence[dict],
+    bank: RelayBank,
+    names: Sequence[str],
+    feeder_relays: Sequence[int],
+    upstream_relays: Sequence[int],
+    rules: RuleSet,
+    points: int = DEFAULT_POINTS,
+) -> dict:
+    """
+    Sweeps a fault along every cable; cables[j] is protected by relay
+    feeder_relays[j], backed up by upstream_relays (incomer, HV side).
+
+    Returns {"names", "feeders", "x", "current", "trip_times" (F, P, R),
+             "pairs", "cti", "margin" / "evaluated" / "pair_ok" (F, P, pairs),
+             "worst" [per feeder dict], "reach_km" (F,), "ok" (F,)}
+    """
+    n_f = len(cables)
+    if len(feeder_relays) != n_f:
+        raise ValueError(f"{n_f} cables need {n_f} feeder relays (got {len(feeder_relays)}).")
+    f = sweep_currents(lv_kv, source_isc, cables, points)
+
+    carrying = np.zeros((n_f, len(names)), dtype=bool)
+    carrying[np.arange(n_f), list(feeder_relays)] = True
+    carrying[:, list(upstream_relays)] = True
+    t = sweep_trip_times(bank, f["current"], carrying)
+
+    compiled = compile_rules(rules, tuple(names))
+    ev = evaluate(compiled, t)
+    slack = np.where(ev["evaluated"], ev["margin"] - compiled.cti, np.inf)          # (F, P, pairs)
+
+    primary = t[np.arange(n_f), :, list(feeder_relays)]                               # (F, P)
+    trips = ~np.isnan(primary)
+    # reach: distance up to which the feeder relay trips without a gap from the bus
+    first_gap = np.where(trips.all(axis=1), points, np.argmin(trips, axis=1))
+    reach = np.where(first_gap > 0, f["x"][np.arange(n_f), np.maximum(first_gap - 1, 0)], 0.0)
+
+    worst = []
+    for j in range(n_f):
+        s = slack[j]
+        name = names[feeder_relays[j]]
+        if not np.isfinite(s).any():
+            worst.append({"feeder": name, "pair": None, "x_km": math.nan, "current": math.nan,
+                          "margin": math.nan, "cti": math.nan, "ok": bool(trips[j].all())})
+            continue
+        p, k = np.unravel_index(np.argmin(s), s.shape)
+        worst.append({
+            "feeder": name,
+            "pair": compiled.pairs[k],
+            "x_km": float(f["x"][j, p]),
+            "current": float(f["current"][j, p]),
+            "margin": float(ev["margin"][j, p, k]),
+            "cti": float(compiled.cti[k]),
+            "ok": bool(s[p, k] >= -1e-9 and trips[j].all()),
+        })
+
+    return {
+        "names": list(names),
+        "feeders": [names[i] for i in feeder_relays],
+        "x": f["x"],
+        "current": f["current"],
+        "trip_times": t,
+        "pairs": compiled.pairs,
+        "cti": compiled.cti,
+        "margin": ev["margin"],
+        "evaluated": ev["evaluated"],
+        "pair_ok": ev["pair_ok"],
+        "worst": worst,
+        "reach_km": reach,
+        "ok": np.array([w["ok"] for w in worst]),
+    }
+
+
+# ---------------- TCC tool (Q1..Q5) ----------------
+def tcc_fault_sweep(
+    MVA: float,
+    LV: float,
+    HV: float,
+    Z: float,
+    relays: list[dict],
+    cables: Sequence[dict],
+    points: int = DEFAULT_POINTS,
+    rules: RuleSet = DEFAULT_RULES,
+) -> dict:
+    """Sweep of the TCC tool's feeders Q1..Q3 (cables in that order) with Q4/Q5 upstream."""
+    from engine.tcc_engine import tcc_relay_bank, transformer_calculations
+
+    if len(cables) > len(TCC_FEEDERS):
+        raise ValueError(f"The TCC tool has {len(TCC_FEEDERS)} feeders (got {len(cables)} cables).")
+
+    _, isc_lv, hv_factor = transformer_calculations(MVA, LV, HV, Z)
+    _, bank = tcc_relay_bank(relays, hv_factor)
+    names = TCC_FEEDERS + TCC_UPSTREAM
+    return fault_sweep(LV, isc_lv, cables, bank, names, list(range(len(cables))), [3, 4], rules, points)
+
+
+# ---------------- OC/EF grid engine ----------------
+GRID_UPSTREAM = ("INCOMER Q4 (LV)", "HV SIDE Q5 (HV)")
+
+
+def grid_oc_relays(result: dict) -> tuple:
+    """
+    OC relays of a calculate_grid() result: (names, [RelaySettings]) with
+    S1 as the IDMT stage (Standard Inverse), S2 as DT1 and S3 as DT2.
+    """
+    stages = {}
+    for eq, ft, stage, pickup, _, tms, time_s in result["settings"]:
+        if ft == "OC":
+            stages.setdefault(eq, {})[stage.split()[0]] = (pickup, tms, time_s)
+    names, settings = [], []
+    for eq, st in stages.items():
+        s1, s2, s3 = st.get("S1"), st.get("S2"), st.get("S3")
+        names.append(eq)
+        settings.append(RelaySettings(
+            idmt_on=s1 is not None, pickup=s1[0] if s1 else 0.0, tms=s1[1] if s1 else 0.0,
+            dt1_on=s2 is not None, dt1_pickup=s2[0] if s2 else 0.0, dt1_time=s2[2] if s2 else 0.0,
+            dt2_on=s3 is not None, dt2_pickup=s3[0] if s3 else 0.0, dt2_time=s3[2] if s3 else 0.0,
+        ))
+    return names, settings
+
+
+def grid_fault_sweep(
+    result: dict,
+    hv_kv: float,
+    lv_kv: float,
+    cti_ms: float,
+    cables: Sequence[dict],
+    points: int = DEFAULT_POINTS,
+) -> dict:
+    """
+    Phase-fault sweep of a calculate_grid() result (cables in feeder order),
+    graded feeder -> incomer -> HV side at cti_ms. Earth faults need the
+    zero-sequence impedances, which the grid inputs do not carry, so only the
+    OC stages are swept.
+    """
+    names, settings = grid_oc_relays(result)
+    feeders = [i for i, n in enumerate(names) if n not in GRID_UPSTREAM]
+    if len(cables) != len(feeders):
+        raise ValueError(f"{len(feeders)} feeders need {len(feeders)} cables (got {len(cables)}).")
+    upstream = [names.index(n) for n in GRID_UPSTREAM]
+    scale = [hv_kv / lv_kv if n == GRID_UPSTREAM[1] else 1.0 for n in names]
+    base = grid_rules(cti_ms)
+    rules = RuleSet(
+        pairs=tuple(PairRule(names[i], GRID_UPSTREAM[0], "grid") for i in feeders)
+        + (PairRule(GRID_UPSTREAM[0], GRID_UPSTREAM[1], "grid"),),
+        cti=base.cti,
+        name="grid sweep",
+    )
+    return fault_sweep(lv_kv, result["isc_lv"], cables, RelayBank(settings, scale=scale), names,
+                       feeders, upstream, rules, points)
+
+
+# ---------------- report ----------------
+def sweep_report(result: dict) -> str:
+    lines = ["Fault Sweep Along Feeders", "=" * 25]
+    for j, w in enumerate(result["worst"]):
+        x = result["x"][j]
+        head = f"{w['feeder']}: {x[-1]:.3f} km, {result['current'][j, 0]:.0f} A at bus -> {result['current'][j, -1]:.0f} A at end"
+        lines.append(head)
+        reach = float(result["reach_km"][j])
+        if reach < x[-1]:
+            lines.append(f"  {w['feeder']} trips only up to {reach:.3f} km - NOT OK")
+        if w["pair"] is None:
+            lines.append("  No grading pair trips along the cable.")
+            continue
+        d, u = w["pair"]
+        status = "OK" if w["margin"] >= w["cti"] - 1e-9 else "NOT OK"
+        lines.append(
+            f"  Worst margin {d}->{u}: {w['margin']:.3f}s (CTI {w['cti']:.3f}s) at {w['x_km']:.3f} km, "
+            f"{w['current']:.0f} A {status}"
+        )
+    return "\n".join(lines)
+
+
+def sweep_table(result: dict) -> List[dict]:
+    """One row per feeder for the page tables."""
+    rows = []
+    for j, w in enumerate(result["worst"]):
+        rows.append({
+            "Feeder": w["feeder"],
+            "Length (km)": round(float(result["x"][j, -1]), 3),
+            "End fault (A)": round(float(result["current"][j, -1]), 1),
+            "Reach (km)": round(float(result["reach_km"][j]), 3),
+            "Worst pair": "-" if w["pair"] is None else "->".join(w["pair"]),
+            "At (km)": None if math.isnan(w["x_km"]) else round(w["x_km"], 3),
+            "Margin (s)": None if math.isnan(w["margin"]) else round(w["margin"], 3),
+            "CTI (s)": None if math.isnan(w["cti"]) else w["cti"],
+            "Status": "OK" if w["ok"] else "NOT OK",
+        })
+    return rows
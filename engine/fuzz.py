@@ -0,0 +1,474 @@
+"""
+Fuzz and Benchmark Harness (logic-only)
+
+Property-based fuzzing of the engine entry points with adversarial inputs:
+zero / negative / NaN / inf / huge values, blank and non-numeric text in
+relay fields, I exactly at (or one ulp above) the IDMT pickup, faults at and
+above Isc, CT = 0, loads on the max(1.05, If/Ip) clamp boundary, CTI below
+the minimum. Each generated case carries tags naming the edges it hit.
+
+Per target function the run records
+
+  rejected     ValueError: input validation doing its job
+  crashes      any other exception, grouped by type and message
+  nan_leaks    NaN / inf (or "nan" in report text) where the output must be finite
+  properties   broken invariants (negative trip times, scalar vs vectorized
+               trip time disagreement, ...)
+  warnings     numpy RuntimeWarnings raised inside the call
+  timing       median / p99 / max per call (us), outliers (> OUTLIER_FACTOR x the
+               median) and the tags whose calls are slowest
+
+NaN is the documented "does not trip" value of trip times and curves and is
+not a leak there.
+
+Usage:
+  python -m engine.fuzz                      # 500 cases per target, text report
+  python -m engine.fuzz --n 2000 --seed 3 --targets iec_curve,compute_ocef
+  python -m engine.fuzz --json fuzz.json --strict   # exit 1 on crashes / leaks / properties
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import statistics
+import sys
+import time
+import warnings
+from typing import Dict, List, Optional, Sequence
+
+from engine.grid_engine import calculate_grid
+from engine.ocef_engine import FeederInputs, SystemInputs, compute_ocef
+from engine.tcc_engine import IEC_CURVES, build_coordination_report, compute_tcc_plot, iec_curve
+
+CURVES = tuple(IEC_CURVES)
+EDGE_FLOATS = (("zero", 0.0), ("negative", -1.0), ("tiny", 1e-300), ("huge", 1e300),
+               ("nan", math.nan), ("inf", math.inf), ("-inf", -math.inf))
+EDGE_TEXT = (("blank", ""), ("text", "abc"), ("none", None))
+EDGE_PROBABILITY = 0.04      # per field
+OUTLIER_FACTOR = 10.0
+SLOW_TAG_FACTOR = 2.0        # tag median / target median worth reporting
+SLOW_TAG_MIN_CALLS = 5
+SCALAR_VECTOR_RTOL = 1e-12   # math.pow vs np.power rounding
+EXAMPLE_CHARS = 240
+
+
+# ---------------- input drawing ----------------
+class _Draw:
+    """Random field values; adversarial ones are recorded as tags ("field:edge")."""
+
+    def __init__(self, rng: random.Random, p_edge: float = EDGE_PROBABILITY):
+        self.rng = rng
+        self.p_edge = p_edge
+        self.tags: List[str] = []
+
+    def tag(self, t: str) -> None:
+        self.tags.append(t)
+
+    def num(self, name: str, lo: float, hi: float, text: bool = False):
+        """Log-uniform in [lo, hi], or an edge value."""
+        if self.rng.random() < self.p_edge:
+            label, v = self.rng.choice(EDGE_FLOATS + (EDGE_TEXT if text else ()))
+            self.tag(f"{name}:{label}")
+            return v
+        return math.exp(self.rng.uniform(math.log(lo), math.log(hi)))
+
+    def flag(self, p: float) -> bool:
+        return self.rng.random() < p
+
+    def choice(self, name: str, options: Sequence, edge=None):
+        if edge is not None and self.rng.random() < self.p_edge:
+            self.tag(f"{name}:invalid")
+            return edge
+        return self.rng.choice(options)
+
+
+def _relay(d: _Draw) -> dict:
+    return {
+        "idmt_on": d.flag(0.9),
+        "dt1_on": d.flag(0.6),
+        "dt2_on": d.flag(0.5),
+        "pickup": d.num("pickup", 10.0, 5000.0, text=True),
+        "tms": d.num("tms", 0.01, 1.0, text=True),
+        "dt1_pickup": d.num("dt1_pickup", 50.0, 50000.0, text=True),
+        "dt1_time": d.choice("dt1_time", (0.0, 0.05, 0.15, 0.3), edge=-0.1),
+        "dt2_pickup": d.num("dt2_pickup", 50.0, 100000.0, text=True),
+        "dt2_time": d.choice("dt2_time", (0.0, 0.02), edge=math.nan),
+        "curve": d.choice("curve", CURVES, edge="Unknown"),
+    }
+
+
+def _at_pickup(d: _Draw, ip: float, name: str = "I") -> float:
+    """A current on the pickup boundary now and then, else a spread around it."""
+    mode = d.rng.random()
+    if mode < 0.1:
+        d.tag(f"{name}==Ip")
+        return ip
+    if mode < 0.2:
+        d.tag(f"{name}=Ip+ulp")
+        return math.nextafter(ip, math.inf)
+    if mode < 0.25:
+        d.tag(f"{name}>>Ip")
+        return ip * 1e12
+    return ip * math.exp(d.rng.uniform(math.log(0.5), math.log(200.0)))
+
+
+def _gen_iec_curve(d: _Draw) -> tuple:
+    ip = d.num("Ip", 1.0, 5000.0)
+    I = _at_pickup(d, ip) if isinstance(ip, float) and math.isfinite(ip) and ip > 0 else d.num("I", 1.0, 1e5)
+    return (I, ip, d.num("TMS", 0.01, 1.0), d.choice("curve", CURVES, edge="Unknown"))
+
+
+def _gen_relay_trip(d: _Draw) -> tuple:
+    r = _relay(d)
+    ip = r["pickup"] if isinstance(r["pickup"], float) and math.isfinite(r["pickup"]) and r["pickup"] > 0 else 100.0
+    return (r, _at_pickup(d, ip))
+
+
+def _system(d: _Draw) -> dict:
+    return {
+        "mva": d.num("mva", 0.5, 80.0),
+        "lv": d.num("lv", 0.4, 33.0),
+        "hv": d.num("hv", 11.0, 132.0),
+        "z": d.num("z", 4.0, 18.0),
+    }
+
+
+def _isc(s: dict) -> Optional[float]:
+    try:
+        v = (s["mva"] * 1000.0 / (math.sqrt(3.0) * s["lv"])) / (s["z"] / 100.0)
+    except (ZeroDivisionError, TypeError):
+        return None
+    return v if math.isfinite(v) and v > 0 else None
+
+
+def _gen_tcc_plot(d: _Draw) -> tuple:
+    s = _system(d)
+    isc = _isc(s)
+    mode = d.rng.random()
+    if mode < 0.15:
+        d.tag("fault:none")
+        fault = None
+    elif isc and mode < 0.25:
+        d.tag("fault==Isc")
+        fault = isc
+    elif isc and mode < 0.35:
+        d.tag("fault>Isc")
+        fault = isc * d.rng.uniform(1.01, 100.0)
+    else:
+        fault = d.num("fault", 50.0, 60000.0)
+    return (s["mva"], s["lv"], s["hv"], s["z"], fault, [_relay(d) for _ in range(5)])
+
+
+def _gen_report(d: _Draw) -> tuple:
+    trip = {}
+    for q in ("Q1", "Q2", "Q3", "Q4", "Q5"):
+        if d.flag(0.85):
+            trip[q] = d.num(f"{q}_trip", 0.001, 10.0)
+    if not trip:
+        d.tag("no trips")
+    flc = None if d.flag(0.05) else d.num("flc", 10.0, 5000.0)
+    isc = None if flc is None else d.num("isc", 100.0, 60000.0)
+    fault = None if d.flag(0.2) else d.num("fault", 50.0, 60000.0)
+    return (trip, flc, isc, fault)
+
+
+def _feeders(d: _Draw, if_lv: Optional[float]) -> List[dict]:
+    n = d.rng.choice((0, 1, 2, 3, 5, 8, 20))
+    if n == 0:
+        d.tag("feeders:empty")
+    out = []
+    for _ in range(n):
+        mode = d.rng.random()
+        if if_lv and mode < 0.05:
+            d.tag("load:clamp 1.05")   # If / (1.1 * load) exactly on the max(1.05, ...) boundary
+            load = if_lv / 1.05 / 1.1
+        else:
+            load = d.num("load", 5.0, 600.0)
+        ct = d.choice("ct", (100.0, 200.0, 400.0, 800.0), edge=0.0)
+        out.append({"load": load, "ct": ct})
+    return out
+
+
+def _gen_grid(d: _Draw) -> tuple:
+    s = _system(d)
+    isc = _isc(s)
+    if_lv = round(isc * 0.9, 2) if isc else None
+    cti = d.choice("cti", (120.0, 150.0, 200.0, 300.0), edge=d.rng.choice((0.0, 100.0, -150.0)))
+    q4 = d.num("q4", 200.0, 4000.0)
+    q5 = d.num("q5", 50.0, 800.0)
+    return (s["mva"], s["hv"], s["lv"], s["z"], cti, q4, q5, _feeders(d, if_lv))
+
+
+# ---------------- calls and output checks ----------------
+def _finite(v) -> bool:
+    return isinstance(v, (int, float)) and math.isfinite(v)
+
+
+def _text_leak(text: str) -> bool:
+    return re.search(r"\b(nan|inf)\b", text) is not None
+
+
+def _check_iec(args, t) -> List[str]:
+    I, ip = args[0], args[1]
+    issues = []
+    inputs_finite = all(_finite(a) for a in args[:3])
+    if not isinstance(t, float):
+        issues.append(f"property: {type(t).__name__} trip time")
+    elif math.isnan(t):
+        if inputs_finite and I > ip:
+            issues.append("nan: NaN above pickup")
+    elif not math.isfinite(t):
+        issues.append("nan: infinite trip time")
+    elif t < 0:
+        issues.append("property: negative trip time")
+    return issues
+
+
+def _call_relay_trip(relay: dict, I: float):
+    from engine.models import RelayBank, RelaySettings
+
+    s = RelaySettings.from_dict(relay)
+    return s.trip_time(I), float(RelayBank([s]).trip_times([I])[0, 0])
+
+
+def _check_relay_trip(args, out) -> List[str]:
+    scalar, vector = out
+    issues = []
+    if not (math.isclose(scalar, vector, rel_tol=SCALAR_VECTOR_RTOL) or (math.isnan(scalar) and math.isnan(vector))):
+        issues.append("property: scalar and vectorized trip time differ")
+    if not math.isnan(scalar) and (not math.isfinite(scalar) or scalar < 0):
+        issues.append("property: negative or infinite trip time")
+    return issues
+
+
+def _check_tcc_plot(args, out) -> List[str]:
+    import numpy as np
+
+    _, curves, trip_times, flc, isc, _ = out
+    issues = []
+    if not (_finite(flc) and _finite(isc)):
+        issues.append("nan: FLC/Isc not finite")
+    if any(not _finite(t) for t in trip_times.values()):
+        issues.append("nan: trip time at fault not finite")
+    if any(t < 0 for t in trip_times.values() if _finite(t)):
+        issues.append("property: negative trip time at fault")
+    c = np.asarray(curves, dtype=float)
+    if np.isinf(c).any():
+        issues.append("nan: infinite curve point")
+    if (c < 0).any():
+        issues.append("property: negative curve time")
+    return issues
+
+
+def _check_report(args, out) -> List[str]:
+    text, results = out
+    issues = ["nan: NaN/inf in report text"] if _text_leak(text) else []
+    if any(not _finite(m) for _, _, m, _, _ in results):
+        issues.append("nan: margin not finite")
+    return issues
+
+
+def _check_grid(args, out) -> List[str]:
+    issues = []
+    scalars = [out[k] for k in ("flc_lv", "flc_hv", "isc_lv", "if_lv", "if_hv", "total_load", "hv_load")]
+    if not all(_finite(v) for v in scalars):
+        issues.append("nan: system result not finite")
+    numbers = [v for row in out["settings"] for v in row[3:] if v is not None]
+    if not all(_finite(v) for v in numbers):
+        issues.append("nan: setting not finite")
+    if any(v < 0 for v in numbers if _finite(v)):
+        issues.append("property: negative setting")
+    if _text_leak(out["oc_report"] + out["ef_report"]):
+        issues.append("nan: NaN/inf in report text")
+    return issues
+
+
+def _call_ocef(mva, hv, lv, z, cti, q4, q5, feeders):
+    return compute_ocef(SystemInputs(mva, hv, lv, z, cti, q4, q5), [FeederInputs(f["load"], f["ct"]) for f in feeders])
+
+
+def _check_ocef(args, out) -> List[str]:
+    s = out.system
+    issues = []
+    if not all(_finite(v) for v in (s.flc_lv, s.flc_hv, s.isc_lv, s.if_lv, s.if_hv, s.total_load, s.hv_load)):
+        issues.append("nan: system result not finite")
+    if _text_leak(out.oc_report_text + out.ef_report_text):
+        issues.append("nan: NaN/inf in report text")
+    return issues
+
+
+# name -> (generator, call, output check)
+TARGETS: Dict[str, tuple] = {
+    "iec_curve": (_gen_iec_curve, iec_curve, _check_iec),
+    "RelaySettings.trip_time": (_gen_relay_trip, _call_relay_trip, _check_relay_trip),
+    "compute_tcc_plot": (_gen_tcc_plot, compute_tcc_plot, _check_tcc_plot),
+    "build_coordination_report": (_gen_report, build_coordination_report, _check_report),
+    "calculate_grid": (_gen_grid, calculate_grid, _check_grid),
+    "compute_ocef": (_gen_grid, _call_ocef, _check_ocef),
+}
+
+
+# ---------------- run ----------------
+def _signature(e: Exception) -> str:
+    """Exception grouped by type and message with the numbers blanked."""
+    return f"{type(e).__name__}: " + re.sub(r"-?\d+(\.\d+)?(e[-+]?\d+)?", "#", str(e))
+
+
+def _example(args) -> str:
+    r = repr(args)
+    return r if len(r) <= EXAMPLE_CHARS else r[:EXAMPLE_CHARS] + "..."
+
+
+def _bump(table: dict, key: str, args, tags) -> None:
+    entry = table.setdefault(key, {"count": 0, "example": _example(args), "tags": {}})
+    entry["count"] += 1
+    for t in tags:
+        entry["tags"][t] = entry["tags"].get(t, 0) + 1
+
+
+def _top_tags(entry: dict, k: int = 3) -> str:
+    """Tags most often present in a group's cases."""
+    top = sorted(entry["tags"].items(), key=lambda kv: -kv[1])[:k]
+    return ", ".join(f"{t} x{n}" for t, n in top)
+
+
+def _percentile(sorted_v: Sequence[float], q: float) -> float:
+    return sorted_v[min(len(sorted_v) - 1, int(q * (len(sorted_v) - 1) + 0.5))]
+
+
+def fuzz_target(name: str, n: int = 500, seed: int = 1, p_edge: float = EDGE_PROBABILITY) -> dict:
+    """Runs n generated cases through one target; returns its robustness and timing record."""
+    gen, call, check = TARGETS[name]
+    rng = random.Random(f"{seed}:{name}")
+    rec = {"calls": n, "ok": 0, "rejected": {}, "crashes": {}, "nan_leaks": {}, "properties": {}, "warnings": {}}
+    times: List[float] = []
+    by_tag: Dict[str, List[float]] = {}
+    samples = []
+
+    # warm-up: lazy imports and caches are not part of the per-call timing
+    try:
+        call(*gen(_Draw(random.Random(0), 0.0)))
+    except Exception:
+        pass
+
+    for _ in range(n):
+        d = _Draw(rng, p_edge)
+        args = gen(d)
+        tags = list(dict.fromkeys(d.tags)) or ["nominal"]
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            t0 = time.perf_counter()
+            try:
+                out = call(*args)
+                error = None
+            except Exception as e:
+                out, error = None, e
+            dt = (time.perf_counter() - t0) * 1e6
+        for w in caught:
+            _bump(rec["warnings"], f"{w.category.__name__}: {w.message}", args, tags)
+        times.append(dt)
+        for t in tags:
+            by_tag.setdefault(t, []).append(dt)
+        samples.append((dt, tags, args))
+
+        if error is not None:
+            _bump(rec["rejected"] if isinstance(error, ValueError) else rec["crashes"], _signature(error), args, tags)
+            continue
+        issues = check(args, out)
+        for issue in issues:
+            kind, _, what = issue.partition(": ")
+            _bump(rec["nan_leaks"] if kind == "nan" else rec["properties"], what, args, tags)
+        if not issues:
+            rec["ok"] += 1
+
+    ordered = sorted(times)
+    median = statistics.median(ordered)
+    rec["timing"] = {
+        "median_us": median,
+        "p99_us": _percentile(ordered, 0.99),
+        "max_us": ordered[-1],
+        "total_ms": sum(ordered) / 1000.0,
+    }
+    limit = OUTLIER_FACTOR * median
+    rec["outliers"] = [
+        {"us": dt, "tags": tags, "example": _example(args)}
+        for dt, tags, args in sorted(samples, key=lambda s: -s[0])[:5]
+        if dt > limit
+    ]
+    rec["slow_tags"] = sorted(
+        (
+            {"tag": t, "calls": len(v), "median_us": statistics.median(v)}
+            for t, v in by_tag.items()
+            if len(v) >= SLOW_TAG_MIN_CALLS and statistics.median(v) > SLOW_TAG_FACTOR * median
+        ),
+        key=lambda r: -r["median_us"],
+    )
+    return rec
+
+
+def run(n: int = 500, seed: int = 1, targets: Optional[Sequence[str]] = None,
+        p_edge: float = EDGE_PROBABILITY) -> dict:
+    names = list(targets or TARGETS)
+    unknown = [t for t in names if t not in TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown fuzz target(s): {', '.join(unknown)}")
+    return {"n": n, "seed": seed, "targets": {name: fuzz_target(name, n, seed, p_edge) for name in names}}
+
+
+def failures(report: dict) -> int:
+    """Crashes + NaN leaks + broken properties over all targets."""
+    return sum(
+        e["count"]
+        for rec in report["targets"].values()
+        for key in ("crashes", "nan_leaks", "properties")
+        for e in rec[key].values()
+    )
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Engine fuzz report (seed {report['seed']}, {report['n']} cases per target)", "=" * 60]
+    for name, rec in report["targets"].items():
+        tm = rec["timing"]
+        n_rej = sum(e["count"] for e in rec["rejected"].values())
+        lines.append(
+            f"{name}: {rec['ok']}/{rec['calls']} clean, {n_rej} rejected | "
+            f"median {tm['median_us']:.1f} us, p99 {tm['p99_us']:.1f} us, max {tm['max_us']:.1f} us"
+        )
+        for key, title in (("crashes", "CRASH"), ("nan_leaks", "NaN LEAK"), ("properties", "PROPERTY"),
+                           ("warnings", "WARNING")):
+            for what, e in sorted(rec[key].items(), key=lambda kv: -kv[1]["count"]):
+                lines.append(f"  {title} x{e['count']}: {what}  [{_top_tags(e)}]")
+                lines.append(f"      e.g. {e['example']}")
+        for s in rec["slow_tags"]:
+            lines.append(f"  slow path: {s['tag']} (median {s['median_us']:.1f} us over {s['calls']} calls)")
+        for o in rec["outliers"]:
+            lines.append(f"  outlier: {o['us']:.1f} us [{', '.join(o['tags'])}]")
+        lines.append("")
+    lines.append(f"Failures (crashes + NaN leaks + properties): {failures(report)}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n", type=int, default=500, help="cases per target")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--targets", help=f"comma-separated subset of: {', '.join(TARGETS)}")
+    ap.add_argument("--edge-probability", type=float, default=EDGE_PROBABILITY)
+    ap.add_argument("--json", help="also write the report as JSON")
+    ap.add_argument("--strict", action="store_true", help="exit 1 on crashes, NaN leaks or broken properties")
+    args = ap.parse_args(argv)
+
+    report = run(args.n, args.seed, args.targets.split(",") if args.targets else None, args.edge_probability)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if args.strict and failures(report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
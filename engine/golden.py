@@ -0,0 +1,498 @@
+"""
+Golden Result Corpus (logic-only)
+
+Regression gate for engine rewrites. A corpus of substation inputs (the page
+defaults, optional site cases from JSON and thousands of seeded random cases,
+edge cases included) is run through compute_tcc_plot /
+build_coordination_report, calculate_grid and compute_ocef once, and the
+outputs are stored as arrays in one compressed .npz. `check` reruns the
+current engines on the stored inputs and compares field by field:
+
+  exact        identical (NaN == NaN), for counts and flags
+  rel          |a - b| <= rtol * |b|, for unrounded floats (curves, FLC, Isc)
+  round d      values produced by round(x, d): identical, or one step of
+               10**-d apart ("tie": x sat on a half-step boundary and a
+               reordered float operation moved it across). Ties are reported
+               separately and fail unless --allow-ties is given.
+  text         identical, or identical once every number in the text is
+               compared as a round() value at its printed decimals
+
+Every numeric rule is evaluated for all cases at once; only mismatching
+strings are tokenized. Engine errors (e.g. CTI below the minimum, zero CT)
+are part of the golden output: the same error text must come back.
+
+Usage:
+  python -m engine.golden generate --out golden.npz [--n 2000] [--seed 7] [--cases site_cases.json]
+  python -m engine.golden check --corpus golden.npz [--allow-ties]
+
+tests/data/golden_corpus.npz is a small committed corpus (--n 60 --seed 7);
+its outputs are identical to the pre-optimization engines on every field they
+produce (they had no structured grid settings), and tests/test_golden.py
+gates the current engines on it.
+
+site_cases.json: {"tcc": [{"mva", "lv", "hv", "z", "fault", "relays": [5 relay dicts]}],
+                  "grid": [{"mva", "hv", "lv", "z", "cti", "q4", "q5", "feeders": [{"load", "ct"}]}]}
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine.grid_engine import calculate_grid
+from engine.ocef_engine import FeederInputs, SystemInputs, compute_ocef
+from engine.tcc_engine import IEC_CURVES, build_coordination_report, compute_tcc_plot
+
+CORPUS_VERSION = 1
+N_RELAYS = 5
+RELAY_NUMERIC = ("pickup", "tms", "dt1_pickup", "dt1_time", "dt2_pickup", "dt2_time")
+RELAY_FLAGS = ("idmt_on", "dt1_on", "dt2_on")
+CURVES = tuple(IEC_CURVES)
+CURVE_STRIDE = 8                       # stored curve points: every 8th of the 800 plot currents
+GRID_SCALARS = ("flc_lv", "flc_hv", "isc_lv", "if_lv", "if_hv", "total_load", "hv_load", "critical_overload")
+OCEF_SCALARS = ("flc_lv", "flc_hv", "isc_lv", "if_lv", "if_hv", "total_load", "hv_load", "critical_overload")
+SETTING_COLUMNS = ("pickup_a", "ratio", "tms", "time_s")   # numeric part of a settings row, tms NaN for DT
+MAX_SETTINGS = 4 * 20 + 12             # 20 feeders + Q4/Q5
+
+# field -> rule; per-column rules are tuples over the last axis
+FIELD_RULES = {
+    "tcc_flc": ("rel", 1e-12),
+    "tcc_isc": ("rel", 1e-12),
+    "tcc_fault": ("rel", 1e-12),
+    "tcc_trip": ("round", 3),
+    "tcc_curves": ("rel", 1e-9),
+    "tcc_report": ("text",),
+    "tcc_error": ("text",),
+    "grid_scalars": ("round", (2, 2, 2, 2, 2, 2, 2, None)),
+    "grid_n_settings": ("exact",),
+    "grid_settings": ("round", (2, 2, 3, 3)),
+    "grid_labels": ("text",),
+    "grid_reports": ("text",),
+    "grid_alerts": ("text",),
+    "grid_error": ("text",),
+    "ocef_scalars": ("round", (2, 2, 2, 2, 2, None, None, None)),
+    "ocef_reports": ("text",),
+    "ocef_alerts": ("text",),
+    "ocef_error": ("text",),
+}
+# rel rule for the unrounded columns of a per-column round rule (None entries)
+UNROUNDED_RTOL = 1e-12
+
+# ---------------- reference cases (page defaults) ----------------
+_DEFAULT_RELAYS = [
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 220.0, "tms": 0.025, "dt1_pickup": 600.0, "dt1_time": 0.0, "dt2_pickup": 0.0, "dt2_time": 0.0, "curve": "Standard Inverse"},
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 275.0, "tms": 0.025, "dt1_pickup": 750.0, "dt1_time": 0.0, "dt2_pickup": 0.0, "dt2_time": 0.0, "curve": "Standard Inverse"},
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 330.0, "tms": 0.025, "dt1_pickup": 900.0, "dt1_time": 0.0, "dt2_pickup": 0.0, "dt2_time": 0.0, "curve": "Standard Inverse"},
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 825.0, "tms": 0.07, "dt1_pickup": 2250.0, "dt1_time": 0.15, "dt2_pickup": 8000.0, "dt2_time": 0.0, "curve": "Standard Inverse"},
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 275.0, "tms": 0.12, "dt1_pickup": 750.0, "dt1_time": 0.3, "dt2_pickup": 2666.67, "dt2_time": 0.0, "curve": "Standard Inverse"},
+]
+REFERENCE_CASES = {
+    "tcc": [
+        {"mva": 16.6, "lv": 11.0, "hv": 33.0, "z": 10.0, "fault": None, "relays": _DEFAULT_RELAYS},
+        {"mva": 16.6, "lv": 11.0, "hv": 33.0, "z": 10.0, "fault": 5000.0, "relays": _DEFAULT_RELAYS},
+        {"mva": 16.6, "lv": 11.0, "hv": 33.0, "z": 10.0, "fault": 1e6, "relays": _DEFAULT_RELAYS},
+    ],
+    "grid": [
+        {"mva": 16.6, "hv": 33.0, "lv": 11.0, "z": 10.0, "cti": 150.0, "q4": 900.0, "q5": 300.0,
+         "feeders": [{"load": 200.0, "ct": 400.0}, {"load": 250.0, "ct": 400.0}, {"load": 300.0, "ct": 400.0}]},
+    ],
+}
+
+
+# ---------------- inputs ----------------
+def _tcc_arrays(cases: Sequence[dict]) -> Dict[str, np.ndarray]:
+    n = len(cases)
+    sys_in = np.full((n, 5), np.nan)
+    flags = np.zeros((n, N_RELAYS, len(RELAY_FLAGS)), dtype=bool)
+    num = np.full((n, N_RELAYS, len(RELAY_NUMERIC)), np.nan)
+    curve = np.zeros((n, N_RELAYS), dtype=np.int8)
+    for i, c in enumerate(cases):
+        sys_in[i] = [c["mva"], c["lv"], c["hv"], c["z"], np.nan if c.get("fault") is None else c["fault"]]
+        for j, r in enumerate(c["relays"][:N_RELAYS]):
+            flags[i, j] = [bool(r.get(k, False)) for k in RELAY_FLAGS]
+            num[i, j] = [np.nan if r.get(k) in (None, "") else float(r[k]) for k in RELAY_NUMERIC]
+            curve[i, j] = CURVES.index(r.get("curve", CURVES[0]))
+    return {"tcc_in_sys": sys_in, "tcc_in_flags": flags, "tcc_in_num": num, "tcc_in_curve": curve}
+
+
+def _grid_arrays(cases: Sequence[dict]) -> Dict[str, np.ndarray]:
+    n = len(cases)
+    sys_in = np.full((n, 7), np.nan)
+    feeders = np.full((n, max(len(c["feeders"]) for c in cases), 2), np.nan)
+    for i, c in enumerate(cases):
+        sys_in[i] = [c["mva"], c["hv"], c["lv"], c["z"], c["cti"], c["q4"], c["q5"]]
+        for j, f in enumerate(c["feeders"]):
+            feeders[i, j] = [f["load"], f["ct"]]
+    return {"grid_in_sys": sys_in, "grid_in_feeders": feeders}
+
+
+def random_inputs(n: int, seed: int = 7) -> Dict[str, np.ndarray]:
+    """
+    n seeded random TCC and grid cases. Edge cases are drawn on purpose:
+    stages switched off, blank DT pickups, no fault, faults above Isc,
+    CTI below the minimum, zero CTs, undersized CTs and zero loads.
+    """
+    rng = np.random.default_rng(seed)
+
+    mva = rng.uniform(0.5, 80.0, n)
+    lv = rng.choice([0.4, 3.3, 6.6, 11.0, 22.0, 33.0], n)
+    hv = rng.choice([11.0, 33.0, 66.0, 132.0], n)
+    z = rng.uniform(4.0, 18.0, n)
+    isc = mva * 1000.0 / (math.sqrt(3.0) * lv) / (z / 100.0)
+    kind = rng.random(n)
+    fault = np.where(kind < 0.2, np.nan,
+                     np.where(kind < 0.3, isc * rng.uniform(1.01, 3.0, n), isc * rng.uniform(0.02, 1.0, n)))
+    shape = (n, N_RELAYS)
+    flags = np.stack([rng.random(shape) < p for p in (0.9, 0.7, 0.6)], axis=-1)
+    pickup = rng.uniform(0.05, 1.5, shape) * (isc[:, None] / 10.0)
+    num = np.stack([
+        pickup,
+        rng.uniform(0.01, 1.0, shape),
+        pickup * rng.uniform(1.5, 12.0, shape),
+        rng.choice([0.0, 0.05, 0.1, 0.15, 0.3, 0.5], shape),
+        pickup * rng.uniform(5.0, 30.0, shape),
+        rng.choice([0.0, 0.02, 0.05], shape),
+    ], axis=-1)
+    num[..., 2][rng.random(shape) < 0.05] = np.nan      # blank DT pickups
+    num[..., 4][rng.random(shape) < 0.05] = 0.0
+    out = {
+        "tcc_in_sys": np.stack([mva, lv, hv, z, fault], axis=1),
+        "tcc_in_flags": flags,
+        "tcc_in_num": num,
+        "tcc_in_curve": rng.integers(0, len(CURVES), shape).astype(np.int8),
+    }
+
+    n_feeders = rng.integers(1, 21, n)
+    width = int(n_feeders.max())
+    flc = mva * 1000.0 / (math.sqrt(3.0) * lv)
+    load = rng.uniform(0.01, 0.5, (n, width)) * flc[:, None]
+    load[rng.random((n, width)) < 0.002] = 0.0
+    ct = rng.choice([50.0, 100.0, 200.0, 400.0, 800.0, 1200.0, 2000.0], (n, width))
+    ct[rng.random((n, width)) < 0.003] = 0.0
+    feeders = np.stack([load, ct], axis=-1)
+    feeders[np.arange(width)[None, :] >= n_feeders[:, None]] = np.nan
+    cti = rng.choice([100.0, 120.0, 150.0, 200.0, 300.0], n, p=[0.05, 0.25, 0.4, 0.15, 0.15])
+    out["grid_in_sys"] = np.stack([
+        mva, hv, lv, z, cti,
+        rng.choice([200.0, 400.0, 800.0, 1600.0, 3200.0], n),
+        rng.choice([50.0, 100.0, 200.0, 400.0, 800.0], n),
+    ], axis=1)
+    out["grid_in_feeders"] = feeders
+    return out
+
+
+def _pad_cat(parts: Sequence[np.ndarray], fill) -> np.ndarray:
+    """Concatenates case arrays along axis 0, padding axis 1 to the widest part."""
+    width = max(p.shape[1] for p in parts)
+    padded = []
+    for p in parts:
+        if p.shape[1] < width:
+            pad = np.full((p.shape[0], width - p.shape[1]) + p.shape[2:], fill, dtype=p.dtype)
+            p = np.concatenate([p, pad], axis=1)
+        padded.append(p)
+    return np.concatenate(padded)
+
+
+def build_inputs(n: int, seed: int = 7, cases: Optional[dict] = None) -> Dict[str, np.ndarray]:
+    """Reference cases first, then site cases, then n random cases."""
+    groups = [REFERENCE_CASES] + ([cases] if cases else [])
+    parts = [_tcc_arrays(g["tcc"]) for g in groups if g.get("tcc")]
+    parts += [_grid_arrays(g["grid"]) for g in groups if g.get("grid")]
+    parts.append(random_inputs(n, seed))
+    out = {}
+    for k in parts[-1]:
+        arrays = [p[k] for p in parts if k in p]
+        out[k] = _pad_cat(arrays, np.nan) if k == "grid_in_feeders" else np.concatenate(arrays)
+    return out
+
+
+def tcc_case(inputs: Dict[str, np.ndarray], i: int) -> tuple:
+    """(MVA, LV, HV, Z, fault, relays) of TCC case i, as compute_tcc_plot takes them."""
+    mva, lv, hv, z, fault = inputs["tcc_in_sys"][i].tolist()
+    relays = []
+    for j in range(N_RELAYS):
+        r = {k: bool(v) for k, v in zip(RELAY_FLAGS, inputs["tcc_in_flags"][i, j])}
+        r.update({k: (None if math.isnan(v) else v) for k, v in zip(RELAY_NUMERIC, inputs["tcc_in_num"][i, j].tolist())})
+        r["curve"] = CURVES[int(inputs["tcc_in_curve"][i, j])]
+        relays.append(r)
+    return mva, lv, hv, z, (None if math.isnan(fault) else fault), relays
+
+
+def grid_case(inputs: Dict[str, np.ndarray], i: int) -> tuple:
+    """(mva, hv, lv, z, cti, q4, q5, feeders) of grid case i, as calculate_grid takes them."""
+    f = inputs["grid_in_feeders"][i]
+    feeders = [{"load": l, "ct": c} for l, c in f[~np.isnan(f[:, 0])].tolist()]
+    return (*inputs["grid_in_sys"][i].tolist(), feeders)
+
+
+# ---------------- outputs ----------------
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def run_engines(inputs: Dict[str, np.ndarray], engines: Optional[dict] = None) -> Dict[str, np.ndarray]:
+    """
+    Runs every case through the engines (defaults: the current ones; pass
+    {"tcc": fn, "grid": fn, "ocef": fn} to gate a rewrite) and returns the
+    output arrays stored in / compared against the corpus.
+    """
+    engines = engines or {}
+    tcc = engines.get("tcc", compute_tcc_plot)
+    grid = engines.get("grid", calculate_grid)
+    ocef = engines.get("ocef", compute_ocef)
+
+    n_tcc = inputs["tcc_in_sys"].shape[0]
+    tcc_scalar = np.full((n_tcc, 3), np.nan)
+    trip = np.full((n_tcc, N_RELAYS), np.nan)
+    curves = None
+    reports, tcc_err = [], []
+    for i in range(n_tcc):
+        mva, lv, hv, z, fault, relays = tcc_case(inputs, i)
+        try:
+            currents, merged, trip_times, flc, isc, fault_used = tcc(mva, lv, hv, z, fault, relays)
+            c = np.asarray(merged, dtype=float)[:, ::CURVE_STRIDE]
+            if curves is None:
+                curves = np.full((n_tcc,) + c.shape, np.nan)
+            curves[i] = c
+            tcc_scalar[i] = [flc, isc, np.nan if not fault_used else fault_used]
+            for name, t in trip_times.items():
+                trip[i, int(name[1:]) - 1] = t
+            reports.append(build_coordination_report(trip_times, flc, isc, fault_used)[0])
+            tcc_err.append("")
+        except Exception as e:
+            reports.append("")
+            tcc_err.append(_error(e))
+
+    n_grid = inputs["grid_in_sys"].shape[0]
+    g_scalar = np.full((n_grid, len(GRID_SCALARS)), np.nan)
+    g_settings = np.full((n_grid, MAX_SETTINGS, len(SETTING_COLUMNS)), np.nan)
+    g_n = np.zeros(n_grid, dtype=np.int32)
+    g_labels, g_reports, g_alerts, g_err = [], [], [], []
+    o_scalar = np.full((n_grid, len(OCEF_SCALARS)), np.nan)
+    o_reports, o_alerts, o_err = [], [], []
+    for i in range(n_grid):
+        mva, hv, lv, z, cti, q4, q5, feeders = grid_case(inputs, i)
+        try:
+            r = grid(mva, hv, lv, z, cti, q4, q5, feeders)
+            g_scalar[i] = [float(r[k]) for k in GRID_SCALARS]
+            rows = r["settings"]
+            g_n[i] = len(rows)
+            g_settings[i, :len(rows)] = [[p, ra, np.nan if tms is None else tms, t] for _, _, _, p, ra, tms, t in rows]
+            g_labels.append("|".join(f"{eq},{ft},{st}" for eq, ft, st, *_ in rows))
+            g_reports.append(r["oc_report"] + "\f" + r["ef_report"])
+            g_alerts.append("\n".join(r["alerts"]))
+            g_err.append("")
+        except Exception as e:
+            g_labels.append(""), g_reports.append(""), g_alerts.append(""), g_err.append(_error(e))
+        try:
+            o = ocef(SystemInputs(mva, hv, lv, z, cti, q4, q5), [FeederInputs(f["load"], f["ct"]) for f in feeders])
+            s = o.system
+            o_scalar[i] = [s.flc_lv, s.flc_hv, s.isc_lv, s.if_lv, s.if_hv, s.total_load, s.hv_load, o.critical_overload]
+            o_reports.append(o.oc_report_text + "\f" + o.ef_report_text)
+            o_alerts.append("".join(o.ct_alerts))
+            o_err.append("")
+        except Exception as e:
+            o_reports.append(""), o_alerts.append(""), o_err.append(_error(e))
+
+    return {
+        "tcc_flc": tcc_scalar[:, 0],
+        "tcc_isc": tcc_scalar[:, 1],
+        "tcc_fault": tcc_scalar[:, 2],
+        "tcc_trip": trip,
+        "tcc_curves": curves if curves is not None else np.full((n_tcc, N_RELAYS, 0), np.nan),
+        "tcc_report": np.array(reports),
+        "tcc_error": np.array(tcc_err),
+        "grid_scalars": g_scalar,
+        "grid_n_settings": g_n,
+        "grid_settings": g_settings,
+        "grid_labels": np.array(g_labels),
+        "grid_reports": np.array(g_reports),
+        "grid_alerts": np.array(g_alerts),
+        "grid_error": np.array(g_err),
+        "ocef_scalars": o_scalar,
+        "ocef_reports": np.array(o_reports),
+        "ocef_alerts": np.array(o_alerts),
+        "ocef_error": np.array(o_err),
+    }
+
+
+# ---------------- comparison ----------------
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+
+
+def _case_axes(a: np.ndarray) -> tuple:
+    return tuple(range(1, a.ndim))
+
+
+def compare_numeric(golden: np.ndarray, candidate: np.ndarray, rule: tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (bad, tie) per case for one numeric field under rule.
+    Shapes must match; a shape change fails every case.
+    """
+    g = np.asarray(golden, dtype=float)
+    c = np.asarray(candidate, dtype=float)
+    n = g.shape[0]
+    if g.shape != c.shape:
+        return np.ones(n, dtype=bool), np.zeros(n, dtype=bool)
+    nan_g, nan_c = np.isnan(g), np.isnan(c)
+    equal = (g == c) | (nan_g & nan_c)
+    tie = np.zeros_like(equal)
+    kind = rule[0]
+    with np.errstate(invalid="ignore"):
+        if kind == "rel":
+            equal |= np.abs(g - c) <= rule[1] * np.abs(g)
+        elif kind == "round":
+            dec = np.asarray(rule[1], dtype=object)
+            if dec.ndim == 0:
+                step, rel = np.full(g.shape[-1:], 10.0 ** -float(dec)), np.zeros(g.shape[-1:], dtype=bool)
+            else:
+                rel = np.array([d is None for d in dec])
+                step = np.array([0.0 if d is None else 10.0 ** -d for d in dec])
+            diff = np.abs(g - c)
+            equal |= rel & (diff <= UNROUNDED_RTOL * np.abs(g))
+            # one rounding step, with slack for the binary representation of the step itself
+            tie = ~equal & ~rel & (diff <= step * (1.0 + 1e-6))
+    axes = _case_axes(equal)
+    ok = equal.all(axis=axes) if axes else equal
+    within = (equal | tie).all(axis=axes) if axes else (equal | tie)
+    return ~within, within & ~ok
+
+
+def _decimals(token: str) -> int:
+    if "e" in token.lower() or "." not in token:
+        return 0
+    return len(token.split(".", 1)[1])
+
+
+def compare_text(golden: str, candidate: str) -> str:
+    """'equal', 'tie' (only printed round() values one step apart) or 'bad'."""
+    if golden == candidate:
+        return "equal"
+    if _NUMBER.sub("#", golden) != _NUMBER.sub("#", candidate):
+        return "bad"
+    for a, b in zip(_NUMBER.findall(golden), _NUMBER.findall(candidate)):
+        if a == b:
+            continue
+        d = _decimals(a)
+        if _decimals(b) != d or abs(float(a) - float(b)) > 10.0 ** -d * (1.0 + 1e-6):
+            return "bad"
+    return "tie"
+
+
+def compare_field(name: str, golden: np.ndarray, candidate: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    rule = FIELD_RULES[name]
+    if rule[0] != "text":
+        if rule[0] == "exact":
+            rule = ("round", (0,) * golden.shape[-1]) if golden.ndim > 1 else ("rel", 0.0)
+        return compare_numeric(golden, candidate, rule)
+    n = golden.shape[0]
+    bad = np.zeros(n, dtype=bool)
+    tie = np.zeros(n, dtype=bool)
+    if candidate.shape != golden.shape:
+        bad[:] = True
+        return bad, tie
+    # vectorized equality first; only the differing strings are tokenized
+    for i in np.flatnonzero(golden != candidate):
+        verdict = compare_text(str(golden[i]), str(candidate[i]))
+        bad[i] = verdict == "bad"
+        tie[i] = verdict == "tie"
+    return bad, tie
+
+
+def compare(golden: Dict[str, np.ndarray], candidate: Dict[str, np.ndarray]) -> Dict[str, dict]:
+    """{field: {"bad": case indices, "tie": case indices}} for every rule field."""
+    out = {}
+    for name in FIELD_RULES:
+        bad, tie = compare_field(name, golden[name], candidate[name])
+        out[name] = {"bad": np.flatnonzero(bad), "tie": np.flatnonzero(tie)}
+    return out
+
+
+# ---------------- corpus files ----------------
+def generate(path: str, n: int = 2000, seed: int = 7, cases: Optional[dict] = None) -> dict:
+    inputs = build_inputs(n, seed, cases)
+    t0 = time.perf_counter()
+    outputs = run_engines(inputs)
+    elapsed = time.perf_counter() - t0
+    meta = np.array(json.dumps({"version": CORPUS_VERSION, "n": n, "seed": seed, "curve_stride": CURVE_STRIDE}))
+    np.savez_compressed(path, meta=meta, **inputs, **outputs)
+    return {"tcc_cases": inputs["tcc_in_sys"].shape[0], "grid_cases": inputs["grid_in_sys"].shape[0],
+            "seconds": elapsed}
+
+
+def load_corpus(path: str) -> Tuple[dict, Dict[str, np.ndarray]]:
+    with np.load(path, allow_pickle=False) as z:
+        data = {k: z[k] for k in z.files}
+    meta = json.loads(str(data.pop("meta")))
+    if meta.get("version") != CORPUS_VERSION:
+        raise ValueError(f"Corpus version {meta.get('version')} (expected {CORPUS_VERSION}); regenerate it.")
+    return meta, data
+
+
+def check(path: str, engines: Optional[dict] = None) -> dict:
+    """Reruns the corpus inputs and compares with the stored outputs."""
+    _, data = load_corpus(path)
+    inputs = {k: v for k, v in data.items() if "_in_" in k}
+    t0 = time.perf_counter()
+    candidate = run_engines(inputs, engines)
+    elapsed = time.perf_counter() - t0
+    return {"fields": compare(data, candidate), "seconds": elapsed,
+            "tcc_cases": inputs["tcc_in_sys"].shape[0], "grid_cases": inputs["grid_in_sys"].shape[0]}
+
+
+def _load_engine(spec: str):
+    """'module:function' -> callable."""
+    import importlib
+
+    mod, _, fn = spec.partition(":")
+    return getattr(importlib.import_module(mod), fn)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    g = sub.add_parser("generate")
+    g.add_argument("--out", required=True)
+    g.add_argument("--n", type=int, default=2000)
+    g.add_argument("--seed", type=int, default=7)
+    g.add_argument("--cases", help="JSON file of site cases")
+    c = sub.add_parser("check")
+    c.add_argument("--corpus", required=True)
+    c.add_argument("--allow-ties", action="store_true")
+    for k in ("tcc", "grid", "ocef"):
+        c.add_argument(f"--{k}", metavar="MODULE:FUNCTION", help=f"candidate {k} engine")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "generate":
+        cases = None
+        if args.cases:
+            with open(args.cases, "r", encoding="utf-8") as f:
+                cases = json.load(f)
+        info = generate(args.out, args.n, args.seed, cases)
+        print(f"{args.out}: {info['tcc_cases']} TCC + {info['grid_cases']} grid cases ({info['seconds']:.2f} s)")
+        return 0
+
+    engines = {k: _load_engine(getattr(args, k)) for k in ("tcc", "grid", "ocef") if getattr(args, k)}
+    res = check(args.corpus, engines)
+    failed = False
+    for name, r in res["fields"].items():
+        n_bad, n_tie = r["bad"].size, r["tie"].size
+        fail = n_bad or (n_tie and not args.allow_ties)
+        failed = failed or bool(fail)
+        if n_bad or n_tie:
+            cases = ", ".join(str(i) for i in np.concatenate([r["bad"], r["tie"]])[:8])
+            print(f"{'FAIL' if fail else 'tie '}: {name:<16} {n_bad} mismatched, {n_tie} round() ties  (cases {cases})")
+    print(f"{res['tcc_cases']} TCC + {res['grid_cases']} grid cases checked in {res['seconds']:.2f} s: "
+          f"{'FAIL' if failed else 'parity OK'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,11 @@
 import math
 
+from engine.coordination_rules import DEFAULT_RULES, RuleSet, validate_cti
+from engine.report_render import ReportBlock, report_text
 
-def validate_cti_ms(cti_ms: float) -> tuple[bool, str | None]:
-    if cti_ms < 120:
-        return False, "CTI must be greater than or equal to 120ms."
-    return True, None
+
+def validate_cti_ms(cti_ms: float, rules: RuleSet = DEFAULT_RULES) -> tuple[bool, str | None]:
+    return validate_cti(cti_ms, rules)
 
 
 def calculate_grid(
@@ -27,9 +28,9 @@ def calculate_grid(
 
     total_load = 0.0
     ct_alerts = []
+    settings = []  # (equipment, fault_type, stage, pickup_a, ratio, tms, time_s); tms is None for DT stages
+    blocks = []
 
-    feeder_oc_txt = ""
-    feeder_ef_txt = ""
     max_t_oc = 0.0
     max_t_ef = 0.0
 
@@ -47,11 +48,9 @@ def calculate_grid(
         max_t_oc = max(max_t_oc, t_oc)
         p2 = round(3.0 * l, 2)
         r2 = round(p2 / ct, 2) if ct else 0.0
-        feeder_oc_txt += (
-            f"FEEDER Q{i+1}: Load={l}A, CT={ct}\n"
-            f" - S1 (IDMT): Pickup={p_oc}A ({r1}*In), TMS=0.025, Time={t_oc}s\n"
-            f" - S2 (DT):   Pickup={p2}A ({r2}*In), Time=0.0s\n\n"
-        )
+        blocks.append(ReportBlock(f"FEEDER Q{i+1}", (("Load", l, "A"), ("CT", ct, ""))))
+        settings.append((f"FEEDER Q{i+1}", "OC", "S1 (IDMT)", p_oc, r1, 0.025, t_oc))
+        settings.append((f"FEEDER Q{i+1}", "OC", "S2 (DT)", p2, r2, None, 0.0))
 
         p_ef = round(0.15 * l, 2)
         r_ef1 = round(p_ef / ct, 2) if ct else 0.0
@@ -59,11 +58,8 @@ def calculate_grid(
         max_t_ef = max(max_t_ef, t_ef)
         p_ef2 = round(1.0 * l, 2)
         r_ef2 = round(p_ef2 / ct, 2) if ct else 0.0
-        feeder_ef_txt += (
-            f"FEEDER Q{i+1}: Load={l}A, CT={ct}\n"
-            f" - S1 (IDMT): Pickup={p_ef}A ({r_ef1}*In), TMS=0.025, Time={t_ef}s\n"
-            f" - S2 (DT):   Pickup={p_ef2}A ({r_ef2}*In), Time=0.0s\n\n"
-        )
+        settings.append((f"FEEDER Q{i+1}", "EF", "S1 (IDMT)", p_ef, r_ef1, 0.025, t_ef))
+        settings.append((f"FEEDER Q{i+1}", "EF", "S2 (DT)", p_ef2, r_ef2, None, 0.0))
 
     hv_load = total_load / (hv_kv / lv_kv)
 
@@ -78,9 +74,6 @@ def calculate_grid(
         ("HV SIDE Q5 (HV)", q5_ct, if_hv, hv_kv / lv_kv, round(if_hv, 2), cti_ms * 2.0, max_t_oc + cti_s, max_t_ef + cti_s),
     ]
 
-    incomer_oc = ""
-    incomer_ef = ""
-
     for name, ct_v, fault, scale, s3, dt_ms, t_prev_oc, t_prev_ef in coord_data:
         l_cur = total_load / scale
         t_req_oc = round(t_prev_oc + cti_s, 3)
@@ -94,12 +87,10 @@ def calculate_grid(
         r2 = round(p2 / ct_v, 2) if ct_v else 0.0
         r3 = round(s3 / ct_v, 2) if ct_v else 0.0
 
-        incomer_oc += (
-            f"{name}: Load={round(l_cur,2)}A, CT={ct_v}\n"
-            f" - S1 (IDMT): Pickup={p_oc}A ({r1}*In), TMS={tms_oc}, Time={t_req_oc}s\n"
-            f" - S2 (DT):   Pickup={p2}A ({r2}*In), Time={dt_ms/1000.0}s\n"
-            f" - S3 (DT):   Pickup={s3}A ({r3}*In), Time=0.0s\n\n"
-        )
+        blocks.append(ReportBlock(name, (("Load", round(l_cur, 2), "A"), ("CT", ct_v, ""))))
+        settings.append((name, "OC", "S1 (IDMT)", p_oc, r1, tms_oc, t_req_oc))
+        settings.append((name, "OC", "S2 (DT)", p2, r2, None, dt_ms / 1000.0))
+        settings.append((name, "OC", "S3 (DT)", s3, r3, None, 0.0))
 
         p_ef = round(0.15 * l_cur, 2)
         r_ef1 = round(p_ef / ct_v, 2) if ct_v else 0.0
@@ -108,21 +99,13 @@ def calculate_grid(
         r_ef2 = round(p_ef2 / ct_v, 2) if ct_v else 0.0
         r_ef3 = round(s3 / ct_v, 2) if ct_v else 0.0
 
-        incomer_ef += (
-            f"{name}: Load={round(l_cur,2)}A, CT={ct_v}\n"
-            f" - S1 (IDMT): Pickup={p_ef}A ({r_ef1}*In), TMS={tms_ef}, Time={t_req_ef}s\n"
-            f" - S2 (DT):   Pickup={p_ef2}A ({r_ef2}*In), Time={dt_ms/1000.0}s\n"
-            f" - S3 (DT):   Pickup={s3}A ({r_ef3}*In), Time=0.0s\n\n"
-        )
-
-    head = f"FLC LV: {flc_lv}A | FLC HV: {flc_hv}A | Short Circuit: {isc_lv}A\n" + "=" * 60 + "\n"
-
-    oc_report = head + feeder_oc_txt + incomer_oc
-    ef_report = head + feeder_ef_txt + incomer_ef
+        settings.append((name, "EF", "S1 (IDMT)", p_ef, r_ef1, tms_ef, t_req_ef))
+        settings.append((name, "EF", "S2 (DT)", p_ef2, r_ef2, None, dt_ms / 1000.0))
+        settings.append((name, "EF", "S3 (DT)", s3, r_ef3, None, 0.0))
 
     critical_overload = total_load > flc_lv
 
-    return {
+    result = {
         "flc_lv": flc_lv,
         "flc_hv": flc_hv,
         "isc_lv": isc_lv,
@@ -132,6 +115,169 @@ def calculate_grid(
         "hv_load": round(hv_load, 2),
         "critical_overload": critical_overload,
         "alerts": ct_alerts,
-        "oc_report": oc_report,
-        "ef_report": ef_report,
+        "settings": settings,
+        "report_head": (("FLC LV", flc_lv, "A"), ("FLC HV", flc_hv, "A"), ("Short Circuit", isc_lv, "A")),
+        "report_blocks": blocks,
+    }
+    result["oc_report"] = report_text(result, "OC")
+    result["ef_report"] = report_text(result, "EF")
+    return result
+
+
+# ---------------- PARALLEL TRANSFORMERS ----------------
+def calculate_grid_parallel(
+    transformers: list[dict],  # [{"mva", "z_pct", "q4_ct", "q5_ct", "section": "A"}, ...]
+    hv_kv: float,
+    lv_kv: float,
+    cti_ms: float,
+    feeders: list[dict],  # [{"load": float, "ct": float}, ...]
+    coupler_ct: float | None = None,
+):
+    """
+    OC/EF settings for N transformers in parallel on a common LV bus, split
+    into sections joined by a bus coupler (coupler_ct given and more than one
+    section in use).
+
+    Fault current sharing: each transformer contributes its own Isc
+    (FLC / Z); the LV fault level keeps calculate_grid's 0.9 factor. For a
+    feeder fault the coupler carries the other section's contribution and
+    every incomer (and its HV relay) its own share. Grading order:
+    feeders -> coupler -> incomers -> HV relays, one CTI per step; incomer
+    and HV TMS are back-calculated for all transformers at once.
+
+    With one transformer and no coupler the values match calculate_grid()
+    (same rounding and CTI accumulation); only the equipment names (T1 for
+    Q4/Q5) and the row order (all OC rows before the EF rows) differ.
+    """
+    import numpy as np
+    from engine.inverse import solve_tms
+
+    if not transformers:
+        raise ValueError("At least one transformer is required.")
+
+    def _round(a, n):
+        # Python round() per element: np.round scales by 10**n first and can land
+        # on the other side of a tie than calculate_grid's round()
+        return np.array([round(float(v), n) for v in np.ravel(a)]).reshape(np.shape(a))
+
+    cti_s = cti_ms / 1000.0
+    ratio_hv = hv_kv / lv_kv
+    mva = np.array([float(t["mva"]) for t in transformers])
+    z = np.array([float(t["z_pct"]) for t in transformers])
+    q4_ct = np.array([float(t["q4_ct"]) for t in transformers])
+    q5_ct = np.array([float(t["q5_ct"]) for t in transformers])
+    section = np.array([str(t.get("section", "A")) for t in transformers])
+    names = [f"T{i+1}" for i in range(len(transformers))]
+
+    flc_lv = _round((mva * 1000.0) / (math.sqrt(3.0) * lv_kv), 2)
+    isc = _round(flc_lv / (z / 100.0), 2)
+    if_lv = round(float(isc.sum()) * 0.9, 2)
+    share = isc / isc.sum()
+    if_tx = _round(if_lv * share, 2)              # each incomer's share of a bus/feeder fault
+    if_hv = _round(if_tx / ratio_hv, 2)
+
+    sections = sorted(set(section))
+    has_coupler = bool(coupler_ct) and len(sections) > 1
+    # Coupler current for a fault on each section = everything fed from the other sections
+    if has_coupler:
+        if_coupler = max(round(if_lv - float(if_tx[section == s].sum()), 2) for s in sections)
+    else:
+        if_coupler = None
+
+    total_load = sum(float(f["load"]) for f in feeders)
+    load_tx = total_load * (mva / mva.sum())     # load shared in proportion to rating
+    alerts = []
+    settings = []
+    blocks = []
+
+    for ft, k_idmt, k_dt in (("OC", 1.1, 3.0), ("EF", 0.15, 1.0)):
+        # Feeders see the whole bus fault level
+        max_t = 0.0
+        for i, f in enumerate(feeders):
+            l = float(f["load"])
+            ct = float(f["ct"])
+            if ft == "OC":
+                blocks.append(ReportBlock(f"FEEDER Q{i+1}", (("Load", l, "A"), ("CT", ct, ""))))
+                if ct < l:
+                    alerts.append(f"ALERT: Feeder Q{i+1} CT ({ct}A) is less than Load ({l}A)")
+            p1 = round(k_idmt * l, 2)
+            r1 = round(p1 / ct, 2) if ct else 0.0
+            t1 = round(0.025 * (0.14 / (math.pow(max(1.05, if_lv / p1), 0.02) - 1.0)), 3)
+            max_t = max(max_t, t1)
+            p2 = round(k_dt * l, 2)
+            r2 = round(p2 / ct, 2) if ct else 0.0
+            settings.append((f"FEEDER Q{i+1}", ft, "S1 (IDMT)", p1, r1, 0.025, t1))
+            settings.append((f"FEEDER Q{i+1}", ft, "S2 (DT)", p2, r2, None, 0.0))
+
+        # each step's required time accumulates unrounded CTIs on top of max_t, as in calculate_grid
+        t_prev = max_t
+        dt_step = 1
+        if has_coupler:
+            t_req = round(t_prev + cti_s, 3)
+            p1 = round(k_idmt * total_load, 2)
+            r1 = round(p1 / coupler_ct, 2)
+            tms = round(float(solve_tms(t_req, if_coupler, p1, min_multiple=1.05)), 3)
+            p2 = round(k_dt * total_load, 2)
+            r2 = round(p2 / coupler_ct, 2)
+            settings.append(("BUS COUPLER", ft, "S1 (IDMT)", p1, r1, tms, t_req))
+            settings.append(("BUS COUPLER", ft, "S2 (DT)", p2, r2, None, cti_s))
+            if ft == "OC":
+                blocks.append(ReportBlock("BUS COUPLER", (("Fault share", if_coupler, "A"), ("CT", coupler_ct, ""))))
+            t_prev += cti_s
+            dt_step = 2
+
+        # Incomers (LV) then HV relays, vectorized over transformers
+        for side, cts, fault, scale, s3 in (
+            ("INCOMER", q4_ct, if_tx, 1.0, _round(0.9 * isc, 2)),
+            ("HV SIDE", q5_ct, if_hv, ratio_hv, if_hv),
+        ):
+            t_req = round(t_prev + cti_s, 3)
+            l_cur = load_tx / scale
+            p1 = _round(k_idmt * l_cur, 2)
+            p2 = _round(k_dt * l_cur, 2)
+            tms = _round(solve_tms(t_req, fault, p1, min_multiple=1.05), 3)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                r1 = np.where(cts > 0, _round(p1 / cts, 2), 0.0)
+                r2 = np.where(cts > 0, _round(p2 / cts, 2), 0.0)
+                r3 = np.where(cts > 0, _round(s3 / cts, 2), 0.0)
+            dt_s = dt_step * cti_ms / 1000.0
+            for i, tx in enumerate(names):
+                eq = f"{side} {tx} ({'LV' if side == 'INCOMER' else 'HV'})"
+                if ft == "OC":
+                    blocks.append(ReportBlock(eq, (
+                        ("Load", round(float(l_cur[i]), 2), "A"), ("CT", float(cts[i]), ""),
+                        ("Fault share", float(fault[i]), "A"),
+                    )))
+                    if cts[i] < l_cur[i]:
+                        alerts.append(
+                            f"ALERT: {eq} CT ({cts[i]}A) is less than its Load Share ({round(float(l_cur[i]), 2)}A)"
+                        )
+                settings.append((eq, ft, "S1 (IDMT)", float(p1[i]), float(r1[i]), float(tms[i]), t_req))
+                settings.append((eq, ft, "S2 (DT)", float(p2[i]), float(r2[i]), None, dt_s))
+                settings.append((eq, ft, "S3 (DT)", float(s3[i]), float(r3[i]), None, 0.0))
+            t_prev += cti_s
+            dt_step += 1
+
+    result = {
+        "flc_lv": round(float(flc_lv.sum()), 2),
+        "isc_lv": round(float(isc.sum()), 2),
+        "flc_lv_tx": flc_lv.tolist(),
+        "isc_lv_tx": isc.tolist(),
+        "if_lv": if_lv,
+        "if_tx": if_tx.tolist(),
+        "if_hv": if_hv.tolist(),
+        "if_coupler": if_coupler,
+        "total_load": round(total_load, 2),
+        "critical_overload": total_load > float(flc_lv.sum()),
+        "alerts": alerts,
+        "settings": settings,
+        "report_head": (
+            ("Transformers", len(names), ""),
+            ("FLC LV", round(float(flc_lv.sum()), 2), "A"),
+            ("Short Circuit", round(float(isc.sum()), 2), "A"),
+        ),
+        "report_blocks": blocks,
     }
+    result["oc_report"] = report_text(result, "OC")
+    result["ef_report"] = report_text(result, "EF")
+    return result
@@ -0,0 +1,92 @@
+"""
+Import-time benchmark for the engine modules.
+
+Each module is imported in a fresh interpreter; the wall time of the import
+is measured and the heavy backends it pulled in are listed. Light modules
+must stay under their budget and must not load any heavy backend.
+
+Usage:
+  python -m engine.import_bench            # report, exit 1 on budget violation
+  python -m engine.import_bench --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "reportlab", "streamlit")
+
+# module -> import budget in milliseconds (median over repeats)
+LIGHT_MODULES = {
+    "engine.tcc_engine": 50.0,
+    "engine.grid_engine": 50.0,
+    "engine.ocef_engine": 50.0,
+    "engine.pdf_utils": 50.0,
+    "engine.jobs": 50.0,
+    "engine.result_cache": 50.0,
+}
+
+_PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+__import__({module!r})
+elapsed = (time.perf_counter() - t0) * 1000.0
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"ms": elapsed, "heavy": heavy}}))
+"""
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str, repeat: int = 3) -> dict:
+    samples = []
+    heavy = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(res["ms"])
+        heavy = res["heavy"]
+    samples.sort()
+    return {"module": module, "ms": samples[len(samples) // 2], "heavy": heavy}
+
+
+def run(repeat: int = 3) -> tuple[list[dict], list[str]]:
+    results = []
+    failures = []
+    for module, budget in LIGHT_MODULES.items():
+        res = measure(module, repeat)
+        res["budget_ms"] = budget
+        results.append(res)
+        if res["heavy"]:
+            failures.append(f"{module} imports heavy backend(s): {', '.join(res['heavy'])}")
+        if res["ms"] > budget:
+            failures.append(f"{module} import took {res['ms']:.1f} ms (budget {budget:.0f} ms)")
+    return results, failures
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    results, failures = run(args.repeat)
+    for r in results:
+        heavy = ", ".join(r["heavy"]) or "-"
+        print(f"{r['module']:<24} {r['ms']:8.2f} ms  (budget {r['budget_ms']:.0f} ms)  heavy: {heavy}")
+    for f in failures:
+        print(f"FAIL: {f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Inverse IEC Curve Solver (logic-only)
+
+Solves the IEC characteristic t = TMS * k / ((I/Ip)^alpha - 1) for the
+setting instead of the time:
+
+    TMS = t * ((I/Ip)^alpha - 1) / k
+    Ip  = I / (1 + TMS * k / t)^(1/alpha)
+
+for any curve in IEC_CURVES and any number of relays / target times at once
+(all arguments broadcast). regrade() adds the DT stages and device setting
+ranges: it snaps the TMS onto the device grid and flags targets that a faster
+DT stage or the TMS limits make unreachable. solve_pickup() snaps its pickups
+onto a device range the same way.
+
+calculate_grid() keeps its inline Standard Inverse back-calculation so its
+rounded report values stay unchanged; solve_tms(..., min_multiple=1.05)
+reproduces it.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from engine.tcc_engine import IEC_CURVES
+
+QUANTIZE_MODES = ("up", "down", "nearest")
+_STEP_EPS = 1e-9
+
+
+def curve_constants(curve) -> Tuple[np.ndarray, np.ndarray]:
+    """(k, alpha) for one curve name or an array-like of names."""
+    names = np.asarray(curve)
+    try:
+        if names.ndim == 0:
+            k, alpha = IEC_CURVES[str(names)]
+            return np.float64(k), np.float64(alpha)
+        ka = np.array([IEC_CURVES[str(c)] for c in names.ravel()], dtype=float)
+    except KeyError as e:
+        raise ValueError(f"Unknown curve: {e.args[0]}") from None
+    return ka[:, 0].reshape(names.shape), ka[:, 1].reshape(names.shape)
+
+
+def solve_tms(t_target, I, pickup, curve="Standard Inverse", min_multiple: Optional[float] = None) -> np.ndarray:
+    """
+    TMS giving trip time t_target at current I. NaN where the IDMT stage
+    does not operate (I <= pickup) or t_target <= 0.
+
+    min_multiple: floor on I/pickup (calculate_grid uses 1.05).
+    """
+    k, alpha = curve_constants(curve)
+    t_target = np.asarray(t_target, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        M = np.asarray(I, dtype=float) / np.asarray(pickup, dtype=float)
+        if min_multiple is not None:
+            M = np.maximum(min_multiple, M)
+        tms = t_target * (M ** alpha - 1.0) / k
+    return np.where((M > 1.0) & (t_target > 0), tms, np.nan)
+
+
+def solve_pickup(
+    t_target,
+    I,
+    tms,
+    curve="Standard Inverse",
+    pickup_range: Optional[Tuple[float, float, float]] = None,
+) -> dict:
+    """
+    Pickup (A) giving trip time t_target at current I for a fixed TMS.
+
+    pickup_range: (lo, hi, step) of the device in A; the pickup is rounded up
+    onto it (a higher pickup never trips faster than the target).
+
+    Returns arrays:
+      pickup   solved (and quantized) pickup, NaN where t_target or TMS <= 0
+      clamped  pickup was limited by the range bounds
+    """
+    k, alpha = curve_constants(curve)
+    t_target = np.asarray(t_target, dtype=float)
+    tms = np.asarray(tms, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        M = (1.0 + tms * k / t_target) ** (1.0 / alpha)
+        ip = np.asarray(I, dtype=float) / M
+    ip = np.where((t_target > 0) & (tms > 0), ip, np.nan)
+    clamped = np.zeros(np.shape(ip), dtype=bool)
+    if pickup_range is not None:
+        lo, hi, step = pickup_range
+        clamped = (ip < lo) | (ip > hi)
+        ip = quantize(ip, lo, hi, step, mode="up")
+    return {"pickup": ip, "clamped": clamped}
+
+
+def dt_stage_time(I, dt_on, dt_pickup, dt_time) -> np.ndarray:
+    """Operating time of a DT stage at I; inf where it is off or does not pick up."""
+    I = np.asarray(I, dtype=float)
+    return np.where(np.asarray(dt_on, dtype=bool) & (I >= dt_pickup), np.asarray(dt_time, dtype=float), np.inf)
+
+
+def quantize(values, lo: float, hi: float, step: float, mode: str = "up") -> np.ndarray:
+    """
+    Clamps values to [lo, hi] and snaps them onto the grid lo + n*step.
+    mode "up" never lowers a value (keeps trip times at or above their target).
+    NaN stays NaN.
+    """
+    if mode not in QUANTIZE_MODES:
+        raise ValueError(f"Unknown quantize mode: {mode}")
+    v = np.clip(np.asarray(values, dtype=float), lo, hi)
+    if step and step > 0:
+        n = (v - lo) / step
+        if mode == "up":
+            n = np.ceil(n - _STEP_EPS)
+        elif mode == "down":
+            n = np.floor(n + _STEP_EPS)
+        else:
+            n = np.round(n)
+        v = np.round(np.minimum(lo + n * step, hi), 10)
+    return v
+
+
+def regrade(
+    t_target,
+    I,
+    pickup,
+    curve="Standard Inverse",
+    dt1_on=False, dt1_pickup=np.inf, dt1_time=np.inf,
+    dt2_on=False, dt2_pickup=np.inf, dt2_time=np.inf,
+    tms_range: Optional[Tuple[float, float, float]] = None,
+    min_multiple: Optional[float] = None,
+) -> dict:
+    """
+    Re-grades IDMT stages so each relay trips at t_target at fault current I.
+
+    tms_range: (lo, hi, step) of the device; the TMS is rounded up onto it.
+
+    Returns arrays:
+      tms       solved (and quantized) TMS, NaN where the IDMT stage cannot operate
+      t         resulting trip time at I including the DT stages
+      feasible  target reachable: IDMT operates, no DT stage trips faster and,
+                if the TMS was clamped, the IDMT time is still within one TMS
+                step of t_target
+      clamped   TMS was limited by the range bounds
+    """
+    k, alpha = curve_constants(curve)
+    tms_exact = solve_tms(t_target, I, pickup, curve, min_multiple)
+    tms = tms_exact
+    clamped = np.zeros(np.shape(tms), dtype=bool)
+    step = 0.0
+    if tms_range is not None:
+        lo, hi, step = tms_range
+        tms = quantize(tms_exact, lo, hi, step, mode="up")
+        clamped = (tms_exact < lo) | (tms_exact > hi)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        M = np.asarray(I, dtype=float) / np.asarray(pickup, dtype=float)
+        if min_multiple is not None:
+            M = np.maximum(min_multiple, M)
+        # trip time per unit TMS at I: one TMS step moves the IDMT time by step * t_unit
+        t_unit = k / (M ** alpha - 1.0)
+        t_idmt = np.where(np.isnan(tms), np.inf, tms * t_unit)
+    t_dt = np.minimum(dt_stage_time(I, dt1_on, dt1_pickup, dt1_time), dt_stage_time(I, dt2_on, dt2_pickup, dt2_time))
+    t = np.minimum(t_idmt, t_dt)
+    t_target = np.asarray(t_target, dtype=float)
+    with np.errstate(invalid="ignore"):
+        reached = ~clamped | (np.abs(t_idmt - t_target) <= step * t_unit + _STEP_EPS)
+
+    return {
+        "tms": tms,
+        "t": np.where(np.isfinite(t), t, np.nan),
+        "feasible": ~np.isnan(tms) & (t_dt >= t_target) & reached,
+        "clamped": clamped,
+    }
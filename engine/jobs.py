@@ -0,0 +1,163 @@
+"""
+Background Job Runner (logic-only)
+
+Runs long studies (TCC plots, large feeder grids, PDF exports) on a worker
+pool so the Streamlit script thread never blocks. Pages submit a job, keep
+the job id in session state and poll get() on each rerun.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    job_id: str
+    label: str
+    submitted_at: float
+    status: str = PENDING
+    progress: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+
+class JobRunner:
+    """
+    Thread-pool job runner with a small in-memory job store.
+
+    max_jobs bounds the store; the oldest finished jobs are dropped first.
+    Jobs submitted with report_progress=True receive a progress(fraction)
+    keyword callback.
+    """
+
+    def __init__(self, max_workers: int = 2, max_jobs: int = 200):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pctool-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+
+    def submit(self, fn: Callable, *args, label: str = "", report_progress: bool = False, **kwargs) -> str:
+        job_id = uuid.uuid4().hex
+        job = Job(job_id=job_id, label=label or getattr(fn, "__name__", "job"), submitted_at=time.time())
+
+        if report_progress:
+            kwargs["progress"] = lambda fraction: self._set_progress(job_id, fraction)
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._prune()
+            self._futures[job_id] = self._pool.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id: str, fn: Callable, args, kwargs):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status == CANCELLED:
+                return
+            job.status = RUNNING
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._finish(job_id, FAILED, error=str(e))
+        else:
+            self._finish(job_id, DONE, result=result)
+
+    def _finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            self._futures.pop(job_id, None)
+            if job is None or job.status == CANCELLED:
+                return
+            job.status = status
+            job.result = result
+            job.error = error
+            job.finished_at = time.time()
+            if status == DONE:
+                job.progress = 1.0
+
+    def _set_progress(self, job_id: str, fraction: float):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.finished:
+                job.progress = min(max(float(fraction), 0.0), 1.0)
+
+    def _prune(self):
+        # Caller holds the lock.
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [j.job_id for j in self._jobs.values() if j.finished][:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        """Snapshot of the job (safe to read without the lock), or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id) if job_id else None
+            return replace(job) if job is not None else None
+
+    def result(self, job_id: str, timeout: Optional[float] = None):
+        """Blocks until the job finishes; re-raises failures as RuntimeError."""
+        with self._lock:
+            fut = self._futures.get(job_id)
+        if fut is not None:
+            fut.result(timeout=timeout)
+
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        if job.status == FAILED:
+            raise RuntimeError(job.error)
+        if job.status == CANCELLED:
+            raise RuntimeError(f"Job {job.label} was cancelled.")
+        return job.result
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a job that has not finished; a running job's result is discarded."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            fut = self._futures.pop(job_id, None)
+            if fut is not None:
+                fut.cancel()
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            return True
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> JobRunner:
+    """Process-wide runner shared by every Streamlit session."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,264 @@
+"""
+Relay / Feeder Models (logic-only)
+
+RelaySettings: one relay's settings with __slots__, validated once, replacing
+the ad-hoc string-keyed relay dicts inside the engines.
+RelayBank: N relays stored column-wise as contiguous NumPy arrays, so trip
+times are evaluated for all relays and currents in one array operation.
+Directional relays only operate for fault current flowing in their set
+direction; the flow seen by each relay is passed alongside the currents.
+FeederBank: the same columnar layout for feeder load/CT tables.
+
+The relay dict format used by the pages ({"idmt_on", "pickup", "tms", ...})
+stays the interchange format; convert with RelaySettings.from_dict()/to_dict().
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from engine.tcc_engine import IEC_CURVES, iec_curve
+
+RELAY_FIELDS = (
+    "idmt_on", "dt1_on", "dt2_on",
+    "pickup", "tms",
+    "dt1_pickup", "dt1_time",
+    "dt2_pickup", "dt2_time",
+    "curve",
+    "direction",
+)
+
+# Directional element: sign of the fault-current flow the relay operates for
+# (0 = operates for either direction).
+DIRECTIONS = {"non-directional": 0, "forward": 1, "reverse": -1}
+
+
+def _as_float(v) -> Optional[float]:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+
+class RelaySettings:
+    """
+    Settings of one relay (IDMT + DT1 + DT2 stages).
+
+    A DT stage whose pickup or time is not a number is switched off, which is
+    what the engine's try/except around DT comparisons used to do per point.
+    """
+
+    __slots__ = RELAY_FIELDS
+
+    def __init__(
+        self,
+        idmt_on: bool = True,
+        dt1_on: bool = False,
+        dt2_on: bool = False,
+        pickup: float = 0.0,
+        tms: float = 0.0,
+        dt1_pickup: float = 0.0,
+        dt1_time: float = 0.0,
+        dt2_pickup: float = 0.0,
+        dt2_time: float = 0.0,
+        curve: str = "Standard Inverse",
+        direction: str = "non-directional",
+    ):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown relay direction: {direction}")
+        self.direction = direction
+        self.idmt_on = bool(idmt_on)
+        self.curve = curve
+        self.pickup = _as_float(pickup)
+        self.tms = _as_float(tms)
+
+        if self.idmt_on:
+            if curve not in IEC_CURVES:
+                raise ValueError(f"Unknown IEC curve: {curve}")
+            if self.pickup is None or self.pickup <= 0:
+                raise ValueError(f"IDMT pickup must be a positive number (got {pickup!r}).")
+            if self.tms is None or self.tms < 0:
+                raise ValueError(f"TMS must be a non-negative number (got {tms!r}).")
+
+        self.dt1_pickup = _as_float(dt1_pickup)
+        self.dt1_time = _as_float(dt1_time)
+        self.dt1_on = bool(dt1_on) and self.dt1_pickup is not None and self.dt1_time is not None
+
+        self.dt2_pickup = _as_float(dt2_pickup)
+        self.dt2_time = _as_float(dt2_time)
+        self.dt2_on = bool(dt2_on) and self.dt2_pickup is not None and self.dt2_time is not None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RelaySettings":
+        return cls(**{k: d[k] for k in RELAY_FIELDS if k in d})
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in RELAY_FIELDS}
+
+    def __repr__(self) -> str:
+        body = ", ".join(f"{k}={getattr(self, k)!r}" for k in RELAY_FIELDS)
+        return f"RelaySettings({body})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RelaySettings):
+            return NotImplemented
+        return all(getattr(self, k) == getattr(other, k) for k in RELAY_FIELDS)
+
+    def operates_for(self, flow: float) -> bool:
+        """True if the directional element releases for current flowing with sign flow (+1 forward)."""
+        d = DIRECTIONS[self.direction]
+        return d == 0 or d * flow > 0
+
+    def trip_time(self, I: float, flow: float = 1.0) -> float:
+        """
+        Scalar trip time at current I (already scaled to this relay's side)
+        flowing in direction flow (+1 forward, -1 reverse); NaN if no stage operates.
+        """
+        if not self.operates_for(flow):
+            return math.nan
+        times = []
+        if self.idmt_on:
+            t = iec_curve(I, self.pickup, self.tms, self.curve)
+            if not math.isnan(t):
+                times.append(t)
+        if self.dt1_on and I >= self.dt1_pickup:
+            times.append(self.dt1_time)
+        if self.dt2_on and I >= self.dt2_pickup:
+            times.append(self.dt2_time)
+        return min(times) if times else math.nan
+
+
+def merged_trip_time(
+    I,
+    idmt_on, pickup, tms, k, alpha,
+    dt1_on, dt1_pickup, dt1_time,
+    dt2_on, dt2_pickup, dt2_time,
+):
+    """
+    Vectorized merged (fastest-stage) trip time.
+
+    All arguments broadcast against each other; I is the current seen by the
+    relay. Returns NaN where no stage operates.
+    """
+    I = np.asarray(I, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        M = I / pickup
+        t = np.where(idmt_on & (I > pickup), tms * (k / ((M ** alpha) - 1.0)), np.nan)
+    t = np.fmin(t, np.where(dt1_on & (I >= dt1_pickup), dt1_time, np.nan))
+    t = np.fmin(t, np.where(dt2_on & (I >= dt2_pickup), dt2_time, np.nan))
+    return t
+
+
+class RelayBank:
+    """
+    Columnar storage for N relays.
+
+    scale: per-relay current divisor (e.g. HV/LV ratio for relays on the HV side);
+    trip_times() divides the study currents by it before evaluating each relay.
+    """
+
+    __slots__ = (
+        "idmt_on", "pickup", "tms", "k", "alpha",
+        "dt1_on", "dt1_pickup", "dt1_time",
+        "dt2_on", "dt2_pickup", "dt2_time",
+        "direction", "scale", "curves",
+    )
+
+    def __init__(self, settings: Sequence[RelaySettings], scale: Optional[Sequence[float]] = None):
+        n = len(settings)
+        self.curves = [s.curve for s in settings]
+        self.idmt_on = np.array([s.idmt_on for s in settings], dtype=bool)
+        self.pickup = np.array([s.pickup if s.idmt_on else np.inf for s in settings], dtype=float)
+        self.tms = np.array([s.tms if s.idmt_on else 0.0 for s in settings], dtype=float)
+        ka = [IEC_CURVES.get(s.curve, (np.nan, np.nan)) for s in settings]
+        self.k = np.array([c[0] for c in ka], dtype=float)
+        self.alpha = np.array([c[1] for c in ka], dtype=float)
+        self.dt1_on = np.array([s.dt1_on for s in settings], dtype=bool)
+        self.dt1_pickup = np.array([s.dt1_pickup if s.dt1_on else np.inf for s in settings], dtype=float)
+        self.dt1_time = np.array([s.dt1_time if s.dt1_on else np.nan for s in settings], dtype=float)
+        self.dt2_on = np.array([s.dt2_on for s in settings], dtype=bool)
+        self.dt2_pickup = np.array([s.dt2_pickup if s.dt2_on else np.inf for s in settings], dtype=float)
+        self.dt2_time = np.array([s.dt2_time if s.dt2_on else np.nan for s in settings], dtype=float)
+        self.direction = np.array([DIRECTIONS[s.direction] for s in settings], dtype=int)
+        self.scale = np.ones(n) if scale is None else np.asarray(scale, dtype=float).reshape(n)
+
+    @classmethod
+    def from_dicts(cls, relays: Iterable[dict], scale: Optional[Sequence[float]] = None) -> "RelayBank":
+        return cls([RelaySettings.from_dict(r) for r in relays], scale=scale)
+
+    def __len__(self) -> int:
+        return len(self.curves)
+
+    def columns(self, index=slice(None)) -> dict:
+        """Per-relay arrays as keyword arguments for merged_trip_time() (shape (n, 1))."""
+        return {
+            name: getattr(self, name)[index, None]
+            for name in ("idmt_on", "pickup", "tms", "k", "alpha",
+                         "dt1_on", "dt1_pickup", "dt1_time",
+                         "dt2_on", "dt2_pickup", "dt2_time")
+        }
+
+    def released(self, flow) -> np.ndarray:
+        """
+        Directional release per relay for fault-current flow signs (+1 forward,
+        -1 reverse) broadcasting against (n_relays, n_currents).
+        """
+        d = self.direction[:, None]
+        return (d == 0) | (d * np.sign(flow) > 0)
+
+    def trip_times(self, currents, flow=1.0) -> np.ndarray:
+        """
+        Trip time of every relay at every current: shape (n_relays, n_currents).
+        flow: fault-current direction seen by the relays (scalar or broadcasting
+        against that shape); directional relays not released return NaN.
+        """
+        currents = np.asarray(currents, dtype=float).reshape(1, -1)
+        t = merged_trip_time(currents / self.scale[:, None], **self.columns())
+        if self.direction.any():
+            t = np.where(self.released(flow), t, np.nan)
+        return t
+
+
+class FeederBank:
+    """Columnar feeder table (load and CT primary in A)."""
+
+    __slots__ = ("load", "ct")
+
+    def __init__(self, load: Sequence[float], ct: Sequence[float]):
+        self.load = np.asarray(load, dtype=float)
+        self.ct = np.asarray(ct, dtype=float)
+        if self.load.shape != self.ct.shape:
+            raise ValueError("Feeder load and CT columns must have the same length.")
+
+    @classmethod
+    def from_records(cls, feeders: Iterable) -> "FeederBank":
+        """Accepts {"load", "ct"} dicts or ocef_engine.FeederInputs."""
+        loads: List[float] = []
+        cts: List[float] = []
+        for f in feeders:
+            if isinstance(f, dict):
+                loads.append(f["load"])
+                cts.append(f["ct"])
+            else:
+                loads.append(f.load_a)
+                cts.append(f.ct_a)
+        return cls(loads, cts)
+
+    @classmethod
+    def from_frame(cls, df, load_col: str = "Load (A)", ct_col: str = "CT (A)") -> "FeederBank":
+        return cls(df[load_col].fillna(0).to_numpy(dtype=float), df[ct_col].fillna(0).to_numpy(dtype=float))
+
+    def __len__(self) -> int:
+        return len(self.load)
+
+    @property
+    def total_load(self) -> float:
+        return float(self.load.sum())
+
+    def records(self) -> List[dict]:
+        """Feeder dicts in the shape calculate_grid() expects."""
+        return [{"load": l, "ct": ct} for l, ct in zip(self.load.tolist(), self.ct.tolist())]
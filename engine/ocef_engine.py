@@ -11,8 +11,11 @@ from dataclasses import dataclass
 from typing import List
 import math
 
+from engine.coordination_rules import validate_cti
+from engine.report_render import ReportBlock, report_text
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class SystemInputs:
     mva: float
     hv_kv: float
@@ -23,13 +26,13 @@ class SystemInputs:
     q5_ct: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FeederInputs:
     load_a: float
     ct_a: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SystemResults:
     flc_lv: float
     flc_hv: float
@@ -40,7 +43,7 @@ class SystemResults:
     hv_load: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class OCEFResults:
     system: SystemResults
     oc_report_text: str
@@ -51,8 +54,9 @@ class OCEFResults:
 
 def compute_ocef(sys: SystemInputs, feeders: List[FeederInputs]) -> OCEFResults:
     cti_ms = float(sys.cti_ms)
-    if cti_ms < 120:
-        raise ValueError("CTI must be greater than or equal to 120ms.")
+    ok, msg = validate_cti(cti_ms)
+    if not ok:
+        raise ValueError(msg)
 
     mva, hv_v, lv_v = float(sys.mva), float(sys.hv_kv), float(sys.lv_kv)
     z_pct = float(sys.z_pct)
@@ -70,8 +74,8 @@ def compute_ocef(sys: SystemInputs, feeders: List[FeederInputs]) -> OCEFResults:
     max_t_oc = 0.0
     max_t_ef = 0.0
 
-    f_oc_txt = ""
-    f_ef_txt = ""
+    settings = []  # (equipment, fault_type, stage, pickup_a, ratio, tms, time_s), as in calculate_grid()
+    blocks: List[ReportBlock] = []
     ct_alerts: List[str] = []
 
     # Feeders Q1..Qn
@@ -92,11 +96,9 @@ def compute_ocef(sys: SystemInputs, feeders: List[FeederInputs]) -> OCEFResults:
         p2 = round(3 * l, 2)
         r2 = round(p2 / ct, 2)
 
-        f_oc_txt += (
-            f"FEEDER Q{i+1}: Load={l}A, CT={ct}\n"
-            f" - S1 (IDMT): Pickup={p_oc}A ({r1}*In), TMS=0.025, Time={t_oc}s\n"
-            f" - S2 (DT):   Pickup={p2}A ({r2}*In), Time=0.0s\n\n"
-        )
+        blocks.append(ReportBlock(f"FEEDER Q{i+1}", (("Load", l, "A"), ("CT", ct, ""))))
+        settings.append((f"FEEDER Q{i+1}", "OC", "S1 (IDMT)", p_oc, r1, 0.025, t_oc))
+        settings.append((f"FEEDER Q{i+1}", "OC", "S2 (DT)", p2, r2, None, 0.0))
 
         # EF calculations
         p_ef = round(0.15 * l, 2)
@@ -107,11 +109,8 @@ def compute_ocef(sys: SystemInputs, feeders: List[FeederInputs]) -> OCEFResults:
         p_ef2 = round(1.0 * l, 2)
         r_ef2 = round(p_ef2 / ct, 2)
 
-        f_ef_txt += (
-            f"FEEDER Q{i+1}: Load={l}A, CT={ct}\n"
-            f" - S1 (IDMT): Pickup={p_ef}A ({r_ef1}*In), TMS=0.025, Time={t_ef}s\n"
-            f" - S2 (DT):   Pickup={p_ef2}A ({r_ef2}*In), Time=0.0s\n\n"
-        )
+        settings.append((f"FEEDER Q{i+1}", "EF", "S1 (IDMT)", p_ef, r_ef1, 0.025, t_ef))
+        settings.append((f"FEEDER Q{i+1}", "EF", "S2 (DT)", p_ef2, r_ef2, None, 0.0))
 
     hv_load = total_load / (hv_v / lv_v)
 
@@ -126,9 +125,6 @@ def compute_ocef(sys: SystemInputs, feeders: List[FeederInputs]) -> OCEFResults:
         ("HV SIDE Q5 (HV)", q5_ct, if_hv, hv_v / lv_v, round(if_hv, 2), cti_ms * 2, max_t_oc + cti_s, max_t_ef + cti_s)
     ]
 
-    i_oc = ""
-    i_ef = ""
-
     for name, ct_v, fault, scale, s3, dt_ms, t_prev_oc, t_prev_ef in coord_data:
         l_cur = total_load / scale
 
@@ -144,12 +140,10 @@ def compute_ocef(sys: SystemInputs, feeders: List[FeederInputs]) -> OCEFResults:
         r2 = round(p2 / ct_v, 2)
         r3 = round(s3 / ct_v, 2)
 
-        i_oc += (
-            f"{name}: Load={round(l_cur,2)}A, CT={ct_v}\n"
-            f" - S1 (IDMT): Pickup={p_oc}A ({r1}*In), TMS={tms_oc}, Time={t_req_oc}s\n"
-            f" - S2 (DT):   Pickup={p2}A ({r2}*In), Time={dt_ms/1000}s\n"
-            f" - S3 (DT):   Pickup={s3}A ({r3}*In), Time=0.0s\n\n"
-        )
+        blocks.append(ReportBlock(name, (("Load", round(l_cur, 2), "A"), ("CT", ct_v, ""))))
+        settings.append((name, "OC", "S1 (IDMT)", p_oc, r1, tms_oc, t_req_oc))
+        settings.append((name, "OC", "S2 (DT)", p2, r2, None, dt_ms / 1000))
+        settings.append((name, "OC", "S3 (DT)", s3, r3, None, 0.0))
 
         # EF incomer/hv side
         p_ef = round(0.15 * l_cur, 2)
@@ -160,24 +154,23 @@ def compute_ocef(sys: SystemInputs, feeders: List[FeederInputs]) -> OCEFResults:
         r_ef2 = round(p_ef2 / ct_v, 2)
         r_ef3 = round(s3 / ct_v, 2)
 
-        i_ef += (
-            f"{name}: Load={round(l_cur,2)}A, CT={ct_v}\n"
-            f" - S1 (IDMT): Pickup={p_ef}A ({r_ef1}*In), TMS={tms_ef}, Time={t_req_ef}s\n"
-            f" - S2 (DT):   Pickup={p_ef2}A ({r_ef2}*In), Time={dt_ms/1000}s\n"
-            f" - S3 (DT):   Pickup={s3}A ({r_ef3}*In), Time=0.0s\n\n"
-        )
-
-    head = f"FLC LV: {flc_lv}A | FLC HV: {flc_hv}A | Short Circuit: {isc_lv}A\n" + "=" * 60 + "\n"
+        settings.append((name, "EF", "S1 (IDMT)", p_ef, r_ef1, tms_ef, t_req_ef))
+        settings.append((name, "EF", "S2 (DT)", p_ef2, r_ef2, None, dt_ms / 1000))
+        settings.append((name, "EF", "S3 (DT)", s3, r_ef3, None, 0.0))
 
     critical_overload = (total_load > flc_lv)
-    prefix = ""
+    prefix = []
     if critical_overload:
-        prefix += f"CRITICAL ALERT: TRANSFORMER OVERLOAD ({total_load}A > {flc_lv}A)\n"
-    for a in ct_alerts:
-        prefix += a
-
-    oc_report_text = prefix + head + f_oc_txt + i_oc
-    ef_report_text = prefix + head + f_ef_txt + i_ef
+        prefix.append(f"CRITICAL ALERT: TRANSFORMER OVERLOAD ({total_load}A > {flc_lv}A)\n")
+    prefix.extend(ct_alerts)
+
+    structured = {
+        "settings": settings,
+        "report_head": (("FLC LV", flc_lv, "A"), ("FLC HV", flc_hv, "A"), ("Short Circuit", isc_lv, "A")),
+        "report_blocks": blocks,
+    }
+    oc_report_text = report_text(structured, "OC", prefix)
+    ef_report_text = report_text(structured, "EF", prefix)
 
     sys_res = SystemResults(
         flc_lv=flc_lv,
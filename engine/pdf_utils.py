@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
+from typing import Iterable
+
+# reportlab is imported inside the export functions; it is only needed when a
+# PDF is actually requested.
 
 
 def text_to_pdf_bytes(title: str, text: str) -> bytes:
+    return lines_to_pdf_bytes(title, text.splitlines())
+
+
+def lines_to_pdf_bytes(title: str, lines: Iterable[str]) -> bytes:
+    """Monospaced report pages; lines may be a generator and are drawn as they arrive."""
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+
     buf = io.BytesIO()
     c = canvas.Canvas(buf, pagesize=letter)
     width, height = letter
@@ -19,7 +29,7 @@ def text_to_pdf_bytes(title: str, text: str) -> bytes:
     y -= 0.35 * inch
 
     c.setFont("Courier", 9)
-    for line in text.splitlines():
+    for line in lines:
         if y < margin:
             c.showPage()
             c.setFont("Courier", 9)
@@ -30,3 +40,318 @@ def text_to_pdf_bytes(title: str, text: str) -> bytes:
     c.showPage()
     c.save()
     return buf.getvalue()
+
+
+# ---------------- VECTOR TCC PAGES ----------------
+# TCC plots are drawn straight onto the ReportLab canvas from the curve arrays
+# (no Matplotlib figure): log-log axes, polylines downsampled to the page
+# resolution, and the relay settings table as canvas text. One canvas takes any
+# number of studies, two pages each (plot + settings/report).
+
+TCC_COLORS = ("blue", "green", "red", "purple", "orange")
+TCC_PLOT_COLUMNS = 400          # downsampling resolution across the plot width
+TCC_TIME_LIMITS = (1e-2, 1e4)   # clamp for the automatic time axis (s)
+SETTINGS_HEADERS = ("Relay", "IDMT", "Pick", "TMS", "DT1", "P1", "T1", "DT2", "P2", "T2", "Curve")
+
+
+def downsample_polyline(x, y, columns: int = TCC_PLOT_COLUMNS, x_range=None):
+    """
+    Log-log polyline reduced to at most 4 points (first, last, min, max) per
+    column of the plot width (x ascending), split at NaN / non-positive values.
+
+    Returns a list of (x, y) arrays, one per continuous run.
+    """
+    import numpy as np
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y) & (x > 0) & (y > 0)
+    if not valid.any():
+        return []
+    lx = np.log10(np.where(valid, x, 1.0))
+    lo, hi = (np.log10(x_range[0]), np.log10(x_range[1])) if x_range else (lx[valid].min(), lx[valid].max())
+    col = np.clip(((lx - lo) / ((hi - lo) or 1.0) * columns).astype(int), 0, columns - 1)
+
+    run = np.cumsum(~valid)                     # run id changes at every invalid point
+    idx = np.flatnonzero(valid)
+    key = run[idx] * (columns + 1) + col[idx]   # one group per (run, column)
+    ly = np.log10(y[idx])
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[starts[1:], idx.size] - 1
+    order_min = np.lexsort((ly, key))
+    order_max = np.lexsort((-ly, key))
+    group_first = np.searchsorted(key[order_min], key[starts])
+    keep = np.unique(np.concatenate((starts, ends, order_min[group_first], order_max[group_first])))
+
+    kept = idx[keep]
+    breaks = np.flatnonzero(np.diff(run[kept]) != 0) + 1
+    return [(x[s], y[s]) for s in np.split(kept, breaks)]
+
+
+def _decade_limits(values, clamp=None):
+    import numpy as np
+
+    v = np.asarray(values, dtype=float)
+    v = v[np.isfinite(v) & (v > 0)]
+    if not v.size:
+        return (1.0, 10.0)
+    lo, hi = np.floor(np.log10(v.min())), np.ceil(np.log10(v.max()))
+    if clamp:
+        lo, hi = max(lo, np.log10(clamp[0])), min(hi, np.log10(clamp[1]))
+    return (10.0 ** lo, 10.0 ** max(hi, lo + 1))
+
+
+class _LogAxes:
+    """Maps (current, time) to page points inside a plot rectangle."""
+
+    def __init__(self, x0, y0, w, h, x_lim, y_lim):
+        import math
+
+        self.x0, self.y0, self.w, self.h = x0, y0, w, h
+        self.lx = (math.log10(x_lim[0]), math.log10(x_lim[1]))
+        self.ly = (math.log10(y_lim[0]), math.log10(y_lim[1]))
+
+    def px(self, x):
+        import numpy as np
+
+        return self.x0 + (np.log10(x) - self.lx[0]) / (self.lx[1] - self.lx[0]) * self.w
+
+    def py(self, y):
+        import numpy as np
+
+        return self.y0 + (np.log10(y) - self.ly[0]) / (self.ly[1] - self.ly[0]) * self.h
+
+
+def _draw_polyline(c, xs, ys):
+    if len(xs) < 2:
+        return
+    p = c.beginPath()
+    p.moveTo(float(xs[0]), float(ys[0]))
+    for x, y in zip(xs[1:].tolist(), ys[1:].tolist()):
+        p.lineTo(x, y)
+    c.drawPath(p, stroke=1, fill=0)
+
+
+def _draw_log_grid(c, ax: _LogAxes):
+    import math
+
+    from reportlab.lib import colors
+
+    c.setLineWidth(0.3)
+    c.setDash(2, 2)
+    for lim, along_x in ((ax.lx, True), (ax.ly, False)):
+        for d in range(int(math.floor(lim[0])), int(math.ceil(lim[1]))):
+            for m in range(1, 10):
+                v = m * 10.0 ** d
+                lv = math.log10(v)
+                if not lim[0] <= lv <= lim[1]:
+                    continue
+                c.setStrokeColor(colors.grey if m == 1 else colors.lightgrey)
+                if along_x:
+                    x = float(ax.px(v))
+                    c.line(x, ax.y0, x, ax.y0 + ax.h)
+                else:
+                    y = float(ax.py(v))
+                    c.line(ax.x0, y, ax.x0 + ax.w, y)
+    c.setDash()
+    c.setFont("Helvetica", 7)
+    c.setFillColor(colors.black)
+    for d in range(int(math.ceil(ax.lx[0])), int(math.floor(ax.lx[1])) + 1):
+        c.drawCentredString(float(ax.px(10.0 ** d)), ax.y0 - 10, f"{10.0 ** d:g}")
+    for d in range(int(math.ceil(ax.ly[0])), int(math.floor(ax.ly[1])) + 1):
+        c.drawRightString(ax.x0 - 4, float(ax.py(10.0 ** d)) - 2, f"{10.0 ** d:g}")
+
+
+def draw_tcc_page(c, page_size, study: dict, columns: int = TCC_PLOT_COLUMNS):
+    """
+    One log-log TCC page.
+
+    study keys: currents (n,), curves (n_relays, n); optional title,
+    labels, trip_times {"Q1": t}, fault_used, and series: extra curves as
+    dicts {"label", "currents", "times", "color", "marker"} (marker None
+    for a line, "x" / "s" for markers).
+    """
+    import numpy as np
+    from reportlab.lib import colors
+
+    width, height = page_size
+    margin = 54.0
+    x0, y0 = margin + 20, margin + 20
+    w, h = width - x0 - margin - 110, height - y0 - margin - 30
+    currents = np.asarray(study["currents"], dtype=float)
+    curves = np.atleast_2d(np.asarray(study["curves"], dtype=float))
+    series = study.get("series", ())
+    labels = study.get("labels") or [f"Q{i+1}" for i in range(curves.shape[0])]
+
+    x_lim = (float(currents.min()), float(currents.max()))
+    y_lim = _decade_limits(np.concatenate([curves.ravel()] + [np.ravel(s["times"]) for s in series]),
+                           TCC_TIME_LIMITS)
+    ax = _LogAxes(x0, y0, w, h, x_lim, y_lim)
+
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(x0 + w / 2, y0 + h + 14, study.get("title", "Time-Current Characteristics"))
+    c.setFont("Helvetica", 10)
+    c.drawCentredString(x0 + w / 2, y0 - 26, "Current (A)")
+    c.saveState()
+    c.translate(x0 - 34, y0 + h / 2)
+    c.rotate(90)
+    c.drawCentredString(0, 0, "Time (s)")
+    c.restoreState()
+    _draw_log_grid(c, ax)
+    c.setStrokeColor(colors.black)
+    c.setLineWidth(0.8)
+    c.rect(x0, y0, w, h)
+
+    legend = []
+    c.saveState()
+    clip = c.beginPath()
+    clip.rect(x0, y0, w, h)
+    c.clipPath(clip, stroke=0, fill=0)
+
+    trip_times = study.get("trip_times") or {}
+    fault = study.get("fault_used")
+    for i, label in enumerate(labels):
+        col = getattr(colors, TCC_COLORS[i % len(TCC_COLORS)])
+        c.setStrokeColor(col)
+        c.setLineWidth(1.8)
+        for xs, ys in downsample_polyline(currents, curves[i], columns, x_lim):
+            _draw_polyline(c, ax.px(xs), ax.py(np.clip(ys, y_lim[0] / 10, y_lim[1] * 10)))
+        legend.append((label, col, None))
+        if fault is not None and label in trip_times and float(trip_times[label]) > 0:
+            t = float(trip_times[label])
+            px, py = float(ax.px(fault)), float(ax.py(t))
+            c.setFillColor(col)
+            c.circle(px, py, 2.5, stroke=0, fill=1)
+            c.setFillColor(colors.black)
+            c.setFont("Helvetica", 7)
+            c.drawString(px + 3, py + 2, f"{t:.3f}s")
+
+    for s in series:
+        col = getattr(colors, s.get("color", "black"), colors.black)
+        c.setStrokeColor(col)
+        c.setLineWidth(1.2)
+        xs_all, ys_all = np.asarray(s["currents"], dtype=float), np.asarray(s["times"], dtype=float)
+        if s.get("marker") is None:
+            c.setDash(4, 2)
+            for xs, ys in downsample_polyline(xs_all, ys_all, columns, x_lim):
+                _draw_polyline(c, ax.px(xs), ax.py(ys))
+            c.setDash()
+        else:
+            ok = np.isfinite(xs_all) & np.isfinite(ys_all) & (xs_all > 0) & (ys_all > 0)
+            for px, py in zip(ax.px(xs_all[ok]).tolist(), ax.py(ys_all[ok]).tolist()):
+                if s["marker"] == "x":
+                    c.line(px - 3, py - 3, px + 3, py + 3)
+                    c.line(px - 3, py + 3, px + 3, py - 3)
+                else:
+                    c.rect(px - 2, py - 2, 4, 4, stroke=1, fill=0)
+        legend.append((s["label"], col, s.get("marker")))
+
+    if fault is not None:
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(1.2)
+        c.setDash(1, 2)
+        fx = float(ax.px(fault))
+        c.line(fx, y0, fx, y0 + h)
+        c.setDash()
+        legend.append(("Fault Level", colors.black, None))
+    c.restoreState()
+
+    c.setFont("Helvetica", 8)
+    ly = y0 + h - 6
+    for label, col, marker in legend:
+        c.setStrokeColor(col)
+        c.setLineWidth(1.8)
+        c.line(x0 + w + 12, ly + 3, x0 + w + 30, ly + 3)
+        c.setFillColor(colors.black)
+        c.drawString(x0 + w + 34, ly, label)
+        ly -= 12
+
+
+def draw_table(c, x, y, headers, rows, col_widths, font_size: float = 8, row_h: float = 14):
+    """Grid table with its top-left corner at (x, y); returns the y below it."""
+    from reportlab.lib import colors
+
+    total = sum(col_widths)
+    c.setLineWidth(0.5)
+    c.setStrokeColor(colors.black)
+    for r, cells in enumerate([headers] + list(rows)):
+        top = y - r * row_h
+        if r == 0:
+            c.setFillColor(colors.lightgrey)
+            c.rect(x, top - row_h, total, row_h, stroke=0, fill=1)
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica-Bold" if r == 0 else "Helvetica", font_size)
+        cx = x
+        for cell, cw in zip(cells, col_widths):
+            c.rect(cx, top - row_h, cw, row_h, stroke=1, fill=0)
+            c.drawCentredString(cx + cw / 2, top - row_h + 4, str(cell))
+            cx += cw
+    return y - (len(rows) + 1) * row_h
+
+
+def relay_settings_rows(relays) -> list:
+    """TCC relay dicts as the rows of the settings table (SETTINGS_HEADERS)."""
+    def num(v):
+        try:
+            return f"{float(v):.3f}"
+        except (TypeError, ValueError):
+            return "-"
+
+    return [
+        [
+            f"Q{i+1}",
+            "ON" if r["idmt_on"] else "OFF", num(r["pickup"]), num(r["tms"]),
+            "ON" if r["dt1_on"] else "OFF", num(r["dt1_pickup"]), num(r["dt1_time"]),
+            "ON" if r["dt2_on"] else "OFF", num(r["dt2_pickup"]), num(r["dt2_time"]),
+            r["curve"],
+        ]
+        for i, r in enumerate(relays)
+    ]
+
+
+def draw_settings_page(c, page_size, study: dict):
+    """Relay settings table plus the coordination report text (study keys relays, report_text)."""
+    width, height = page_size
+    margin = 54.0
+    y = height - margin
+    c.setFont("Helvetica-Bold", 14)
+    c.drawCentredString(width / 2, y, study.get("settings_title", "Relay Settings & Coordination Report"))
+    y -= 30
+    if study.get("relays"):
+        widths = [44, 34, 58, 44, 34, 58, 44, 34, 58, 44, 110]
+        scale = (width - 2 * margin) / sum(widths)
+        y = draw_table(c, margin, y, SETTINGS_HEADERS, relay_settings_rows(study["relays"]),
+                       [w * scale for w in widths])
+        y -= 24
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(margin, y, "Results Summary:")
+    y -= 16
+    c.setFont("Courier", 8)
+    for line in (study.get("report_text") or "").splitlines():
+        if y < margin:
+            c.showPage()
+            c.setFont("Courier", 8)
+            y = height - margin
+        c.drawString(margin, y, line[:150])
+        y -= 11
+
+
+def tcc_report_pdf_bytes(studies: Iterable[dict], columns: int = TCC_PLOT_COLUMNS) -> bytes:
+    """
+    Landscape PDF with a TCC page and a settings page per study (see
+    draw_tcc_page / draw_settings_page for the study keys). studies may be a
+    generator, so large batches are drawn one substation at a time.
+    """
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.pdfgen import canvas
+
+    page = landscape(letter)
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=page, pageCompression=1)
+    for study in studies:
+        draw_tcc_page(c, page, study, columns)
+        c.showPage()
+        draw_settings_page(c, page, study)
+        c.showPage()
+    c.save()
+    return buf.getvalue()
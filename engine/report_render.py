@@ -0,0 +1,127 @@
+"""
+Report Renderer (logic-only)
+
+Renders OC/EF settings reports from structured results instead of building
+them with string concatenation. The engines return:
+
+  settings       (equipment, fault_type, stage, pickup_a, ratio, tms, time_s) rows
+  report_head    ((label, value, unit), ...) summary line
+  report_blocks  ReportBlock per equipment, in report order (header fields)
+
+Every output format is fed from one line generator (iter_report_lines), so
+text, CSV and PDF come from the same rows and a report renders in time
+linear in its size. Text is written through io.StringIO; the PDF writer
+consumes the lines as they are produced.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+Field = Tuple[str, object, str]  # (label, value, unit)
+
+FAULT_LABELS = {"OC": "Overcurrent", "EF": "Earth Fault"}
+CSV_HEADER = ("EQUIPMENT", "FAULT TYPE", "STAGE", "PICKUP (A)", "RATIO (*In)", "TMS/DELAY", "TIME (s)")
+RULE = "=" * 60
+
+
+@dataclass(frozen=True, slots=True)
+class ReportBlock:
+    equipment: str
+    fields: Tuple[Field, ...]   # header "label=value unit" pairs, e.g. (("Load", 200.0, "A"), ("CT", 400.0, ""))
+
+
+# ---------------- line generators ----------------
+def head_line(fields: Sequence[Field]) -> str:
+    return " | ".join(f"{label}: {value}{unit}" for label, value, unit in fields)
+
+
+def stage_line(stage: str, pickup, ratio, tms, time_s) -> str:
+    """One ' - S1 (IDMT): Pickup=...' line; tms is None for DT stages."""
+    body = f"Pickup={pickup}A ({ratio}*In), "
+    body += f"Time={time_s}s" if tms is None else f"TMS={tms}, Time={time_s}s"
+    return f" - {stage + ':':<11}{body}"
+
+
+def iter_block_lines(blocks: Iterable[ReportBlock], settings: Sequence[tuple], fault_type: str) -> Iterator[str]:
+    """Equipment sections of one fault type; yields newline-terminated lines."""
+    stages = {}
+    for row in settings:
+        if row[1] == fault_type:
+            stages.setdefault(row[0], []).append(row)
+    for b in blocks:
+        yield f"{b.equipment}: " + ", ".join(f"{label}={value}{unit}" for label, value, unit in b.fields) + "\n"
+        for _, _, stage, pickup, ratio, tms, time_s in stages.get(b.equipment, ()):
+            yield stage_line(stage, pickup, ratio, tms, time_s) + "\n"
+        yield "\n"
+
+
+def iter_report_lines(result: dict, fault_type: str, prefix: Sequence[str] = ()) -> Iterator[str]:
+    """
+    One fault type's report from an engine result (calculate_grid(),
+    calculate_grid_parallel(), ...). prefix: lines printed before the head
+    (alerts), each newline-terminated.
+    """
+    yield from prefix
+    yield head_line(result["report_head"]) + "\n"
+    yield RULE + "\n"
+    yield from iter_block_lines(result["report_blocks"], result["settings"], fault_type)
+
+
+def iter_combined_lines(result: dict, fault_types: Sequence[str] = ("OC", "EF")) -> Iterator[str]:
+    """All fault types one after another, separated by a blank line (the PDF layout)."""
+    for i, ft in enumerate(fault_types):
+        if i:
+            yield "\n"
+            yield "\n"
+        yield from iter_report_lines(result, ft)
+
+
+# ---------------- writers ----------------
+def write_text(lines: Iterable[str], out) -> None:
+    for line in lines:
+        out.write(line)
+
+
+def render_text(lines: Iterable[str]) -> str:
+    buf = io.StringIO()
+    write_text(lines, buf)
+    return buf.getvalue()
+
+
+def report_text(result: dict, fault_type: str, prefix: Sequence[str] = ()) -> str:
+    return render_text(iter_report_lines(result, fault_type, prefix))
+
+
+def iter_csv_rows(settings: Sequence[tuple]) -> Iterator[list]:
+    """Tabulated settings: OC rows first, then EF; DT delays in the TMS/DELAY column."""
+    for ft in FAULT_LABELS:
+        for eq, row_ft, stage, pickup, ratio, tms, time_s in settings:
+            if row_ft == ft:
+                yield [eq, FAULT_LABELS[ft], stage, pickup, ratio, f"{time_s}s" if tms is None else tms, time_s]
+
+
+def write_settings_csv(settings: Sequence[tuple], out) -> None:
+    writer = csv.writer(out)
+    writer.writerow(CSV_HEADER)
+    writer.writerows(iter_csv_rows(settings))
+
+
+def settings_csv_bytes(result: dict) -> bytes:
+    buf = io.StringIO()
+    write_settings_csv(result["settings"], buf)
+    return buf.getvalue().encode("utf-8")
+
+
+def report_pdf_bytes(title: str, result: dict) -> bytes:
+    from engine.pdf_utils import lines_to_pdf_bytes
+
+    return lines_to_pdf_bytes(title, (line.rstrip("\n") for line in iter_combined_lines(result)))
+
+
+def rendered_reports(result: dict, prefix: Sequence[str] = ()) -> List[str]:
+    """[oc_report, ef_report] texts."""
+    return [report_text(result, ft, prefix) for ft in ("OC", "EF")]
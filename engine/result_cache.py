@@ -0,0 +1,198 @@
+"""
+Shared Result Cache (logic-only)
+
+Process-wide cache of engine results and rendered artifacts (PDF bytes,
+reports), shared by every Streamlit session. Values are stored pickled, so
+callers always get an independent copy (st.cache_data semantics).
+
+Memory tier: LRU, bounded by total pickled size.
+Disk tier (optional): one file per key in a directory shared by server
+workers, bounded by total file size. Enabled by passing disk_dir or by
+setting PCTOOL_CACHE_DIR.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+# Bump when engine formulas change so stale disk entries are never served.
+CACHE_VERSION = 2
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 512 * 1024 * 1024
+
+_MISSING = object()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        disk_dir: Optional[str] = None,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------------- keys ----------------
+    @staticmethod
+    def make_key(fn: Callable, args: tuple, kwargs: dict) -> Optional[str]:
+        """sha256 over the function identity and pickled arguments; None if unpicklable."""
+        name = f"{getattr(fn, '__module__', '')}.{getattr(fn, '__qualname__', repr(fn))}"
+        try:
+            blob = pickle.dumps((CACHE_VERSION, name, args, sorted(kwargs.items())), protocol=4)
+        except Exception:
+            return None
+        return hashlib.sha256(blob).hexdigest()
+
+    # ---------------- memory tier ----------------
+    def _mem_put(self, key: str, blob: bytes):
+        # Caller holds the lock.
+        if len(blob) > self.max_bytes:
+            return
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= len(old)
+        self._mem[key] = blob
+        self._mem_bytes += len(blob)
+        while self._mem_bytes > self.max_bytes:
+            _, evicted = self._mem.popitem(last=False)
+            self._mem_bytes -= len(evicted)
+            self.evictions += 1
+
+    # ---------------- disk tier ----------------
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".pkl")
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, blob: bytes):
+        if not self.disk_dir or len(blob) > self.max_disk_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, self._disk_path(key))
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self._disk_trim()
+
+    def _disk_trim(self):
+        entries = []
+        total = 0
+        with os.scandir(self.disk_dir) as it:
+            for e in it:
+                if e.name.endswith(".pkl"):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        if total <= self.max_disk_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+    # ---------------- public API ----------------
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            blob = self._mem.get(key)
+            if blob is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return pickle.loads(blob)
+
+        blob = self._disk_get(key)
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+                return default
+            self.disk_hits += 1
+            self._mem_put(key, blob)
+        return pickle.loads(blob)
+
+    def put(self, key: str, value: Any):
+        try:
+            blob = pickle.dumps(value, protocol=4)
+        except Exception:
+            return
+        with self._lock:
+            self._mem_put(key, blob)
+        self._disk_put(key, blob)
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Returns fn(*args, **kwargs), computing it only on a cache miss."""
+        key = self.make_key(fn, args, kwargs)
+        if key is None:
+            return fn(*args, **kwargs)
+
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = fn(*args, **kwargs)
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._mem),
+                "bytes": self._mem_bytes,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResultCache:
+    """Process-wide cache; the disk tier follows the PCTOOL_CACHE_DIR env var."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(disk_dir=os.environ.get("PCTOOL_CACHE_DIR") or None)
+        return _cache
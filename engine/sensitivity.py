@@ -0,0 +1,177 @@
+"""
+Coordination Sensitivity (logic-only)
+
+Analytic derivatives of trip time and grading margin with respect to each
+relay's TMS, pickup and DT times, from the closed-form IEC formula
+
+    t = TMS * k / (M^alpha - 1),  M = I / Ip
+    dt/dTMS = k / (M^alpha - 1)
+    dt/dIp  = TMS * k * alpha * M^alpha / (Ip * (M^alpha - 1)^2)
+
+and of the grid engine's TMS back-calculation TMS = t_req * (M^alpha - 1) / k.
+
+A relay's trip time is that of its fastest operating stage, so only that
+stage's parameters have a non-zero derivative. All functions broadcast, so
+they run over many relays / studies in one pass; the hints built from them
+are first-order estimates.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+
+from engine.coordination_rules import DEFAULT_RULES, RuleSet, compile_rules
+from engine.tcc_engine import IEC_CURVES, tcc_relay_bank, transformer_calculations
+
+STAGE_NONE, STAGE_IDMT, STAGE_DT1, STAGE_DT2 = -1, 0, 1, 2
+PARAMS = ("tms", "pickup", "dt1_time", "dt2_time")
+
+
+def trip_time_gradients(
+    I,
+    idmt_on, pickup, tms, k, alpha,
+    dt1_on, dt1_pickup, dt1_time,
+    dt2_on, dt2_pickup, dt2_time,
+) -> dict:
+    """
+    Same arguments as models.merged_trip_time().
+
+    Returns arrays (broadcast shape): t, stage (STAGE_*), and the partial
+    derivatives d_tms, d_pickup, d_dt1_time, d_dt2_time of t.
+    """
+    I = np.asarray(I, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        M = I / pickup
+        Ma = M ** alpha
+        denom = Ma - 1.0
+        on_idmt = idmt_on & (I > pickup)
+        t_idmt = np.where(on_idmt, tms * (k / denom), np.nan)
+        g_tms = np.where(on_idmt, k / denom, 0.0)
+        g_pickup = np.where(on_idmt, tms * k * alpha * Ma / (pickup * denom ** 2), 0.0)
+    t_dt1 = np.where(dt1_on & (I >= dt1_pickup), dt1_time, np.nan)
+    t_dt2 = np.where(dt2_on & (I >= dt2_pickup), dt2_time, np.nan)
+
+    stack = np.stack(np.broadcast_arrays(t_idmt, t_dt1, t_dt2))
+    none = np.all(np.isnan(stack), axis=0)
+    stage = np.where(none, STAGE_NONE, np.argmin(np.where(np.isnan(stack), np.inf, stack), axis=0))
+    t = np.where(none, np.nan, np.min(np.where(np.isnan(stack), np.inf, stack), axis=0))
+
+    is_idmt = stage == STAGE_IDMT
+    return {
+        "t": t,
+        "stage": stage,
+        "d_tms": np.where(is_idmt, g_tms, 0.0),
+        "d_pickup": np.where(is_idmt, g_pickup, 0.0),
+        "d_dt1_time": (stage == STAGE_DT1).astype(float),
+        "d_dt2_time": (stage == STAGE_DT2).astype(float),
+    }
+
+
+def backcalc_tms_gradients(t_req, fault, pickup, curve: str = "Standard Inverse") -> dict:
+    """
+    Gradients of the grid engine's back-calculated TMS
+    (TMS = t_req / (k / (max(1.05, I/Ip)^alpha - 1))) w.r.t. the required
+    time and the pickup. The pickup derivative is 0 where M is clamped at 1.05.
+    """
+    k, alpha = IEC_CURVES[curve]
+    t_req = np.asarray(t_req, dtype=float)
+    M_raw = np.asarray(fault, dtype=float) / np.asarray(pickup, dtype=float)
+    M = np.maximum(1.05, M_raw)
+    Ma = M ** alpha
+    return {
+        "tms": t_req * (Ma - 1.0) / k,
+        "d_t_req": (Ma - 1.0) / k,
+        "d_pickup": np.where(M_raw > 1.05, -t_req * alpha * Ma / (k * np.asarray(pickup, dtype=float)), 0.0),
+    }
+
+
+def coordination_sensitivity(
+    MVA: float,
+    LV: float,
+    HV: float,
+    Z: float,
+    fault_current: Optional[float],
+    relays: List[dict],
+    rules: RuleSet = DEFAULT_RULES,
+) -> dict:
+    """
+    Trip-time gradients of Q1..Q5 at the (clamped) fault and the margin
+    gradients of every grading pair of rules. Margins are taken between trip
+    times rounded to ms, like the coordination report.
+
+    Returns {"relays": {"Q1": {"t", "stage", "d_tms", ...}},
+             "pairs": [{"downstream", "upstream", "cti", "margin",
+                        "d_margin": {"Q4.tms": ..., "Q1.tms": ...}}]}
+    """
+    if not fault_current:
+        raise ValueError("A fault current is required for the sensitivity analysis.")
+
+    _, isc_lv, hv_factor = transformer_calculations(MVA, LV, HV, Z)
+    fault = min(float(fault_current), float(isc_lv)) if isc_lv else float(fault_current)
+    _, bank = tcc_relay_bank(relays, hv_factor)
+    cols = {name: v[:, 0] for name, v in bank.columns().items()}
+    g = trip_time_gradients(fault / bank.scale, **cols)
+
+    names = [f"Q{i+1}" for i in range(len(bank))]
+    per_relay = {
+        q: {key: float(g[key][i]) if key != "stage" else int(g[key][i]) for key in g}
+        for i, q in enumerate(names)
+    }
+
+    compiled = compile_rules(rules, tuple(names))
+    d_idx, u_idx = compiled.d_idx, compiled.u_idx
+    # margins on trip times rounded to ms, as build_coordination_report grades them;
+    # the derivatives stay those of the unrounded curve
+    t_ms = np.array([round(float(t), 3) for t in g["t"]])
+    margins = t_ms[u_idx] - t_ms[d_idx]
+
+    pairs = []
+    for j, ((d, u), cti) in enumerate(zip(compiled.pairs, compiled.cti.tolist())):
+        d_margin = {}
+        for p in PARAMS:
+            d_margin[f"{u}.{p}"] = float(g["d_" + p][u_idx[j]])
+            d_margin[f"{d}.{p}"] = -float(g["d_" + p][d_idx[j]])
+        pairs.append({"downstream": d, "upstream": u, "cti": cti, "margin": float(margins[j]), "d_margin": d_margin})
+
+    return {"fault": fault, "relays": per_relay, "pairs": pairs}
+
+
+def what_to_change(sens: dict, relays: List[dict]) -> List[str]:
+    """
+    First-order setting changes that would restore each violated pair's CTI
+    (one option per line; apply one and re-plot).
+    """
+    hints = []
+    for p in sens["pairs"]:
+        d, u, cti, margin = p["downstream"], p["upstream"], p["cti"], p["margin"]
+        if np.isnan(margin) or margin >= cti:
+            continue
+        deficit = cti - margin
+        options = []
+
+        ru, rd = sens["relays"][u], sens["relays"][d]
+        cu, cd = relays[int(u[1:]) - 1], relays[int(d[1:]) - 1]
+
+        if ru["stage"] == STAGE_IDMT and ru["d_tms"] > 0:
+            dtms = deficit / ru["d_tms"]
+            options.append(f"raise {u} TMS by {dtms:.3f} (to {float(cu['tms']) + dtms:.3f})")
+        elif ru["stage"] in (STAGE_DT1, STAGE_DT2):
+            key = "dt1_time" if ru["stage"] == STAGE_DT1 else "dt2_time"
+            options.append(f"raise {u} {key.split('_')[0].upper()} time by {deficit:.3f}s (to {float(cu[key]) + deficit:.3f}s)")
+
+        if rd["stage"] == STAGE_IDMT and rd["d_tms"] > 0:
+            dtms = deficit / rd["d_tms"]
+            if float(cd["tms"]) - dtms > 0:
+                options.append(f"lower {d} TMS by {dtms:.3f} (to {float(cd['tms']) - dtms:.3f})")
+        elif rd["stage"] in (STAGE_DT1, STAGE_DT2):
+            key = "dt1_time" if rd["stage"] == STAGE_DT1 else "dt2_time"
+            if float(cd[key]) - deficit >= 0:
+                options.append(f"lower {d} {key.split('_')[0].upper()} time by {deficit:.3f}s (to {float(cd[key]) - deficit:.3f}s)")
+
+        if options:
+            hints.append(f"{d}->{u} short by {deficit:.3f}s: " + "; or ".join(options))
+        else:
+            hints.append(f"{d}->{u} short by {deficit:.3f}s: no single TMS/DT change found; review pickups/stages.")
+    return hints
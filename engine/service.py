@@ -0,0 +1,340 @@
+"""
+Local JSON Calculation Service
+
+Exposes the engines over HTTP for SCADA / asset-management tooling, without
+the Streamlit UI. Stdlib only (http.server), HTTP/1.1 keep-alive.
+
+Endpoints (JSON in, JSON out):
+  GET  /health        service status and cache counters
+  POST /tcc           compute_tcc_plot + build_coordination_report
+  POST /coordination  build_coordination_report from given trip times
+                      (/tcc and /coordination accept optional "rules")
+  POST /ocef          compute_ocef
+  POST /grid          calculate_grid
+  POST /batch         {"studies": [{"endpoint": "tcc", "body": {...}}, ...]}
+
+Studies run on a worker pool (threads by default, processes with
+--processes). Identical requests that are in flight at the same time are
+coalesced onto one computation; finished results go through the shared
+result cache.
+
+Usage:
+  python -m engine.service --port 8765 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import math
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+
+from engine.result_cache import ResultCache, get_cache
+
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+
+# ---------------- JSON helpers ----------------
+def _jsonable(obj):
+    """NumPy arrays/scalars -> lists/floats, NaN/inf -> None, dataclasses -> dicts."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return _jsonable(dataclasses.asdict(obj))
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if hasattr(obj, "tolist"):
+        return _jsonable(obj.tolist())
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+# ---------------- study handlers (top-level so process pools can pickle them) ----------------
+def _rules(body: dict):
+    """Optional site-specific coordination rules ("rules": JSON rule set, see engine.coordination_rules)."""
+    from engine.coordination_rules import DEFAULT_RULES, load_rules
+
+    return load_rules(body["rules"]) if body.get("rules") else DEFAULT_RULES
+
+
+def study_tcc(body: dict) -> dict:
+    from engine.tcc_engine import compute_tcc_plot, build_coordination_report
+
+    currents, curves, trip_times, flc_lv, isc_lv, fault_used = compute_tcc_plot(
+        float(body["mva"]),
+        float(body["lv"]),
+        float(body["hv"]),
+        float(body["z"]),
+        float(body["fault"]) if body.get("fault") else None,
+        body["relays"],
+    )
+    report, results = build_coordination_report(trip_times, flc_lv, isc_lv, fault_used, _rules(body))
+    out = {
+        "trip_times": trip_times,
+        "flc_lv": flc_lv,
+        "isc_lv": isc_lv,
+        "fault_used": fault_used,
+        "report": report,
+        "results": [
+            {"downstream": d, "upstream": u, "margin": m, "cti": cti, "ok": ok}
+            for d, u, m, cti, ok in results
+        ],
+    }
+    if body.get("include_curves", True):
+        out["currents"] = currents
+        out["curves"] = curves
+    return _jsonable(out)
+
+
+def study_coordination(body: dict) -> dict:
+    from engine.tcc_engine import build_coordination_report
+
+    report, results = build_coordination_report(
+        {k: float(v) for k, v in body["trip_times"].items()},
+        body.get("flc_lv"),
+        body.get("isc_lv"),
+        body.get("fault"),
+        _rules(body),
+    )
+    return _jsonable({
+        "report": report,
+        "results": [
+            {"downstream": d, "upstream": u, "margin": m, "cti": cti, "ok": ok}
+            for d, u, m, cti, ok in results
+        ],
+    })
+
+
+def study_ocef(body: dict) -> dict:
+    from engine.ocef_engine import SystemInputs, FeederInputs, compute_ocef
+
+    sys_in = SystemInputs(**{k: float(v) for k, v in body["system"].items()})
+    feeders = [FeederInputs(load_a=float(f["load_a"]), ct_a=float(f["ct_a"])) for f in body["feeders"]]
+    for i, f in enumerate(feeders):
+        if not f.load_a > 0:
+            raise ValueError(f"Feeder {i+1} load (load_a) must be a positive number.")
+        if not f.ct_a > 0:
+            raise ValueError(f"Feeder {i+1} CT (ct_a) must be a positive number.")
+    return _jsonable(compute_ocef(sys_in, feeders))
+
+
+def study_grid(body: dict) -> dict:
+    from engine.grid_engine import calculate_grid
+
+    for i, f in enumerate(body["feeders"]):
+        if not float(f["load"]) > 0:
+            raise ValueError(f"Feeder {i+1} load must be a positive number.")
+        if not float(f["ct"]) >= 0:
+            raise ValueError(f"Feeder {i+1} CT must be zero or positive.")
+    return _jsonable(calculate_grid(
+        mva=float(body["mva"]),
+        hv_kv=float(body["hv_kv"]),
+        lv_kv=float(body["lv_kv"]),
+        z_pct=float(body["z_pct"]),
+        cti_ms=float(body["cti_ms"]),
+        q4_ct=float(body["q4_ct"]),
+        q5_ct=float(body["q5_ct"]),
+        feeders=body["feeders"],
+    ))
+
+
+STUDIES: Dict[str, Callable[[dict], dict]] = {
+    "tcc": study_tcc,
+    "coordination": study_coordination,
+    "ocef": study_ocef,
+    "grid": study_grid,
+}
+
+
+class StudyError(Exception):
+    """Raised for malformed study requests (reported as HTTP 400)."""
+
+
+# ---------------- dispatcher ----------------
+class Dispatcher:
+    """Runs studies on a pool with in-flight request coalescing and result caching."""
+
+    def __init__(self, workers: int = 4, processes: bool = False, cache: ResultCache | None = None):
+        pool_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self._pool = pool_cls(max_workers=workers)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.cache = cache if cache is not None else get_cache()
+        self.coalesced = 0
+
+    @staticmethod
+    def _key(endpoint: str, body: dict) -> str:
+        blob = json.dumps([endpoint, body], sort_keys=True, separators=(",", ":"))
+        return "svc:" + hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def submit(self, endpoint: str, body: dict) -> Future:
+        fn = STUDIES.get(endpoint)
+        if fn is None:
+            raise StudyError(f"Unknown study endpoint: {endpoint}")
+        if not isinstance(body, dict):
+            raise StudyError("Study body must be a JSON object.")
+
+        key = self._key(endpoint, body)
+        cached = self.cache.get(key)
+        if cached is not None:
+            done: Future = Future()
+            done.set_result(cached)
+            return done
+
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return fut
+            fut = self._pool.submit(fn, body)
+            self._inflight[key] = fut
+
+        def _done(f: Future, key=key):
+            with self._lock:
+                self._inflight.pop(key, None)
+            if f.exception() is None:
+                self.cache.put(key, f.result())
+
+        fut.add_done_callback(_done)
+        return fut
+
+    def run(self, endpoint: str, body: dict) -> dict:
+        return self.submit(endpoint, body).result()
+
+    def run_batch(self, studies: list) -> list:
+        """Submits every study first, then collects, so the pool works on them concurrently."""
+        futures = []
+        for s in studies:
+            try:
+                futures.append(self.submit(s["endpoint"], s.get("body", {})))
+            except (StudyError, KeyError, TypeError) as e:
+                futures.append(e)
+
+        out = []
+        for f in futures:
+            if isinstance(f, Exception):
+                out.append({"ok": False, "error": str(f)})
+                continue
+            try:
+                out.append({"ok": True, "result": f.result()})
+            except Exception as e:
+                out.append({"ok": False, "error": str(e)})
+        return out
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+# ---------------- HTTP layer ----------------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    server_version = "pctool-service/1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            dispatcher = self.server.dispatcher
+            self._send(200, {
+                "status": "ok",
+                "studies": sorted(STUDIES),
+                "coalesced": dispatcher.coalesced,
+                "cache": dispatcher.cache.stats(),
+            })
+        else:
+            self._send(404, {"error": f"Not found: {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(413, {"error": "Request body too large."})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            self._send(400, {"error": f"Invalid JSON: {e}"})
+            return
+
+        endpoint = self.path.strip("/")
+        dispatcher = self.server.dispatcher
+        try:
+            if endpoint == "batch":
+                if not isinstance(body, dict) or not isinstance(body.get("studies", []), list):
+                    raise StudyError('Batch body must be a JSON object {"studies": [...]}.')
+                self._send(200, {"results": dispatcher.run_batch(body.get("studies", []))})
+            elif endpoint in STUDIES:
+                self._send(200, dispatcher.run(endpoint, body))
+            else:
+                self._send(404, {"error": f"Not found: {self.path}"})
+        except (StudyError, KeyError, TypeError, ValueError, ArithmeticError) as e:
+            self._send(400, {"error": str(e) if not isinstance(e, KeyError) else f"Missing field: {e}"})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+
+
+class CalcServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, workers: int = 4,
+                 processes: bool = False, verbose: bool = False):
+        super().__init__((host, port), _Handler)
+        self.dispatcher = Dispatcher(workers=workers, processes=processes)
+        self.verbose = verbose
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "CalcServer":
+        """Serves in a background thread (port=0 picks a free port); returns self."""
+        self._thread = threading.Thread(target=self.serve_forever, name="pctool-service", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.dispatcher.shutdown()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Local JSON calculation service for the protection engines.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    server = CalcServer(args.host, args.port, args.workers, args.processes, args.verbose)
+    print(f"Serving on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.dispatcher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,45 @@
-import numpy as np
+import math
+
+# numpy (and engine.models, which needs it) is imported inside the functions
+# that use it, so importing the engine and evaluating single IEC points stays
+# cheap for CLI and worker processes.
 
 # ---------------- CTI VALUES ----------------
-CTI_Q1_Q4 = 0.150
-CTI_Q1_Q5 = 0.300
-CTI_Q4_Q5 = 0.150
+# The checks themselves are declared in engine.coordination_rules; these
+# names stay for callers that read the default CTIs / pair list.
+from engine.coordination_rules import CTI_TYPES, DEFAULT_RULES, RuleSet, evaluate_trip_dict
+
+CTI_Q1_Q4 = dict(CTI_TYPES)["feeder-incomer"]
+CTI_Q1_Q5 = dict(CTI_TYPES)["feeder-hv"]
+CTI_Q4_Q5 = dict(CTI_TYPES)["incomer-hv"]
+
+# (downstream, upstream, CTI) pairs checked by build_coordination_report (default rules)
+COORDINATION_CHECKS = DEFAULT_RULES.checks()
+
+
+# ---------------- CURRENT AXIS ----------------
+# compute_tcc_plot evaluates every curve on np.logspace(*TCC_CURRENT_AXIS).
+TCC_CURRENT_AXIS = (1, 5, 800)
+
+
+def tcc_currents():
+    import numpy as np
+
+    return np.logspace(*TCC_CURRENT_AXIS)
 
 
 # ---------------- IEC CURVE ----------------
+IEC_CURVES = {
+    "Standard Inverse": (0.14, 0.02),
+    "Very Inverse": (13.5, 1.0),
+    "Extremely Inverse": (80.0, 2.0),
+}
+
+
 def iec_curve(I: float, Ip: float, TMS: float, curve: str) -> float:
     if I <= Ip:
-        return np.nan
-    curves = {
-        "Standard Inverse": (0.14, 0.02),
-        "Very Inverse": (13.5, 1.0),
-        "Extremely Inverse": (80.0, 2.0),
-    }
-    k, alpha = curves[curve]
+        return math.nan
+    k, alpha = IEC_CURVES[curve]
     M = I / Ip
     return TMS * (k / ((M ** alpha) - 1.0))
 
@@ -25,12 +49,66 @@ def transformer_calculations(MVA: float, LV: float, HV: float, Z: float):
     Returns:
       FLC_LV (A), Isc_LV (A), HV_factor (HV/LV)
     """
-    FLC_LV = (MVA * 1000.0) / (np.sqrt(3.0) * LV)
+    FLC_LV = (MVA * 1000.0) / (math.sqrt(3.0) * LV)
     Isc_LV = FLC_LV / (Z / 100.0)
     HV_factor = HV / LV
     return FLC_LV, Isc_LV, HV_factor
 
 
+def tcc_relay_bank(relays: list[dict], hv_factor: float):
+    """
+    Validated Q1..Q5 settings and their RelayBank as compute_tcc_plot sees them:
+    DT2 applies to Q4/Q5 only and Q5 sits on the HV side (currents / hv_factor).
+    Returns: (list[RelaySettings], RelayBank)
+    """
+    from engine.models import RelaySettings, RelayBank
+
+    settings = []
+    for i in range(5):
+        s = RelaySettings.from_dict(relays[i])
+        if i < 3:
+            s.dt2_on = False
+        settings.append(s)
+    return settings, RelayBank(settings, scale=[1.0, 1.0, 1.0, 1.0, hv_factor])
+
+
+# ---------------- INRUSH / COLD-LOAD OVERLAYS ----------------
+# (multiple of LV FLC, time s) points a relay curve must stay above;
+# inrush currents are capped at Isc (LV), which limits them as well.
+INRUSH_POINTS = ((12.0, 0.1),)
+COLD_LOAD_POINTS = ((6.0, 1.0), (3.0, 10.0), (2.0, 900.0))
+OVERLAY_RELAYS = ("Q4", "Q5")
+
+
+def _tcc_plot(MVA, LV, HV, Z, fault_current, relays, extra_currents=()):
+    """compute_tcc_plot plus the trip times (n_relays, n_extra) at extra_currents from the same curve pass."""
+    import numpy as np
+
+    currents = tcc_currents()
+    flc_lv, isc_lv, hv_factor = transformer_calculations(MVA, LV, HV, Z)
+
+    # Clamp fault if above Isc_LV (same behavior as Tkinter warning)
+    fault_clamped = fault_current
+    if isc_lv and fault_current and fault_current > isc_lv:
+        fault_clamped = float(isc_lv)
+
+    settings, bank = tcc_relay_bank(relays, hv_factor)
+    scaling = bank.scale.tolist()
+    n = currents.size
+    all_times = bank.trip_times(np.concatenate([currents, np.asarray(extra_currents, dtype=float)]))
+    merged_curves = list(all_times[:, :n])
+
+    # Intersection at fault (scalar path, identical rounding to the per-point loop)
+    trip_times: dict[str, float] = {}
+    if fault_clamped:
+        for i, s in enumerate(settings):
+            t_f = s.trip_time(fault_clamped / scaling[i])
+            if not math.isnan(t_f):
+                trip_times[f"Q{i+1}"] = round(float(t_f), 3)
+
+    return currents, merged_curves, trip_times, flc_lv, isc_lv, fault_clamped, all_times[:, n:]
+
+
 def compute_tcc_plot(
     MVA: float,
     LV: float,
@@ -56,82 +134,66 @@ def compute_tcc_plot(
     Returns:
       currents, merged_curves(list[np.ndarray]), trip_times(dict), flc_lv, isc_lv, fault_current_clamped
     """
-    currents = np.logspace(1, 5, 800)
-    flc_lv, isc_lv, hv_factor = transformer_calculations(MVA, LV, HV, Z)
+    return _tcc_plot(MVA, LV, HV, Z, fault_current, relays)[:6]
 
-    # Clamp fault if above Isc_LV (same behavior as Tkinter warning)
-    fault_clamped = fault_current
-    if isc_lv and fault_current and fault_current > isc_lv:
-        fault_clamped = float(isc_lv)
 
-    merged_curves = []
-    trip_times: dict[str, float] = {}
+def compute_tcc_with_overlays(
+    MVA: float,
+    LV: float,
+    HV: float,
+    Z: float,
+    fault_current: float | None,
+    relays: list[dict],
+    inrush_points=INRUSH_POINTS,
+    cold_load_points=COLD_LOAD_POINTS,
+    check_relays=OVERLAY_RELAYS,
+):
+    """
+    compute_tcc_plot() plus transformer inrush and cold-load pickup points
+    (multiples of LV FLC, on the plot's LV current axis), evaluated in the
+    same curve pass. A checked relay fails a point when it would trip at or
+    before the point's time.
 
-    for i in range(5):
-        r = relays[i]
-
-        current_scaling = hv_factor if i == 4 else 1.0  # Q5 on HV side
-        curve_vals = []
-
-        for I in currents:
-            I_scaled = I / current_scaling
-            times = []
-
-            if r["idmt_on"]:
-                t_idmt = iec_curve(I_scaled, r["pickup"], r["tms"], r["curve"])
-                if not np.isnan(t_idmt):
-                    times.append(t_idmt)
-
-            if r["dt1_on"]:
-                try:
-                    if I_scaled >= r["dt1_pickup"]:
-                        times.append(r["dt1_time"])
-                except Exception:
-                    pass
-
-            if i >= 3 and r["dt2_on"]:
-                try:
-                    if I_scaled >= r["dt2_pickup"]:
-                        times.append(r["dt2_time"])
-                except Exception:
-                    pass
-
-            curve_vals.append(min(times) if times else np.nan)
-
-        merged = np.array(curve_vals, dtype=float)
-        merged_curves.append(merged)
-
-        # Intersection at fault
-        if fault_clamped:
-            I_fault_scaled = fault_clamped / current_scaling
-            intersection_times = []
-
-            if r["idmt_on"]:
-                t_f = iec_curve(I_fault_scaled, r["pickup"], r["tms"], r["curve"])
-                if not np.isnan(t_f):
-                    intersection_times.append(t_f)
-
-            if r["dt1_on"]:
-                try:
-                    if I_fault_scaled >= r["dt1_pickup"]:
-                        intersection_times.append(r["dt1_time"])
-                except Exception:
-                    pass
-
-            if i >= 3 and r["dt2_on"]:
-                try:
-                    if I_fault_scaled >= r["dt2_pickup"]:
-                        intersection_times.append(r["dt2_time"])
-                except Exception:
-                    pass
-
-            if intersection_times:
-                trip_times[f"Q{i+1}"] = round(float(min(intersection_times)), 3)
-
-    return currents, merged_curves, trip_times, flc_lv, isc_lv, fault_clamped
-
-
-def build_coordination_report(trip_times: dict[str, float], flc_lv: float | None, isc_lv: float | None, fault: float | None):
+    Returns the 6-tuple of compute_tcc_plot followed by
+      overlays = {"inrush": {"currents", "times"}, "cold_load": {...},
+                  "checks": [(overlay, relay, current, time, trip_time, ok)], "ok": bool}
+    """
+    import numpy as np
+
+    flc_lv, isc_lv, _ = transformer_calculations(MVA, LV, HV, Z)
+    groups = {"inrush": inrush_points, "cold_load": cold_load_points}
+    overlays = {}
+    names, pts = [], []
+    for name, points in groups.items():
+        arr = np.asarray(points, dtype=float).reshape(-1, 2) * [flc_lv, 1.0]
+        if name == "inrush" and isc_lv:
+            arr[:, 0] = np.minimum(arr[:, 0], isc_lv)
+        overlays[name] = {"currents": arr[:, 0], "times": arr[:, 1]}
+        names += [name] * len(arr)
+        pts.append(arr)
+    pts = np.vstack(pts)
+
+    *plot, point_times = _tcc_plot(MVA, LV, HV, Z, fault_current, relays, pts[:, 0])
+
+    rows = [int(q[1:]) - 1 for q in check_relays]
+    t = point_times[rows]                                 # (n_checked, n_points)
+    ok = np.isnan(t) | (t > pts[:, 1])
+    overlays["checks"] = [
+        (names[j], q, float(pts[j, 0]), float(pts[j, 1]), None if np.isnan(t[r, j]) else float(t[r, j]), bool(ok[r, j]))
+        for r, q in enumerate(check_relays)
+        for j in range(pts.shape[0])
+    ]
+    overlays["ok"] = bool(ok.all())
+    return (*plot, overlays)
+
+
+def build_coordination_report(
+    trip_times: dict[str, float],
+    flc_lv: float | None,
+    isc_lv: float | None,
+    fault: float | None,
+    rules: RuleSet = DEFAULT_RULES,
+):
     lines = []
     lines.append("Coordination Report")
     lines.append("=" * 20)
@@ -147,18 +209,157 @@ def build_coordination_report(trip_times: dict[str, float], flc_lv: float | None
     lines.append("")
     lines.append("Coordination Results:")
 
-    checks = [
-        ("Q1", "Q4", CTI_Q1_Q4), ("Q2", "Q4", CTI_Q1_Q4), ("Q3", "Q4", CTI_Q1_Q4),
-        ("Q1", "Q5", CTI_Q1_Q5), ("Q2", "Q5", CTI_Q1_Q5), ("Q3", "Q5", CTI_Q1_Q5),
-        ("Q4", "Q5", CTI_Q4_Q5),
-    ]
-
+    compiled, ev = evaluate_trip_dict(rules, trip_times, rules.relays())
     results = []
-    for d, u, cti in checks:
-        if d in trip_times and u in trip_times:
-            margin = trip_times[u] - trip_times[d]
-            ok = margin >= cti
+    for j, (d, u) in enumerate(compiled.pairs):
+        if ev["evaluated"][j]:
+            margin, cti, ok = float(ev["margin"][j]), float(compiled.cti[j]), bool(ev["pair_ok"][j])
             results.append((d, u, margin, cti, ok))
             lines.append(f"{d}->{u}: {margin:.3f}s {'OK' if ok else 'NOT OK'}")
 
+    for j, label in enumerate(compiled.limit_labels):
+        q = compiled.names[compiled.limit_idx[j]]
+        t = float(ev["limit_time"][j])
+        status = "OK" if ev["limit_ok"][j] else "NOT OK"
+        lines.append(f"{q} {label}: {'no trip' if math.isnan(t) else f'{t:.3f}s'} {status}")
+
     return "\n".join(lines), results
+
+
+# ---------------- TIME-DOMAIN (DYNAMIC) ----------------
+# For non-constant fault currents (decaying, motor contribution) the IDMT
+# stage is modelled as an integrator that advances by dt / t(I) per step and
+# trips when it reaches 1. Arrays use the last axis for time; relay settings
+# broadcast against the other axes, so (profiles, relays, steps) runs in one
+# pass. Below pickup the integrator resets:
+#   "instantaneous"  back to 0 at once (numerical relays)
+#   "definite"       linearly, reset_time seconds from 1 to 0
+#   "inverse"        IEC 60255-151 style, rate (1 - M^2) / (TMS * reset_time)
+RESET_MODES = ("instantaneous", "definite", "inverse")
+MAX_IDMT_RATE = 1e12  # 1/s, stands in for an instantaneous (TMS=0) IDMT stage
+
+
+def _restarting_cumsum(inc, restart, start):
+    """Cumulative sum along the last axis that is 0 at restart steps; continues from start before the first one."""
+    import numpy as np
+
+    c = np.cumsum(inc, axis=-1)
+    steps = np.arange(inc.shape[-1])
+    last = np.maximum.accumulate(np.where(restart, steps, -1), axis=-1)
+    base = np.where(last >= 0, np.take_along_axis(c, np.maximum(last, 0), axis=-1), -np.asarray(start)[..., None])
+    return c - base
+
+
+def _first_step(mask):
+    """Index of the first True step along the last axis, -1 if none."""
+    import numpy as np
+
+    return np.where(mask.any(axis=-1), mask.argmax(axis=-1), -1)
+
+
+def _step_times(dt, n: int):
+    """Start time of each step relative to the first one; dt is a scalar or per-step array."""
+    import numpy as np
+
+    dt = np.broadcast_to(np.asarray(dt, dtype=float), (n,))
+    return dt, np.cumsum(dt) - dt
+
+
+def idmt_integrate(I, dt, pickup, tms, k, alpha, reset: str = "instantaneous", reset_time: float = 0.0, acc0=0.0):
+    """
+    IDMT integrator over current profiles I (..., n_steps), each sample held for dt.
+
+    pickup, tms, k, alpha, acc0 broadcast against I[..., 0].
+    Returns (trip_time, acc_end): time from the profile start at which the
+    integrator reaches 1 (NaN if it does not) and its final state.
+    """
+    import numpy as np
+
+    if reset not in RESET_MODES:
+        raise ValueError(f"Unknown reset mode: {reset}")
+    I = np.asarray(I, dtype=float)
+    p = lambda v: np.asarray(v, dtype=float)[..., None]
+    pickup, tms, k, alpha = p(pickup), p(tms), p(k), p(alpha)
+    dt, t0 = _step_times(dt, I.shape[-1])
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        M = I / pickup
+        operate = I > pickup
+        rate = np.where(operate, np.minimum((M ** alpha - 1.0) / (tms * k), MAX_IDMT_RATE), 0.0)
+        # A step can at most trip (or fully reset) the integrator; capping keeps the sums finite.
+        inc = np.minimum(rate * dt, 2.0)
+        acc0 = np.broadcast_to(np.asarray(acc0, dtype=float), inc.shape[:-1])
+
+        if reset == "instantaneous" or (reset_time <= 0):
+            acc = _restarting_cumsum(inc, ~operate, acc0)
+        else:
+            if reset == "definite":
+                back = np.where(operate, 0.0, dt / reset_time)
+            else:
+                back = np.where(operate | (M >= 1.0), 0.0, dt * (1.0 - M ** 2) / (tms * reset_time))
+            back = np.minimum(back, 1.0)
+            # Lindley recursion acc_n = max(0, acc_{n-1} + x_n), closed form via a running minimum
+            s = np.cumsum(inc - back, axis=-1)
+            acc = s - np.minimum(np.minimum.accumulate(s, axis=-1), -acc0[..., None])
+
+        n = _first_step(acc >= 1.0)
+        i = np.maximum(n, 0)[..., None]
+        acc_start = np.take_along_axis(acc - inc, i, axis=-1)[..., 0]
+        r = np.take_along_axis(rate, i, axis=-1)[..., 0]
+        t_start = np.take_along_axis(np.broadcast_to(t0, acc.shape), i, axis=-1)[..., 0]
+        trip = np.where(n >= 0, t_start + (1.0 - acc_start) / r, np.nan)
+    return trip, acc[..., -1]
+
+
+def dt_timer(I, dt, dt_on, dt_pickup, dt_time, elapsed0=0.0):
+    """
+    Definite-time stage over current profiles I (..., n_steps): trips once the
+    current has stayed at or above dt_pickup for dt_time. elapsed0 is the time
+    already spent above pickup before the first step.
+    Returns (trip_time, elapsed_end), trip_time NaN where it does not trip.
+    """
+    import numpy as np
+
+    I = np.asarray(I, dtype=float)
+    p = lambda v: np.asarray(v)[..., None]
+    dt, t0 = _step_times(dt, I.shape[-1])
+    above = p(dt_on).astype(bool) & (I >= p(dt_pickup))
+    inc = np.where(above, dt, 0.0)
+    elapsed = _restarting_cumsum(inc, ~above, np.broadcast_to(np.asarray(elapsed0, dtype=float), inc.shape[:-1]))
+
+    delay = p(dt_time).astype(float)
+    n = _first_step(above & (elapsed >= delay))
+    i = np.maximum(n, 0)[..., None]
+    e_start = np.take_along_axis(elapsed - inc, i, axis=-1)[..., 0]
+    t_start = np.take_along_axis(np.broadcast_to(t0, elapsed.shape), i, axis=-1)[..., 0]
+    trip = np.where(n >= 0, t_start + np.maximum(delay[..., 0] - e_start, 0.0), np.nan)
+    return trip, elapsed[..., -1]
+
+
+def dynamic_trip_times(profiles, dt, relays: list[dict], hv_factor: float = 1.0,
+                       reset: str = "instantaneous", reset_time: float = 0.0):
+    """
+    Trip times of the TCC-tool relays for time-varying LV-side currents.
+
+    profiles: (n_steps,) or (n_profiles, n_steps) RMS current; Q5 sees it
+    divided by hv_factor as on the TCC plot.
+    Returns (trip_times, stages): (n_profiles, n_relays) seconds from the
+    profile start (NaN = no trip) and stage index (0 IDMT, 1 DT1, 2 DT2, -1 none).
+    """
+    import numpy as np
+
+    _, bank = tcc_relay_bank(relays, hv_factor)
+    c = {name: v[:, 0] for name, v in bank.columns().items()}
+    I = np.atleast_2d(np.asarray(profiles, dtype=float))[:, None, :] / bank.scale[:, None]
+
+    t_idmt, _ = idmt_integrate(
+        I, dt, c["pickup"], c["tms"], c["k"], c["alpha"], reset=reset, reset_time=reset_time
+    )
+    t_idmt = np.where(c["idmt_on"], t_idmt, np.nan)
+    t_dt1, _ = dt_timer(I, dt, c["dt1_on"], c["dt1_pickup"], c["dt1_time"])
+    t_dt2, _ = dt_timer(I, dt, c["dt2_on"], c["dt2_pickup"], c["dt2_time"])
+
+    stack = np.stack([t_idmt, t_dt1, t_dt2])
+    none = np.all(np.isnan(stack), axis=0)
+    filled = np.where(np.isnan(stack), np.inf, stack)
+    return np.where(none, np.nan, filled.min(axis=0)), np.where(none, -1, filled.argmin(axis=0))
@@ -0,0 +1,205 @@
+"""
+Live What-If (logic-only)
+
+Fast path for dragging relay TMS / pickup values in the TCC tool. A
+WhatIfSession runs compute_tcc_plot() once for the transformer, fault and
+relay settings (the baseline) and keeps its curves. An override of one
+relay's TMS or pickup then re-evaluates only that relay's curve on the cached
+current axis, its trip time at the fault and the coordination report (grading
+margins from the coordination rules). That takes well under a millisecond,
+against the LIVE_BUDGET_MS latency budget. Curves and trip times match
+compute_tcc_plot() with the same settings bit for bit.
+
+Per-relay results are memoized by (relay, pickup, tms), so dragging back
+over visited values costs nothing. Updates are debounced: set() records the
+change and poll() recomputes at most once per debounce_s. A burst of slider
+events therefore costs one recompute, and the last change is picked up by the
+next poll.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from engine.coordination_rules import DEFAULT_RULES, RuleSet
+from engine.models import merged_trip_time
+from engine.tcc_engine import build_coordination_report, compute_tcc_plot, tcc_relay_bank
+
+LIVE_FIELDS = ("pickup", "tms")
+LIVE_BUDGET_MS = 50.0
+DEBOUNCE_S = 0.08
+MEMO_SIZE = 512
+N_RELAYS = 5
+
+
+def baseline_key(MVA: float, LV: float, HV: float, Z: float, fault: Optional[float], relays: Sequence[dict]) -> str:
+    """Signature of the inputs a baseline depends on (rebuild the session when it changes)."""
+    return json.dumps([MVA, LV, HV, Z, fault, list(relays)], sort_keys=True, default=str)
+
+
+class WhatIfSession:
+    """
+    Baseline plus relay overrides ({relay index: {"pickup": A, "tms": x}}).
+
+    clock is injectable for the debounce (time.monotonic by default).
+    """
+
+    def __init__(
+        self,
+        MVA: float,
+        LV: float,
+        HV: float,
+        Z: float,
+        fault: Optional[float],
+        relays: Sequence[dict],
+        rules: RuleSet = DEFAULT_RULES,
+        debounce_s: float = DEBOUNCE_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.key = baseline_key(MVA, LV, HV, Z, fault, relays)
+        self.relays = copy.deepcopy(list(relays))
+        self.rules = rules
+        self.debounce_s = debounce_s
+        self.clock = clock
+
+        currents, curves, trip_times, flc_lv, isc_lv, fault_used = compute_tcc_plot(MVA, LV, HV, Z, fault, self.relays)
+        self.currents = currents
+        self.curves = np.asarray(curves, dtype=float)
+        self.trip_times = dict(trip_times)
+        self.flc_lv, self.isc_lv, self.fault_used = flc_lv, isc_lv, fault_used
+        self.hv_factor = HV / LV
+        self.scale = tcc_relay_bank(self.relays, self.hv_factor)[1].scale
+
+        self.overrides: Dict[int, dict] = {}
+        self._memo: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._pending = False
+        self._last_run = -math.inf
+        self.result: Optional[dict] = None
+
+    # ---------------- overrides ----------------
+    def relay(self, i: int) -> dict:
+        """Relay i's settings with its overrides applied."""
+        return {**self.relays[i], **self.overrides.get(i, {})}
+
+    def set(self, i: int, **fields) -> None:
+        """Override live fields of relay i; the recompute happens on the next poll()."""
+        unknown = set(fields) - set(LIVE_FIELDS)
+        if unknown:
+            raise ValueError(f"Live what-if only changes {', '.join(LIVE_FIELDS)} (got {', '.join(sorted(unknown))}).")
+        changed = {k: float(v) for k, v in fields.items() if float(v) != self.relay(i)[k]}
+        if changed:
+            self.overrides.setdefault(i, {}).update(changed)
+            self._pending = True
+
+    def reset(self, i: Optional[int] = None) -> None:
+        """Drops the overrides of relay i (all relays if None)."""
+        if i is None:
+            self.overrides.clear()
+        else:
+            self.overrides.pop(i, None)
+        self._pending = True
+
+    def applied_relays(self) -> List[dict]:
+        """Relay settings with every override applied (to store back in the page state)."""
+        return [self.relay(i) for i in range(N_RELAYS)]
+
+    # ---------------- evaluation ----------------
+    def _relay_curve(self, i: int) -> tuple:
+        """(curve, trip time at fault or NaN) of relay i with its overrides, memoized."""
+        r = self.relay(i)
+        key = (i, r["pickup"], r["tms"])
+        hit = self._memo.get(key)
+        if hit is not None:
+            self._memo.move_to_end(key)
+            return hit
+        relays = [self.relays[j] if j != i else r for j in range(N_RELAYS)]
+        settings, bank = tcc_relay_bank(relays, self.hv_factor)
+        curve = merged_trip_time(self.currents / bank.scale[i], **bank.columns(i))
+        t_f = math.nan
+        if self.fault_used:
+            t = settings[i].trip_time(self.fault_used / float(bank.scale[i]))
+            if not math.isnan(t):
+                t_f = round(float(t), 3)
+        self._memo[key] = (curve, t_f)
+        if len(self._memo) > MEMO_SIZE:
+            self._memo.popitem(last=False)
+        return curve, t_f
+
+    def evaluate(self) -> dict:
+        """
+        Recomputes the overridden relays now (no debounce).
+
+        Returns {"curves" (5, n), "trip_times", "report_text", "results"
+                 [(downstream, upstream, margin, cti, ok)], "ok", "changed"
+                 (relay indices), "elapsed_ms", "within_budget"}
+        """
+        t0 = time.perf_counter()
+        curves = self.curves
+        trip_times = dict(self.trip_times)
+        changed = sorted(i for i, o in self.overrides.items() if o)
+        if changed:
+            curves = curves.copy()
+            for i in changed:
+                curve, t_f = self._relay_curve(i)
+                curves[i] = curve
+                name = f"Q{i+1}"
+                if math.isnan(t_f):
+                    trip_times.pop(name, None)
+                else:
+                    trip_times[name] = t_f
+            trip_times = dict(sorted(trip_times.items()))
+        report_text, results = build_coordination_report(
+            trip_times, self.flc_lv, self.isc_lv, self.fault_used, self.rules
+        )
+        elapsed = (time.perf_counter() - t0) * 1000.0
+        self._pending = False
+        self._last_run = self.clock()
+        self.result = {
+            "curves": curves,
+            "trip_times": trip_times,
+            "report_text": report_text,
+            "results": results,
+            "ok": all(r[4] for r in results),
+            "changed": changed,
+            "elapsed_ms": elapsed,
+            "within_budget": elapsed <= LIVE_BUDGET_MS,
+        }
+        return self.result
+
+    @property
+    def pending(self) -> bool:
+        return self._pending or self.result is None
+
+    def poll(self) -> Optional[dict]:
+        """
+        Latest result, recomputing first if changes are pending and the last
+        recompute is at least debounce_s old. Returns None only before the
+        first result.
+        """
+        if self.pending and self.clock() - self._last_run >= self.debounce_s:
+            return self.evaluate()
+        return self.result
+
+
+def chart_rows(currents, curves, names: Sequence[str] = ("Q1", "Q2", "Q3", "Q4", "Q5"), columns: int = 200) -> List[dict]:
+    """
+    Long-form rows {"relay", "segment", "current", "time"} for a client-side
+    log-log line chart; each curve is reduced with downsample_polyline() and
+    split into continuous segments.
+    """
+    from engine.pdf_utils import downsample_polyline
+
+    x_range = (float(currents[0]), float(currents[-1]))
+    rows = []
+    for name, curve in zip(names, curves):
+        for s, (x, y) in enumerate(downsample_polyline(currents, curve, columns, x_range)):
+            rows.extend({"relay": name, "segment": f"{name}-{s}", "current": float(a), "time": float(b)}
+                        for a, b in zip(x, y))
+    return rows
@@ -1,19 +1,23 @@
 import os
 import io
 import csv
-import numpy as np
+import copy
+import math
+import time
 import streamlit as st
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
 from PIL import Image
 
 from engine.tcc_engine import (
-    compute_tcc_plot,
+    compute_tcc_with_overlays,
     transformer_calculations,
     build_coordination_report,
 )
+from engine.jobs import get_runner, DONE, FAILED
+from engine.result_cache import get_cache
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOB_POLL_S = 0.3
+LIVE_TICK_S = 0.1  # live what-if: fragment tick that picks up debounced slider changes
 
 st.set_page_config(page_title="TCC Plot Tool", layout="wide")
 
@@ -43,6 +47,22 @@ def _init_state():
         "isc_lv": None,
         "fault_used": None,
         "trip_times": {},
+        "plot_job": None,
+        "plot_fault": None,
+        "plot_inputs": None,
+        "last_arrays": None,
+        "mc_job": None,
+        "mc_report": "",
+        "change_hints": [],
+        "overlay_issues": [],
+        "damage_report": "",
+        "pdf_bytes": None,
+        "live_session": None,
+        "sweep_cables": [
+            {"Feeder": f"Q{i+1}", "R (ohm/km)": 0.16, "X (ohm/km)": 0.1, "Length (km)": 2.0} for i in range(3)
+        ],
+        "sweep_report": "",
+        "sweep_rows": [],
     }
 
     st.session_state.tcc_initialized = True
@@ -126,17 +146,51 @@ with left:
     b1, b2, b3 = st.columns(3)
     with b1:
         if st.button("Plot Coordination", type="primary", use_container_width=True):
+            fault_in = float(st.session_state.tcc["fault"]) if st.session_state.tcc["fault"] else None
+            # inputs as submitted: the widgets may change while the job runs
+            plot_inputs = {
+                "mva": float(st.session_state.tcc["mva"]),
+                "lv": float(st.session_state.tcc["lv"]),
+                "hv": float(st.session_state.tcc["hv"]),
+                "z": float(st.session_state.tcc["z"]),
+                "relays": copy.deepcopy(st.session_state.tcc["relays"]),
+            }
+            st.session_state.tcc["plot_fault"] = fault_in
+            st.session_state.tcc["plot_inputs"] = plot_inputs
+            st.session_state.tcc["plot_job"] = get_runner().submit(
+                get_cache().call,
+                compute_tcc_with_overlays,
+                plot_inputs["mva"],
+                plot_inputs["lv"],
+                plot_inputs["hv"],
+                plot_inputs["z"],
+                fault_in,
+                copy.deepcopy(plot_inputs["relays"]),
+                label="TCC plot",
+            )
+
+    with b2:
+        if st.button("Prefill Defaults", use_container_width=True):
+            reset_all()
+    with b3:
+        if st.button("New Project (Reset All)", use_container_width=True):
+            reset_all()
+
+    plot_job = get_runner().get(st.session_state.tcc["plot_job"])
+    if plot_job is not None and not plot_job.finished:
+        st.info("Computing coordination...")
+    elif plot_job is not None:
+        st.session_state.tcc["plot_job"] = None
+        if plot_job.status == FAILED:
+            st.error(f"Plot failed: {plot_job.error}")
+        elif plot_job.status == DONE:
             try:
-                currents, merged_curves, trip_times, flc_lv, isc_lv, fault_used = compute_tcc_plot(
-                    float(st.session_state.tcc["mva"]),
-                    float(st.session_state.tcc["lv"]),
-                    float(st.session_state.tcc["hv"]),
-                    float(st.session_state.tcc["z"]),
-                    float(st.session_state.tcc["fault"]) if st.session_state.tcc["fault"] else None,
-                    st.session_state.tcc["relays"],
-                )
+                currents, merged_curves, trip_times, flc_lv, isc_lv, fault_used, overlays = plot_job.result
+                plotted_in = st.session_state.tcc["plot_inputs"]
+
+                # Matplotlib figure (imported only once a plot is requested)
+                import matplotlib.pyplot as plt
 
-                # Matplotlib figure
                 fig = plt.figure(figsize=(10, 6))
                 ax = fig.add_subplot(111)
                 ax.set_title("Time-Current Characteristics", fontsize=14, fontweight="bold")
@@ -159,17 +213,79 @@ with left:
                 if fault_used is not None:
                     ax.axvline(fault_used, linestyle="dotted", color="black", linewidth=2, label="Fault Level")
 
+                ax.plot(overlays["inrush"]["currents"], overlays["inrush"]["times"], "kx", markersize=9, label="Inrush")
+                ax.plot(overlays["cold_load"]["currents"], overlays["cold_load"]["times"], "s--", color="gray",
+                        markersize=5, label="Cold Load")
+
+                from engine.transformer_damage import damage_check, damage_report
+
+                damage = damage_check(
+                    plotted_in["mva"],
+                    plotted_in["lv"],
+                    plotted_in["hv"],
+                    plotted_in["z"],
+                    copy.deepcopy(plotted_in["relays"]),
+                )
+                ax.plot(damage["currents"], damage["damage_times"], color="brown", linestyle="-.", linewidth=2,
+                        label="Transformer Damage (ANSI)")
+                st.session_state.tcc["damage_report"] = damage_report(damage, "ANSI C57.109")
+                pdf_study = {
+                    "currents": currents,
+                    "curves": merged_curves,
+                    "trip_times": trip_times,
+                    "fault_used": fault_used,
+                    "relays": copy.deepcopy(plotted_in["relays"]),
+                    "series": [
+                        {"label": "Inrush", "currents": overlays["inrush"]["currents"],
+                         "times": overlays["inrush"]["times"], "color": "black", "marker": "x"},
+                        {"label": "Cold Load", "currents": overlays["cold_load"]["currents"],
+                         "times": overlays["cold_load"]["times"], "color": "gray", "marker": "s"},
+                        {"label": "Transformer Damage (ANSI)", "currents": damage["currents"],
+                         "times": damage["damage_times"], "color": "brown", "marker": None},
+                    ],
+                }
+
                 ax.legend()
 
                 report_text, results_table = build_coordination_report(trip_times, flc_lv, isc_lv, fault_used)
 
+                # Vector PDF (plot page + settings/summary page) built once per plot, not on every rerun
+                from engine.pdf_utils import tcc_report_pdf_bytes
+
+                st.session_state.tcc["pdf_bytes"] = tcc_report_pdf_bytes([dict(pdf_study, report_text=report_text)])
+
                 st.session_state.tcc["last_fig"] = fig
                 st.session_state.tcc["last_report_text"] = report_text
                 st.session_state.tcc["last_results_table"] = results_table
                 st.session_state.tcc["trip_times"] = trip_times
+                st.session_state.tcc["overlay_issues"] = [
+                    f"{relay} trips at {t:.3f}s under {name.replace('_', '-')} ({cur:.0f} A for {limit:g}s)"
+                    for name, relay, cur, limit, t, ok in overlays["checks"]
+                    if not ok
+                ]
                 st.session_state.tcc["fault_used"] = fault_used
+                from engine.export import tcc_arrays
+
+                st.session_state.tcc["last_arrays"] = tcc_arrays(
+                    currents, merged_curves, trip_times, copy.deepcopy(plotted_in["relays"]), fault_used
+                )
+                st.session_state.tcc["change_hints"] = []
+                if fault_used is not None:
+                    from engine.sensitivity import coordination_sensitivity, what_to_change
+
+                    plotted = copy.deepcopy(plotted_in["relays"])
+                    sens = coordination_sensitivity(
+                        plotted_in["mva"],
+                        plotted_in["lv"],
+                        plotted_in["hv"],
+                        plotted_in["z"],
+                        fault_used,
+                        plotted,
+                    )
+                    st.session_state.tcc["change_hints"] = what_to_change(sens, plotted)
+                plot_fault = st.session_state.tcc["plot_fault"]
                 st.session_state.tcc["warning_fault_clamped"] = (
-                    st.session_state.tcc["fault"] is not None and fault_used is not None and float(st.session_state.tcc["fault"]) > float(isc_lv)
+                    plot_fault is not None and fault_used is not None and float(plot_fault) > float(isc_lv)
                 )
 
                 if st.session_state.tcc["warning_fault_clamped"]:
@@ -177,13 +293,6 @@ with left:
             except Exception as e:
                 st.error(f"Plot failed: {e}")
 
-    with b2:
-        if st.button("Prefill Defaults", use_container_width=True):
-            reset_all()
-    with b3:
-        if st.button("New Project (Reset All)", use_container_width=True):
-            reset_all()
-
     # SLD image + footer (like Tkinter)
     sld_path = os.path.join(BASE_DIR, "sld.png")
     if os.path.exists(sld_path):
@@ -194,6 +303,114 @@ with left:
         unsafe_allow_html=True,
     )
 
+# ---------- Live what-if ----------
+LIVE_COLORS = ["blue", "green", "red", "purple", "orange"]
+
+
+def _clear_live_sliders():
+    for k in [k for k in st.session_state if str(k).startswith(("live_tms_", "live_pick_"))]:
+        del st.session_state[k]
+
+
+def _apply_live():
+    session = st.session_state.tcc["live_session"]
+    if session is None:
+        return
+    st.session_state.tcc["relays"] = session.applied_relays()
+    for i in range(5):
+        # the relay inputs re-initialise from the applied settings
+        st.session_state.pop(f"pick_{i}", None)
+        st.session_state.pop(f"tms_{i}", None)
+    st.session_state.tcc["live_session"] = None
+    _clear_live_sliders()
+
+
+def _reset_live():
+    session = st.session_state.tcc["live_session"]
+    if session is not None:
+        session.reset()
+    _clear_live_sliders()
+
+
+def _live_panel():
+    """Sliders + curves + margins; reruns on its own (st.fragment) without replotting the page."""
+    from engine.whatif import LIVE_BUDGET_MS, WhatIfSession, baseline_key, chart_rows
+
+    tcc = st.session_state.tcc
+    fault = float(tcc["fault"]) if tcc["fault"] else None
+    args = (float(tcc["mva"]), float(tcc["lv"]), float(tcc["hv"]), float(tcc["z"]), fault, tcc["relays"])
+    session = tcc["live_session"]
+    if session is None or session.key != baseline_key(*args):
+        try:
+            session = WhatIfSession(*args)
+        except Exception as e:
+            st.error(f"Live mode unavailable: {e}")
+            return
+        tcc["live_session"] = session
+        _clear_live_sliders()
+
+    s1, s2, s3 = st.columns([1, 2, 2])
+    i = s1.selectbox("Relay", list(range(5)), format_func=lambda k: f"Q{k+1}", key="live_relay")
+    r = session.relay(i)
+    base = session.relays[i]
+    # ranges always contain the plotted setting, so opening the panel changes nothing;
+    # the pickup never goes below 1 A (a 0 A pickup is rejected by RelaySettings)
+    tms_lo, tms_hi = min(0.01, float(base["tms"])), max(1.0, float(base["tms"]))
+    pick_lo = min(float(base["pickup"]), max(1.0, float(math.floor(0.25 * float(base["pickup"])))))
+    pick_hi = float(math.ceil(4.0 * float(base["pickup"])))
+    tms = s2.slider("TMS", tms_lo, tms_hi, float(r["tms"]), 0.005, format="%.3f", key=f"live_tms_{i}")
+    pick = s3.slider("Pickup (A)", pick_lo, pick_hi, float(r["pickup"]), 1.0, key=f"live_pick_{i}")
+    session.set(i, tms=tms, pickup=pick)
+
+    res = session.poll()
+    if res is None:
+        st.caption("Updating...")
+        return
+
+    import pandas as pd
+
+    spec = {
+        "height": 320,
+        "layer": [{
+            "mark": {"type": "line", "strokeWidth": 2},
+            "encoding": {
+                "x": {"field": "current", "type": "quantitative", "scale": {"type": "log"}, "title": "Current (A)"},
+                "y": {"field": "time", "type": "quantitative", "scale": {"type": "log"}, "title": "Time (s)"},
+                "color": {"field": "relay", "type": "nominal",
+                          "scale": {"domain": [f"Q{k+1}" for k in range(5)], "range": LIVE_COLORS}},
+                "detail": {"field": "segment"},
+            },
+        }],
+    }
+    if session.fault_used is not None:
+        spec["layer"].append({
+            "data": {"values": [{"current": float(session.fault_used)}]},
+            "mark": {"type": "rule", "strokeDash": [2, 2], "color": "black"},
+            "encoding": {"x": {"field": "current", "type": "quantitative"}},
+        })
+    st.vega_lite_chart(pd.DataFrame(chart_rows(session.currents, res["curves"])), spec, use_container_width=True)
+
+    if res["results"]:
+        st.dataframe(
+            pd.DataFrame(
+                [(f"{d}->{u}", round(m, 3), c, "OK" if ok else "NOT OK") for d, u, m, c, ok in res["results"]],
+                columns=["Pair", "Margin (s)", "CTI (s)", "Status"],
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.caption("No grading pair trips at the fault current.")
+    stale = " (updating...)" if session.pending else ""
+    st.caption(f"Recompute {res['elapsed_ms']:.2f} ms (budget {LIVE_BUDGET_MS:.0f} ms){stale}")
+    if not res["within_budget"]:
+        st.warning("Live recompute exceeded its latency budget.")
+
+    l1, l2 = st.columns(2)
+    l1.button("Apply to Relay Settings", on_click=_apply_live, use_container_width=True)
+    l2.button("Reset What-If", on_click=_reset_live, use_container_width=True)
+
+
 # ---------- RIGHT PANEL ----------
 with right:
     st.subheader("Plot")
@@ -202,64 +419,29 @@ with right:
     else:
         st.info("Click **Plot Coordination** to generate the TCC plot.")
 
+    if st.toggle("Live what-if (drag TMS / pickup)", key="live_mode"):
+        st.fragment(_live_panel, run_every=LIVE_TICK_S)()
+
     st.subheader("Coordination Report")
     report = st.session_state.tcc["last_report_text"] or ""
     st.text_area("Report Output", value=report, height=260)
+    if st.session_state.tcc["damage_report"]:
+        st.code(st.session_state.tcc["damage_report"], language=None)
+    if st.session_state.tcc["overlay_issues"]:
+        st.warning("Inrush / cold-load check:\n\n" + "\n\n".join(st.session_state.tcc["overlay_issues"]))
+    if st.session_state.tcc["change_hints"]:
+        with st.expander("What to change (first-order estimates)"):
+            for hint in st.session_state.tcc["change_hints"]:
+                st.markdown(f"- {hint}")
 
     # Export buttons (PDF + CSV) like Tkinter menu items
-    cexp1, cexp2 = st.columns(2)
+    cexp1, cexp2, cexp3 = st.columns(3)
 
     with cexp1:
-        if st.session_state.tcc["last_fig"] is not None:
-            # Build PDF with plot page + summary page (same concept as Tkinter)
-            def build_pdf_bytes():
-                buf = io.BytesIO()
-                with PdfPages(buf) as pdf:
-                    pdf.savefig(st.session_state.tcc["last_fig"])
-
-                    fig_rep, ax_rep = plt.subplots(figsize=(11, 8.5))
-                    ax_rep.axis("off")
-                    ax_rep.text(0.5, 0.95, "Relay Settings & Coordination Report", fontsize=16, weight="bold", ha="center")
-
-                    headers = ["Relay", "IDMT", "Pick", "TMS", "DT1", "P1", "T1", "DT2", "P2", "T2", "Curve"]
-                    rows = []
-                    for i in range(5):
-                        r = st.session_state.tcc["relays"][i]
-                        rows.append([
-                            f"Q{i+1}",
-                            "ON" if r["idmt_on"] else "OFF",
-                            f"{float(r['pickup']):.3f}",
-                            f"{float(r['tms']):.3f}",
-                            "ON" if r["dt1_on"] else "OFF",
-                            f"{float(r['dt1_pickup']):.3f}",
-                            f"{float(r['dt1_time']):.3f}",
-                            "ON" if r["dt2_on"] else "OFF",
-                            f"{float(r['dt2_pickup']):.3f}",
-                            f"{float(r['dt2_time']):.3f}",
-                            r["curve"],
-                        ])
-
-                    table = ax_rep.table(
-                        cellText=rows,
-                        colLabels=headers,
-                        loc="center",
-                        cellLoc="center",
-                        bbox=[0.03, 0.52, 0.94, 0.35],
-                    )
-                    table.auto_set_font_size(False)
-                    table.set_fontsize(9)
-
-                    ax_rep.text(0.03, 0.47, "Results Summary:", fontsize=12, weight="bold")
-                    ax_rep.text(0.03, 0.45, report, fontsize=9, family="monospace", va="top")
-
-                    pdf.savefig(fig_rep)
-                    plt.close(fig_rep)
-
-                return buf.getvalue()
-
+        if st.session_state.tcc["pdf_bytes"] is not None:
             st.download_button(
                 "Save Report (PDF)",
-                data=build_pdf_bytes(),
+                data=st.session_state.tcc["pdf_bytes"],
                 file_name="NEA_TCC_Report.pdf",
                 mime="application/pdf",
                 use_container_width=True,
@@ -316,3 +498,108 @@ with right:
             mime="text/csv",
             use_container_width=True,
         )
+
+    with cexp3:
+        arrays = st.session_state.tcc["last_arrays"]
+        npz_data = b""
+        if arrays is not None:
+            from engine.export import npz_bytes
+
+            npz_data = npz_bytes(arrays)
+        st.download_button(
+            "Export Curves (NPZ)",
+            data=npz_data,
+            file_name="NEA_TCC_Curves.npz",
+            mime="application/octet-stream",
+            disabled=arrays is None,
+            use_container_width=True,
+        )
+
+    # Robustness under CT error / TMS tolerance / fault-level uncertainty
+    with st.expander("Robustness (Monte Carlo)"):
+        m1, m2, m3 = st.columns(3)
+        mc_ct = m1.number_input("CT error (±%)", value=5.0, step=0.5, min_value=0.0)
+        mc_tms = m2.number_input("TMS tolerance (±%)", value=5.0, step=0.5, min_value=0.0)
+        mc_fault = m3.number_input("Fault uncertainty (±%)", value=10.0, step=1.0, min_value=0.0)
+        m4, m5 = st.columns(2)
+        mc_dt = m4.number_input("DT tolerance (±s)", value=0.01, step=0.005, format="%.3f", min_value=0.0)
+        mc_n = m5.number_input("Samples", value=10000, step=1000, min_value=100)
+
+        if st.button("Run Robustness Analysis", use_container_width=True):
+            from engine.monte_carlo import coordination_robustness
+
+            st.session_state.tcc["mc_job"] = get_runner().submit(
+                coordination_robustness,
+                float(st.session_state.tcc["mva"]),
+                float(st.session_state.tcc["lv"]),
+                float(st.session_state.tcc["hv"]),
+                float(st.session_state.tcc["z"]),
+                float(st.session_state.tcc["fault"]) if st.session_state.tcc["fault"] else None,
+                copy.deepcopy(st.session_state.tcc["relays"]),
+                n_samples=int(mc_n),
+                ct_error=mc_ct / 100.0,
+                tms_tolerance=mc_tms / 100.0,
+                dt_tolerance=float(mc_dt),
+                fault_uncertainty=mc_fault / 100.0,
+                label="TCC robustness",
+            )
+
+        mc_job = get_runner().get(st.session_state.tcc["mc_job"])
+        if mc_job is not None and not mc_job.finished:
+            st.info("Sampling...")
+        elif mc_job is not None:
+            st.session_state.tcc["mc_job"] = None
+            if mc_job.status == FAILED:
+                st.error(f"Robustness analysis failed: {mc_job.error}")
+            elif mc_job.status == DONE:
+                from engine.monte_carlo import robustness_report
+
+                st.session_state.tcc["mc_report"] = robustness_report(mc_job.result)
+
+        if st.session_state.tcc["mc_report"]:
+            st.text_area("Robustness Report", value=st.session_state.tcc["mc_report"], height=220)
+
+    # Fault moved along the Q1..Q3 cables (end-of-line faults)
+    with st.expander("Fault Sweep Along Feeders"):
+        # list-of-records in and out: the page itself never needs pandas here
+        cables = st.data_editor(
+            st.session_state.tcc["sweep_cables"],
+            disabled=["Feeder"],
+            hide_index=True,
+            use_container_width=True,
+            key="sweep_cables_editor",
+        )
+        sweep_points = st.number_input("Fault points per feeder", value=50, step=10, min_value=2)
+
+        if st.button("Run Fault Sweep", use_container_width=True):
+            from engine.fault_sweep import sweep_report, sweep_table, tcc_fault_sweep
+
+            st.session_state.tcc["sweep_cables"] = [dict(c) for c in cables]
+            try:
+                sweep = tcc_fault_sweep(
+                    float(st.session_state.tcc["mva"]),
+                    float(st.session_state.tcc["lv"]),
+                    float(st.session_state.tcc["hv"]),
+                    float(st.session_state.tcc["z"]),
+                    copy.deepcopy(st.session_state.tcc["relays"]),
+                    [
+                        {"r_ohm_km": c["R (ohm/km)"], "x_ohm_km": c["X (ohm/km)"], "length_km": c["Length (km)"]}
+                        for c in st.session_state.tcc["sweep_cables"]
+                    ],
+                    points=int(sweep_points),
+                )
+                st.session_state.tcc["sweep_report"] = sweep_report(sweep)
+                st.session_state.tcc["sweep_rows"] = sweep_table(sweep)
+            except Exception as e:
+                st.session_state.tcc["sweep_report"] = ""
+                st.session_state.tcc["sweep_rows"] = []
+                st.error(f"Fault sweep failed: {e}")
+
+        if st.session_state.tcc["sweep_rows"]:
+            st.dataframe(st.session_state.tcc["sweep_rows"], hide_index=True, use_container_width=True)
+            st.text_area("Fault Sweep Report", value=st.session_state.tcc["sweep_report"], height=200)
+
+# Keep polling while background jobs are running.
+if any(j is not None and not j.finished for j in (plot_job, mc_job)):
+    time.sleep(JOB_POLL_S)
+    st.rerun()
@@ -1,9 +1,15 @@
-import io
-import csv
+import time
 import streamlit as st
 import pandas as pd
-from engine.grid_engine import calculate_grid, validate_cti_ms
-from engine.pdf_utils import text_to_pdf_bytes
+from engine.grid_engine import calculate_grid, calculate_grid_parallel, validate_cti_ms
+from engine.report_render import report_pdf_bytes, settings_csv_bytes
+from engine.feeder_import import read_feeders, feeders_from_frame
+from engine.jobs import get_runner, DONE, FAILED
+from engine.result_cache import get_cache
+from engine.export import grid_settings_table, npz_bytes
+from engine.devices import DEVICES, DEFAULT_DEVICE, grid_cts, grid_parallel_cts, snap_grid_settings
+
+JOB_POLL_S = 0.3
 
 st.set_page_config(page_title="OC/EF Grid Tool", layout="wide")
 
@@ -11,6 +17,13 @@ st.title("Nepal Electricity Authority (NEA) Grid Protection Coordination Tool")
 st.caption("Streamlit web version (same calculation logic as Tkinter).")
 
 # ---------- State ----------
+def default_transformers():
+    return pd.DataFrame(
+        [{"MVA": 16.6, "Z%": 10.0, "Q4 CT": 900.0, "Q5 CT": 300.0, "Section": "A"},
+         {"MVA": 16.6, "Z%": 10.0, "Q4 CT": 900.0, "Q5 CT": 300.0, "Section": "B"}]
+    )
+
+
 def init_grid_state():
     if "grid_initialized" in st.session_state:
         return
@@ -29,6 +42,16 @@ def init_grid_state():
              {"Load (A)": 300.0, "CT (A)": 400.0}]
         ),
         "last": None,
+        "imported_file": None,
+        "calc_job": None,
+        "pdf_job": None,
+        "pdf_bytes": None,
+        "import_issues": [],
+        "calc_cts": None,
+        "last_cts": None,
+        "parallel": False,
+        "transformers": default_transformers(),
+        "coupler_ct": 1800.0,
     }
     st.session_state.grid_initialized = True
 
@@ -47,6 +70,9 @@ def preload_defaults():
          {"Load (A)": 300.0, "CT (A)": 400.0}]
     )
     st.session_state.grid["last"] = None
+    st.session_state.grid["import_issues"] = []
+    st.session_state.grid["pdf_job"] = None
+    st.session_state.grid["pdf_bytes"] = None
 
 
 def reset_grid():
@@ -71,9 +97,38 @@ with st.container(border=True):
     st.session_state.grid["q4"] = c6.number_input("Q4 CT", value=float(st.session_state.grid["q4"]), step=10.0)
     st.session_state.grid["q5"] = c7.number_input("Q5 CT", value=float(st.session_state.grid["q5"]), step=10.0)
 
+    st.session_state.grid["parallel"] = st.checkbox(
+        "Parallel transformers (replaces MVA / Z% / Q4 CT / Q5 CT above)", value=st.session_state.grid["parallel"]
+    )
+    if st.session_state.grid["parallel"]:
+        st.session_state.grid["transformers"] = st.data_editor(
+            st.session_state.grid["transformers"],
+            num_rows="dynamic",
+            use_container_width=True,
+            hide_index=True,
+            key="transformers_editor",
+        )
+        st.session_state.grid["coupler_ct"] = st.number_input(
+            "Bus Coupler CT (0 = no coupler)", value=float(st.session_state.grid["coupler_ct"]), step=10.0
+        )
+
 with st.container(border=True):
     st.subheader("Feeder Configuration")
 
+    uploaded = st.file_uploader("Import Feeders (CSV / Excel)", type=["csv", "xlsx"])
+    if uploaded is not None and st.session_state.grid["imported_file"] != (uploaded.name, uploaded.size):
+        try:
+            imported = read_feeders(uploaded, name=uploaded.name)
+            st.session_state.grid["feeders"] = imported.to_frame()
+            st.session_state.grid["import_issues"] = imported.issues
+            st.success(f"Imported {len(imported.loads)} feeders ({imported.rows_skipped} rows skipped).")
+        except Exception as e:
+            st.session_state.grid["import_issues"] = [f"Import failed: {e}"]
+        st.session_state.grid["imported_file"] = (uploaded.name, uploaded.size)
+
+    if st.session_state.grid["import_issues"]:
+        st.warning("\n".join(st.session_state.grid["import_issues"]))
+
     # Editable table (replaces dynamic Tkinter rows)
     df = st.session_state.grid["feeders"]
     edited = st.data_editor(
@@ -104,24 +159,72 @@ if run:
     if not ok:
         st.warning(msg)
     else:
-        feeders_list = []
-        for _, row in st.session_state.grid["feeders"].fillna(0).iterrows():
-            feeders_list.append({"load": float(row["Load (A)"]), "ct": float(row["CT (A)"])})
+        feeders_list = feeders_from_frame(st.session_state.grid["feeders"])
+        st.session_state.grid["calc_cts"] = (
+            grid_cts(feeders_list, float(st.session_state.grid["q4"]), float(st.session_state.grid["q5"])),
+            float(st.session_state.grid["cti"]),
+        )
 
-        try:
-            result = calculate_grid(
-                mva=float(st.session_state.grid["mva"]),
-                hv_kv=float(st.session_state.grid["hv"]),
-                lv_kv=float(st.session_state.grid["lv"]),
-                z_pct=float(st.session_state.grid["z"]),
-                cti_ms=float(st.session_state.grid["cti"]),
-                q4_ct=float(st.session_state.grid["q4"]),
-                q5_ct=float(st.session_state.grid["q5"]),
-                feeders=feeders_list,
-            )
-            st.session_state.grid["last"] = result
-        except Exception as e:
-            st.error(f"Invalid Inputs: {e}")
+    if ok and st.session_state.grid["parallel"]:
+        tx = st.session_state.grid["transformers"].dropna(subset=["MVA", "Z%"])
+        transformers = [
+            {"mva": float(r["MVA"]), "z_pct": float(r["Z%"]), "q4_ct": float(r["Q4 CT"]),
+             "q5_ct": float(r["Q5 CT"]), "section": "A" if pd.isna(r["Section"]) or not str(r["Section"]).strip() else str(r["Section"]).strip()}
+            for r in tx.to_dict("records")
+        ]
+        coupler_ct = float(st.session_state.grid["coupler_ct"]) or None
+        st.session_state.grid["calc_cts"] = (
+            grid_parallel_cts(feeders_list, transformers, coupler_ct),
+            float(st.session_state.grid["cti"]),
+        )
+        st.session_state.grid["calc_job"] = get_runner().submit(
+            get_cache().call,
+            calculate_grid_parallel,
+            transformers=transformers,
+            hv_kv=float(st.session_state.grid["hv"]),
+            lv_kv=float(st.session_state.grid["lv"]),
+            cti_ms=float(st.session_state.grid["cti"]),
+            feeders=feeders_list,
+            coupler_ct=coupler_ct,
+            label="OC/EF grid (parallel)",
+        )
+    elif ok:
+        st.session_state.grid["calc_job"] = get_runner().submit(
+            get_cache().call,
+            calculate_grid,
+            mva=float(st.session_state.grid["mva"]),
+            hv_kv=float(st.session_state.grid["hv"]),
+            lv_kv=float(st.session_state.grid["lv"]),
+            z_pct=float(st.session_state.grid["z"]),
+            cti_ms=float(st.session_state.grid["cti"]),
+            q4_ct=float(st.session_state.grid["q4"]),
+            q5_ct=float(st.session_state.grid["q5"]),
+            feeders=feeders_list,
+            label="OC/EF grid",
+        )
+
+calc_job = get_runner().get(st.session_state.grid["calc_job"])
+if calc_job is not None and not calc_job.finished:
+    st.info("Calculating...")
+elif calc_job is not None:
+    st.session_state.grid["calc_job"] = None
+    if calc_job.status == FAILED:
+        st.error(f"Invalid Inputs: {calc_job.error}")
+    elif calc_job.status == DONE:
+        st.session_state.grid["last"] = calc_job.result
+        st.session_state.grid["last_cts"] = st.session_state.grid["calc_cts"]
+        st.session_state.grid["pdf_bytes"] = None
+        st.session_state.grid["pdf_job"] = get_runner().submit(
+            get_cache().call, report_pdf_bytes, "NEA Grid Coordination Report", calc_job.result, label="Grid PDF"
+        )
+
+pdf_job = get_runner().get(st.session_state.grid["pdf_job"])
+if pdf_job is not None and pdf_job.finished:
+    st.session_state.grid["pdf_job"] = None
+    if pdf_job.status == DONE:
+        st.session_state.grid["pdf_bytes"] = pdf_job.result
+    elif pdf_job.status == FAILED:
+        st.error(f"PDF export failed: {pdf_job.error}")
 
 # ---------- Outputs ----------
 last = st.session_state.grid["last"]
@@ -142,49 +245,63 @@ if last:
     # Exports
     st.subheader("Exports")
 
-    def build_tabulated_csv_bytes():
-        out = io.StringIO()
-        writer = csv.writer(out)
-        writer.writerow(["EQUIPMENT", "FAULT TYPE", "STAGE", "PICKUP (A)", "RATIO (*In)", "TMS/DELAY", "TIME (s)"])
-
-        def parse(txt: str, label: str):
-            curr = ""
-            for line in txt.split("\n"):
-                if ":" in line and "Load" in line:
-                    curr = line.split(":")[0]
-                elif "- S" in line:
-                    p = line.split(":")
-                    stage = p[0].strip("- ")
-                    details = p[1].split(",")
-                    pick_raw = details[0].split("=")[1].strip()
-                    val = pick_raw.split("(")[0].strip()
-                    rat = pick_raw.split("(")[1].replace("*In)", "").strip()
-                    tms = details[1].split("=")[1].strip()
-                    op = details[2].split("=")[1].strip() if len(details) > 2 else "0.0s"
-                    writer.writerow([curr, label, stage, val, rat, tms, op.replace("s", "")])
-
-        parse(last["oc_report"], "Overcurrent")
-        parse(last["ef_report"], "Earth Fault")
-        return out.getvalue().encode("utf-8")
-
-    cexp1, cexp2 = st.columns(2)
+    cexp1, cexp2, cexp3 = st.columns(3)
     with cexp1:
         st.download_button(
             "Save Tabulated CSV",
-            data=build_tabulated_csv_bytes(),
+            data=settings_csv_bytes(last),
             file_name="NEA_Grid_Tabulated.csv",
             mime="text/csv",
             use_container_width=True,
         )
     with cexp2:
-        combined = last["oc_report"] + "\n\n" + last["ef_report"]
-        pdf_bytes = text_to_pdf_bytes("NEA Grid Coordination Report", combined)
+        pdf_bytes = st.session_state.grid["pdf_bytes"]
         st.download_button(
-            "Save PDF",
-            data=pdf_bytes,
+            "Save PDF" if pdf_bytes is not None else "Preparing PDF...",
+            data=pdf_bytes or b"",
             file_name="NEA_Grid_Report.pdf",
             mime="application/pdf",
+            disabled=pdf_bytes is None,
+            use_container_width=True,
+        )
+    with cexp3:
+        st.download_button(
+            "Export Settings (NPZ)",
+            data=npz_bytes({"settings": grid_settings_table(last)}),
+            file_name="NEA_Grid_Settings.npz",
+            mime="application/octet-stream",
             use_container_width=True,
         )
 
+    if st.session_state.grid["last_cts"] is not None:
+        with st.expander("Snap to Device Settings"):
+            device = st.selectbox("Relay model", list(DEVICES), index=list(DEVICES).index(DEFAULT_DEVICE))
+            cts, cti_ms = st.session_state.grid["last_cts"]
+            snapped = snap_grid_settings(last, cts, cti_ms, device)
+            if snapped["clamped"]:
+                st.warning(
+                    "Outside device range (clamped): "
+                    + ", ".join(f"{eq} {ft} {stage}" for eq, ft, stage in snapped["clamped"])
+                )
+            for ft, down, up, margin, cti_s, ok in snapped["checks"]:
+                msg = f"{ft}: {down} -> {up} margin {margin:.3f}s (CTI {cti_s:.3f}s)"
+                if ok:
+                    st.success(msg)
+                else:
+                    st.error(msg)
+            st.dataframe(
+                pd.DataFrame(
+                    snapped["settings"],
+                    columns=["EQUIPMENT", "FAULT TYPE", "STAGE", "PICKUP (A)", "RATIO (*In)", "TMS", "TIME (s)"],
+                ),
+                use_container_width=True,
+                hide_index=True,
+            )
+
 st.caption("By Protection and Automation Division, GOD")
+
+# Keep polling while background jobs are running.
+pending = [get_runner().get(st.session_state.grid[k]) for k in ("calc_job", "pdf_job")]
+if any(j is not None and not j.finished for j in pending):
+    time.sleep(JOB_POLL_S)
+    st.rerun()
@@ -0,0 +1,75 @@
+"""Tests for the declarative coordination rules (engine.coordination_rules)."""
+
+import math
+
+import numpy as np
+import pytest
+
+from engine.coordination_rules import (
+    DEFAULT_RULES, PairRule, RuleSet, TimeLimit, compile_rules, evaluate, rules_from_dict, rules_to_dict, validate_cti,
+)
+
+
+def test_default_rules_are_the_original_checks():
+    assert DEFAULT_RULES.checks() == [
+        ("Q1", "Q4", 0.150), ("Q2", "Q4", 0.150), ("Q3", "Q4", 0.150),
+        ("Q1", "Q5", 0.300), ("Q2", "Q5", 0.300), ("Q3", "Q5", 0.300),
+        ("Q4", "Q5", 0.150),
+    ]
+
+
+def test_validate_cti_minimum():
+    ok, msg = validate_cti(119.9)
+    assert not ok and msg == "CTI must be greater than or equal to 120ms."
+    assert validate_cti(120) == (True, None)
+
+
+def test_rules_from_dict_pair_forms():
+    rules = rules_from_dict({
+        "cti": {"feeder-incomer": 0.2},
+        "pairs": [
+            ["Q1", "Q4", "feeder-incomer"],
+            ["Q2", "Q4", 0.25],
+            {"downstream": "Q4", "upstream": "Q5", "cti": 0.3},
+            {"downstream": "Q3", "upstream": "Q4", "type": "feeder-incomer"},
+        ],
+        "time_limits": [{"relays": ["Q4", "Q5"], "max_time": 1.0, "label": "clearing"}],
+        "min_cti_ms": 100,
+    })
+    assert rules.checks() == [("Q1", "Q4", 0.2), ("Q2", "Q4", 0.25), ("Q4", "Q5", 0.3), ("Q3", "Q4", 0.2)]
+    assert rules.time_limits == (TimeLimit(("Q4", "Q5"), None, 1.0, "clearing"),)
+    assert validate_cti(110, rules) == (True, None)
+    assert rules_from_dict(rules_to_dict(rules)) == rules
+
+
+def test_rules_from_dict_rejects_pair_type_without_cti():
+    with pytest.raises(ValueError, match="No CTI for pair type 'feeder-hv'"):
+        rules_from_dict({"cti": {"feeder-incomer": 0.15}, "pairs": [["Q1", "Q5", "feeder-hv"]]})
+
+
+def test_evaluate_nan_pairs_are_not_evaluated():
+    compiled = compile_rules(DEFAULT_RULES, ("Q1", "Q2", "Q3", "Q4", "Q5"))
+    ev = evaluate(compiled, [[0.1, math.nan, 0.1, 0.25, 0.55], [0.1, 0.1, 0.1, 0.2, math.nan]])
+    pairs = list(compiled.pairs)
+    q2_q4, q4_q5, q1_q4 = pairs.index(("Q2", "Q4")), pairs.index(("Q4", "Q5")), pairs.index(("Q1", "Q4"))
+
+    assert not ev["evaluated"][0, q2_q4] and not ev["pair_ok"][0, q2_q4]
+    assert ev["ok"][0]                                   # not-evaluated pairs do not fail a result
+    assert not ev["evaluated"][1, q4_q5]
+    assert ev["evaluated"][1, q1_q4] and not ev["pair_ok"][1, q1_q4]
+    assert not ev["ok"][1]
+    np.testing.assert_allclose(ev["margin"][0, q1_q4], 0.15)
+
+
+def test_evaluate_max_time_on_a_relay_that_does_not_trip_fails():
+    rules = RuleSet(
+        pairs=(PairRule("Q1", "Q4", "x"),),
+        cti=(("x", 0.15),),
+        time_limits=(TimeLimit(("Q4",), max_time=1.0), TimeLimit(("Q1",), min_time=0.05)),
+    )
+    compiled = compile_rules(rules, ("Q1", "Q4"))
+    assert compiled.limit_labels == ("clearing time", "min time")
+
+    ev = evaluate(compiled, [[0.1, math.nan], [0.1, 0.9], [0.01, 1.2], [math.nan, 0.5]])
+    assert ev["limit_ok"].tolist() == [[False, True], [True, True], [False, False], [True, True]]
+    assert ev["ok"].tolist() == [False, True, False, True]
@@ -0,0 +1,47 @@
+"""Tests for the memory-mapped TCC curve store (engine.curve_store)."""
+
+import numpy as np
+import pytest
+
+from engine.curve_store import CurveStore
+
+CURRENTS = np.geomspace(10.0, 1e4, 16)
+
+
+def _curves(value):
+    return np.full((5, CURRENTS.size), value)
+
+
+def test_write_and_reopen(tmp_path):
+    store = CurveStore.create(str(tmp_path), 3, currents=CURRENTS)
+    i = store.append(_curves(1.0), [0.1, 0.2, np.nan, 0.4, 0.5], 5000.0, "Substation A")
+    store.flush()
+
+    ro = CurveStore.open(str(tmp_path))
+    assert len(ro) == 1 and ro.find("Substation A") == i
+    assert ro.fault_used[i] == 5000.0
+    np.testing.assert_array_equal(ro.scenario(i), _curves(1.0))
+    with pytest.raises(PermissionError):
+        ro.write(1, _curves(2.0))
+
+
+def test_long_labels_are_rejected_or_sized(tmp_path):
+    store = CurveStore.create(str(tmp_path / "a"), 2, currents=CURRENTS)
+    with pytest.raises(ValueError):
+        store.append(_curves(1.0), label="x" * 65)
+    assert len(store) == 0
+
+    label = "Substation " + "y" * 100
+    store = CurveStore.create(str(tmp_path / "b"), 2, currents=CURRENTS, label_length=128)
+    i = store.append(_curves(1.0), label=label)
+    assert store.find(label) == i
+    assert CurveStore.open(str(tmp_path / "b")).label_length == 128
+
+
+def test_overwrite_without_trip_times_clears_them(tmp_path):
+    store = CurveStore.create(str(tmp_path), 1, currents=CURRENTS)
+    store.write(0, _curves(1.0), [0.1] * 5, 5000.0, "old")
+    store.write(0, _curves(2.0), label="new")
+    assert np.isnan(store.trip_times[0]).all()
+    assert np.isnan(store.fault_used[0])
+    assert store.find("new") == 0
@@ -0,0 +1,51 @@
+"""Tests for device snapping of grid settings (engine.devices)."""
+
+import pytest
+
+from engine.devices import grid_cts, grid_parallel_cts, snap_grid_settings
+from engine.grid_engine import calculate_grid, calculate_grid_parallel
+
+FEEDERS = [{"load": 200.0, "ct": 400.0}, {"load": 250.0, "ct": 400.0}, {"load": 300.0, "ct": 400.0}]
+TX = {"mva": 16.6, "z_pct": 10.0, "q4_ct": 900.0, "q5_ct": 300.0}
+
+
+def test_out_of_range_dt_time_is_flagged():
+    result = calculate_grid(16.6, 33.0, 11.0, 10.0, 150.0, 900.0, 300.0, FEEDERS)
+    cts = grid_cts(FEEDERS, 900.0, 300.0)
+    clamped = snap_grid_settings(result, cts, 150.0, "Generic Electromechanical")["clamped"]
+    assert not [c for c in clamped if c[1] == "OC" and c[2].endswith("(DT)")]   # EF DT pickups are below 1 xIn
+
+    result = calculate_grid(16.6, 33.0, 11.0, 10.0, 2000.0, 900.0, 300.0, FEEDERS)   # Q5 DT at 4.0 s > 3.0 s
+    snapped = snap_grid_settings(result, cts, 2000.0, "Generic Electromechanical")
+    assert ("HV SIDE Q5 (HV)", "OC", "S2 (DT)") in snapped["clamped"]
+    assert ("INCOMER Q4 (LV)", "OC", "S2 (DT)") not in snapped["clamped"]
+    q5_dt = next(r for r in snapped["settings"] if r[:3] == ("HV SIDE Q5 (HV)", "OC", "S2 (DT)"))
+    assert q5_dt[6] == 3.0
+
+
+def test_parallel_with_one_transformer_snaps_like_single():
+    single = snap_grid_settings(
+        calculate_grid(16.6, 33.0, 11.0, 10.0, 150.0, 900.0, 300.0, FEEDERS), grid_cts(FEEDERS, 900.0, 300.0), 150.0
+    )
+    par = snap_grid_settings(
+        calculate_grid_parallel([TX], 33.0, 11.0, 150.0, FEEDERS), grid_parallel_cts(FEEDERS, [TX]), 150.0
+    )
+    rename = {"INCOMER T1 (LV)": "INCOMER Q4 (LV)", "HV SIDE T1 (HV)": "HV SIDE Q5 (HV)"}
+    assert [(ft, rename.get(d, d), rename.get(u, u), m, c, ok) for ft, d, u, m, c, ok in par["checks"]] == single["checks"]
+    assert sorted((rename.get(r[0], r[0]),) + r[1:] for r in par["settings"]) == sorted(single["settings"])
+
+
+def test_parallel_with_coupler_grades_every_transformer():
+    transformers = [dict(TX, section="A"), dict(TX, mva=10.0, z_pct=8.0, q4_ct=600.0, q5_ct=200.0, section="B")]
+    result = calculate_grid_parallel(transformers, 33.0, 11.0, 150.0, FEEDERS, coupler_ct=800.0)
+    snapped = snap_grid_settings(result, grid_parallel_cts(FEEDERS, transformers, 800.0), 150.0)
+    pairs = [(d, u) for ft, d, u, *_ in snapped["checks"] if ft == "OC"]
+    assert pairs == [
+        ("FEEDERS (slowest)", "BUS COUPLER"),
+        ("BUS COUPLER", "INCOMER T1 (LV)"),
+        ("BUS COUPLER", "INCOMER T2 (LV)"),
+        ("INCOMER T1 (LV)", "HV SIDE T1 (HV)"),
+        ("INCOMER T2 (LV)", "HV SIDE T2 (HV)"),
+    ]
+    assert all(c == pytest.approx(0.15) for *_, c, _ in snapped["checks"])
+    assert not any(eq == "BUS COUPLER" for eq, *_ in snapped["clamped"])
@@ -0,0 +1,77 @@
+"""Tests for the directional ring coordination (engine.directional)."""
+
+import math
+
+import numpy as np
+import pytest
+
+from engine.directional import (
+    fault_positions,
+    grade_ring,
+    relay_names,
+    ring_coordination,
+    ring_fault_currents,
+    source_impedance,
+)
+
+LV_KV, SOURCE_ISC = 11.0, 8000.0
+RING = [1.0, 2.0, 3.0]          # section i joins bus i to bus i+1 (mod 3), ohms
+
+
+def test_fault_positions_are_ohms_clockwise_from_the_source():
+    p, section = fault_positions(RING, positions=(0.5,))
+    assert list(p) == [0.5, 2.0, 4.5]
+    assert list(section) == [0, 1, 2]
+    with pytest.raises(ValueError):
+        fault_positions([1.0])
+    with pytest.raises(ValueError):
+        fault_positions(RING, positions=(1.0,))
+
+
+def test_three_node_ring_split_and_flow_signs():
+    # mid-point of section 2 (bus 1 - bus 2): 2 ohm clockwise, 4 ohm counter-clockwise
+    f = ring_fault_currents(LV_KV, SOURCE_ISC, RING, [2.0], [1])
+    v_ph = LV_KV * 1000.0 / math.sqrt(3.0)
+    zs = source_impedance(LV_KV, SOURCE_ISC)
+    fault = v_ph / (zs + 2.0 * 4.0 / 6.0)
+    i_cw, i_ccw = fault * 4.0 / 6.0, fault * 2.0 / 6.0   # shares inverse to the path impedance
+
+    assert f["fault"][0] == pytest.approx(fault)
+    assert i_cw + i_ccw == pytest.approx(fault)
+    # relay_names order: CW 1..3, CCW 1..3
+    assert relay_names(3) == ["CW 1", "CW 2", "CW 3", "CCW 1", "CCW 2", "CCW 3"]
+    expected = {
+        "CW 1": (i_cw, +1, 0),     # bus 0 into section 1, on the clockwise path
+        "CW 2": (i_cw, +1, 0),     # bus 1 into the faulted section
+        "CW 3": (i_ccw, -1, 1),    # bus 2 looking at the source: the CCW share flows towards it
+        "CCW 1": (i_cw, -1, 0),    # bus 1 looking at the source: the CW share flows towards it
+        "CCW 2": (i_ccw, +1, 1),   # bus 2 into the faulted section
+        "CCW 3": (i_ccw, +1, 1),   # bus 0 into section 3, on the counter-clockwise path
+    }
+    for j, name in enumerate(relay_names(3)):
+        current, flow, path = expected[name]
+        assert f["current"][0, j] == pytest.approx(current), name
+        assert (f["flow"][0, j], f["path"][0, j]) == (flow, path), name
+        # once the other path's primary opens the whole fault comes over this path
+        z_path = 2.0 if path == 0 else 4.0
+        assert f["current_open"][0, j] == pytest.approx(v_ph / (zs + z_path)), name
+
+
+def test_forward_relays_block_reverse_flow():
+    relays = [{"idmt_on": True, "pickup": 100.0, "tms": 0.1, "direction": "forward"} for _ in range(6)]
+    res = ring_coordination(LV_KV, SOURCE_ISC, RING, relays, 150.0)
+    f = ring_fault_currents(LV_KV, SOURCE_ISC, RING, res["p"], res["section"])
+    assert np.isnan(res["trip_times"][f["flow"] < 0]).all()
+    # near the source one path's share stays below pickup; everything else forward trips
+    assert not np.isnan(res["trip_times"][(f["flow"] > 0) & (f["current"] > 100.0)]).any()
+
+
+def test_graded_ring_discriminates_everywhere():
+    relays = grade_ring(LV_KV, SOURCE_ISC, RING, [200.0] * 6, 150.0)
+    tms = [r["tms"] for r in relays]
+    # each chain rises from min_tms at its far end towards the source
+    assert tms[2] == tms[3] == 0.025
+    assert tms[0] > tms[1] > tms[2] and tms[5] > tms[4] > tms[3]
+    res = ring_coordination(LV_KV, SOURCE_ISC, RING, relays, 150.0)
+    assert res["ok"].all()
+    assert (res["margin"][~np.isnan(res["margin"])] >= 0.15 - 1e-9).all()
@@ -0,0 +1,133 @@
+"""Tests for the time-domain (dynamic) relay model (engine.tcc_engine)."""
+
+import copy
+import math
+import random
+
+import numpy as np
+import pytest
+
+from engine.golden import _DEFAULT_RELAYS
+from engine.tcc_engine import (
+    IEC_CURVES,
+    RESET_MODES,
+    compute_tcc_plot,
+    dt_timer,
+    dynamic_trip_times,
+    idmt_integrate,
+    iec_curve,
+)
+
+DT = 0.001
+
+
+def _idmt_reference(I, dt, pickup, tms, k, alpha, reset, reset_time):
+    """Step-by-step integrator: the scalar model the array version must reproduce."""
+    acc = 0.0
+    for n, i in enumerate(I):
+        if i > pickup:
+            rate = ((i / pickup) ** alpha - 1.0) / (tms * k)
+            if acc + rate * dt >= 1.0:
+                return n * dt + (1.0 - acc) / rate
+            acc += rate * dt
+        elif reset == "instantaneous":
+            acc = 0.0
+        elif reset == "definite":
+            acc = max(0.0, acc - dt / reset_time)
+        elif i < pickup:
+            acc = max(0.0, acc - dt * (1.0 - (i / pickup) ** 2) / (tms * reset_time))
+    return math.nan
+
+
+def _dt_reference(I, dt, pickup, delay):
+    elapsed = 0.0
+    for n, i in enumerate(I):
+        if i < pickup:
+            elapsed = 0.0
+        elif elapsed + dt >= delay:
+            return n * dt + max(delay - elapsed, 0.0)
+        else:
+            elapsed += dt
+    return math.nan
+
+
+@pytest.mark.parametrize("curve", sorted(IEC_CURVES))
+def test_constant_current_reproduces_iec_curve(curve):
+    rng = random.Random(curve)
+    k, alpha = IEC_CURVES[curve]
+    for _ in range(20):
+        pickup, tms = rng.uniform(50.0, 1000.0), rng.uniform(0.02, 1.0)
+        current = pickup * rng.uniform(1.5, 20.0)
+        expected = iec_curve(current, pickup, tms, curve)
+        steps = int(expected / DT) + 10
+        trip, _ = idmt_integrate(np.full(steps, current), DT, pickup, tms, k, alpha)
+        assert abs(float(trip) - expected) <= DT
+
+
+def test_below_pickup_never_trips():
+    trip, acc = idmt_integrate(np.full(1000, 100.0), DT, 100.0, 0.1, 0.14, 0.02)
+    assert math.isnan(float(trip)) and float(acc) == 0.0
+
+
+# fault, dip below pickup, fault again; the dip depth decides the inverse reset rate
+PROFILES = [
+    [2000.0] * 200 + [100.0] * 60 + [2000.0] * 400,
+    [2000.0] * 300 + [0.0] * 20 + [1500.0] * 800,
+    [900.0] * 500 + [250.0] * 150 + [900.0] * 1500,
+]
+
+
+@pytest.mark.parametrize("reset", RESET_MODES)
+@pytest.mark.parametrize("profile", range(len(PROFILES)))
+def test_reset_modes_match_scalar_reference(reset, profile):
+    I = np.array(PROFILES[profile])
+    k, alpha = IEC_CURVES["Standard Inverse"]
+    for pickup, tms, reset_time in [(275.0, 0.1, 0.2), (275.0, 0.05, 0.05), (600.0, 0.2, 1.0)]:
+        trip, _ = idmt_integrate(I, DT, pickup, tms, k, alpha, reset=reset, reset_time=reset_time)
+        expected = _idmt_reference(I, DT, pickup, tms, k, alpha, reset, reset_time)
+        if math.isnan(expected):
+            assert math.isnan(float(trip))
+        else:
+            assert float(trip) == pytest.approx(expected, abs=1e-9)
+
+
+def test_reset_modes_order_the_trip_times():
+    # any memory of the first fault makes the relay trip sooner than an instantaneous reset
+    I = np.array(PROFILES[0])
+    k, alpha = IEC_CURVES["Standard Inverse"]
+    trips = [float(idmt_integrate(I, DT, 275.0, 0.1, k, alpha, reset=r, reset_time=0.2)[0]) for r in RESET_MODES]
+    assert trips[0] > trips[1] and trips[0] >= trips[2]
+
+
+def test_unknown_reset_mode_raises():
+    with pytest.raises(ValueError):
+        idmt_integrate(np.ones(3), DT, 1.0, 0.1, 0.14, 0.02, reset="slow")
+
+
+def test_dt_timer_matches_scalar_reference():
+    I = np.array(PROFILES[0])
+    for pickup, delay in [(600.0, 0.15), (600.0, 0.25), (1500.0, 0.0), (3000.0, 0.1)]:
+        trip, _ = dt_timer(I, DT, True, pickup, delay)
+        expected = _dt_reference(I, DT, pickup, delay)
+        if math.isnan(expected):
+            assert math.isnan(float(trip))
+        else:
+            assert float(trip) == pytest.approx(expected, abs=1e-9)
+    assert math.isnan(float(dt_timer(I, DT, False, 600.0, 0.15)[0]))
+
+
+def test_constant_profile_matches_tcc_plot():
+    rng = random.Random(2)
+    for _ in range(10):
+        relays = copy.deepcopy(_DEFAULT_RELAYS)
+        for r in relays:
+            r["tms"] = round(rng.uniform(0.02, 0.3), 3)
+        fault = rng.uniform(1000.0, 8000.0)
+        _, _, trip_times, *_ = compute_tcc_plot(16.6, 11.0, 33.0, 10.0, fault, relays)
+        trips, _ = dynamic_trip_times(np.full(5000, fault), DT, relays, hv_factor=3.0)
+        for i, t in enumerate(trips[0]):
+            name = f"Q{i+1}"
+            if name in trip_times:
+                assert abs(float(t) - trip_times[name]) <= DT + 0.0005
+            else:
+                assert math.isnan(float(t)) or float(t) > 5000 * DT
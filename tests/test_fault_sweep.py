@@ -0,0 +1,74 @@
+"""Tests for the fault sweep along feeders (engine.fault_sweep)."""
+
+import copy
+import math
+import random
+
+import pytest
+
+from engine.coordination_rules import DEFAULT_RULES
+from engine.fault_sweep import tcc_fault_sweep
+from engine.golden import _DEFAULT_RELAYS
+from engine.tcc_engine import compute_tcc_plot
+
+SYSTEM = (16.6, 11.0, 33.0, 10.0)
+CABLES = [
+    {"r_ohm_km": 0.5, "x_ohm_km": 0.4, "length_km": 50.0},   # long enough for Q1 to run out of reach
+    {"r_ohm_km": 0.16, "x_ohm_km": 0.1, "length_km": 2.0},
+    {"r_ohm_km": 0.3, "x_ohm_km": 0.2, "length_km": 5.0},
+]
+
+
+def test_end_of_line_current_by_hand():
+    # Xs = Z% * kV^2 / MVA = 0.1 * 121 / 16.6 = 0.72892 ohm
+    # |Z| = |0.32 + j(0.72892 + 0.2)| = 0.98244 ohm, V_ph = 11000 / sqrt(3) = 6350.85 V
+    res = tcc_fault_sweep(*SYSTEM, _DEFAULT_RELAYS, CABLES)
+    assert res["current"][1, -1] == pytest.approx(6464.05, abs=0.01)
+    assert res["x"][1, -1] == 2.0
+    assert res["current"][1, 0] == pytest.approx(16600.0 / (math.sqrt(3.0) * 11.0) / 0.1)   # bus fault
+
+
+def _relays(seed):
+    """Default settings, or IDMT-only with random TMS so the worst point moves along the cable."""
+    relays = copy.deepcopy(_DEFAULT_RELAYS)
+    if seed is not None:
+        rng = random.Random(seed)
+        for r in relays:
+            r.update(dt1_on=False, dt2_on=False, tms=round(rng.uniform(0.02, 0.3), 3))
+    return relays
+
+
+@pytest.mark.parametrize("seed", [None, 0, 1, 2, 4, 5])
+def test_reach_and_worst_margin_follow_the_tcc_report(seed):
+    points = 200
+    relays = _relays(seed)
+    res = tcc_fault_sweep(*SYSTEM, relays, CABLES, points=points)
+    cti = dict(zip(res["pairs"], res["cti"]))
+
+    for j, feeder in enumerate(("Q1", "Q2", "Q3")):
+        carrying = {feeder, "Q4", "Q5"}
+        best, reach, gap = None, 0.0, False
+        for p in range(points):
+            trip_times = compute_tcc_plot(*SYSTEM, float(res["current"][j, p]), relays)[2]
+            gap = gap or feeder not in trip_times
+            if not gap:
+                reach = float(res["x"][j, p])
+            for d, u in res["pairs"]:
+                if not {d, u} <= carrying or d not in trip_times or u not in trip_times:
+                    continue
+                margin = trip_times[u] - trip_times[d]
+                if best is None or margin - cti[(d, u)] < best[0] - 1e-12:
+                    best = (margin - cti[(d, u)], (d, u), p, margin)
+        assert res["reach_km"][j] == pytest.approx(reach)
+        w = res["worst"][j]
+        assert (w["pair"], w["x_km"]) == (best[1], res["x"][j, best[2]])
+        assert w["margin"] == pytest.approx(best[3], abs=1e-9)
+        assert w["ok"] == (best[0] >= -1e-9 and reach == res["x"][j, -1])
+
+    assert res["reach_km"][0] < CABLES[0]["length_km"]       # Q1 stops tripping before the cable end
+    assert list(res["reach_km"][1:]) == [2.0, 5.0]
+
+
+def test_tcc_sweep_rejects_more_than_three_cables():
+    with pytest.raises(ValueError):
+        tcc_fault_sweep(*SYSTEM, _DEFAULT_RELAYS, CABLES + CABLES[:1], rules=DEFAULT_RULES)
@@ -0,0 +1,40 @@
+"""Golden-corpus parity gate for the engines (engine.golden)."""
+
+import os
+
+from engine.golden import FIELD_RULES, check, generate, load_corpus
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "golden_corpus.npz")
+
+
+def _failures(result: dict) -> dict:
+    return {name: (r["bad"].tolist(), r["tie"].tolist()) for name, r in result["fields"].items()
+            if r["bad"].size or r["tie"].size}
+
+
+def test_engines_match_committed_corpus():
+    result = check(CORPUS)
+    assert result["tcc_cases"] > 60 and result["grid_cases"] > 60
+    assert _failures(result) == {}
+
+
+def test_generate_then_check_is_clean(tmp_path):
+    path = str(tmp_path / "golden.npz")
+    info = generate(path, n=300, seed=11)
+    assert info["tcc_cases"] == 303 and info["grid_cases"] == 301
+    meta, data = load_corpus(path)
+    assert meta["seed"] == 11 and set(FIELD_RULES) <= set(data)
+    assert _failures(check(path)) == {}
+
+
+def test_check_catches_a_changed_engine(tmp_path):
+    from engine.tcc_engine import compute_tcc_plot
+
+    def slower_q5(*args):
+        currents, curves, trip_times, flc, isc, fault = compute_tcc_plot(*args)
+        trip_times = {k: (round(v + 0.01, 3) if k == "Q5" else v) for k, v in trip_times.items()}
+        return currents, curves, trip_times, flc, isc, fault
+
+    failures = _failures(check(CORPUS, {"tcc": slower_q5}))
+    assert failures["tcc_trip"][0] and failures["tcc_report"][0]
+    assert not any(name.startswith(("grid", "ocef")) for name in failures)
@@ -0,0 +1,36 @@
+"""Tests for the OC/EF grid engine (engine.grid_engine)."""
+
+import random
+
+import pytest
+
+from engine.grid_engine import calculate_grid, calculate_grid_parallel
+
+
+def _single_names(row):
+    eq = row[0].replace("T1 (LV)", "Q4 (LV)").replace("T1 (HV)", "Q5 (HV)")
+    return (eq,) + tuple(row[1:])
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_parallel_with_one_transformer_matches_calculate_grid(seed):
+    rng = random.Random(seed)
+    mva = round(rng.uniform(0.5, 60.0), rng.choice([0, 1, 2, 3]))
+    hv_kv, lv_kv = rng.choice([(33.0, 11.0), (11.0, 0.4), (132.0, 33.0), (66.0, 6.6)])
+    z_pct = round(rng.uniform(4.0, 15.0), rng.choice([1, 2]))
+    cti_ms = rng.choice([150.0, 200.0, 300.0, rng.uniform(100.0, 400.0)])
+    q4_ct = rng.choice([0.0, 900.0, rng.uniform(1.0, 3000.0)])
+    q5_ct = rng.choice([0.0, 300.0, rng.uniform(1.0, 1000.0)])
+    feeders = [
+        {"load": round(rng.uniform(10.0, 600.0), rng.choice([0, 1, 2, 3])), "ct": rng.choice([0.0, 400.0, rng.uniform(1.0, 800.0)])}
+        for _ in range(rng.randint(1, 6))
+    ]
+
+    single = calculate_grid(mva, hv_kv, lv_kv, z_pct, cti_ms, q4_ct, q5_ct, feeders)
+    par = calculate_grid_parallel(
+        [{"mva": mva, "z_pct": z_pct, "q4_ct": q4_ct, "q5_ct": q5_ct}], hv_kv, lv_kv, cti_ms, feeders
+    )
+
+    assert (par["flc_lv"], par["isc_lv"], par["if_lv"]) == (single["flc_lv"], single["isc_lv"], single["if_lv"])
+    assert par["if_hv"] == [single["if_hv"]]
+    assert sorted(map(_single_names, par["settings"]), key=repr) == sorted(single["settings"], key=repr)
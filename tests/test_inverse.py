@@ -0,0 +1,41 @@
+"""Tests for the inverse IEC curve solver (engine.inverse)."""
+
+import numpy as np
+import pytest
+
+from engine.inverse import regrade, solve_pickup, solve_tms
+from engine.tcc_engine import iec_curve
+
+
+def test_regrade_clamped_out_of_reach_is_infeasible():
+    out = regrade(10.0, 5000, 500, tms_range=(0.01, 1.0, 0.01))
+    assert out["tms"] == 1.0
+    assert out["t"] == pytest.approx(2.97, abs=0.01)
+    assert bool(out["clamped"]) and not bool(out["feasible"])
+
+
+def test_regrade_within_range_is_feasible():
+    out = regrade([0.3, 0.6], 5000, 500, tms_range=(0.01, 1.0, 0.01))
+    assert not out["clamped"].any() and out["feasible"].all()
+    assert (out["t"] >= [0.3, 0.6]).all()
+
+
+def test_regrade_clamped_within_one_step_is_feasible():
+    t_unit = iec_curve(5000.0, 500.0, 1.0, "Standard Inverse")
+    out = regrade(1.004 * t_unit, 5000, 500, tms_range=(0.01, 1.0, 0.01))
+    assert bool(out["clamped"]) and bool(out["feasible"])
+
+
+def test_solve_pickup_round_trip():
+    tms = 0.1
+    ip = solve_pickup(0.5, 4000.0, tms)["pickup"]
+    assert solve_tms(0.5, 4000.0, ip) == pytest.approx(tms)
+
+
+def test_solve_pickup_snaps_and_clamps():
+    out = solve_pickup([0.5, 0.5, 0.01], [4000.0, 100000.0, 4000.0], 0.1, pickup_range=(100.0, 2000.0, 50.0))
+    raw = solve_pickup([0.5, 0.5, 0.01], [4000.0, 100000.0, 4000.0], 0.1)["pickup"]
+    assert out["clamped"].tolist() == [False, True, True]
+    assert out["pickup"][0] >= raw[0] and (out["pickup"][0] - 100.0) % 50.0 == pytest.approx(0.0)
+    assert out["pickup"][1:].tolist() == [2000.0, 100.0]
+    assert np.isnan(solve_pickup(0.0, 4000.0, 0.1, pickup_range=(100.0, 2000.0, 50.0))["pickup"])
@@ -0,0 +1,52 @@
+"""Tests for the Monte Carlo coordination robustness analysis (engine.monte_carlo)."""
+
+import copy
+import random
+
+import pytest
+
+from engine.golden import _DEFAULT_RELAYS
+from engine.inverse import solve_tms
+from engine.monte_carlo import coordination_robustness
+from engine.tcc_engine import build_coordination_report, compute_tcc_plot
+
+NO_TOLERANCE = dict(ct_error=0.0, tms_tolerance=0.0, dt_tolerance=0.0, fault_uncertainty=0.0)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_zero_tolerance_matches_coordination_report(seed):
+    rng = random.Random(seed)
+    relays = copy.deepcopy(_DEFAULT_RELAYS)
+    for r in relays:
+        r.update(dt1_on=False, dt2_on=False, tms=round(rng.uniform(0.02, 0.3), 3))
+    fault = rng.uniform(2000.0, 8000.0)
+    # put Q4 within half a millisecond of its CTI above Q1, where rounding decides
+    _, _, trip_times, *_ = compute_tcc_plot(16.6, 11.0, 33.0, 10.0, fault, relays)
+    target = trip_times["Q1"] + 0.15 + rng.uniform(-0.0005, 0.0005)
+    relays[3]["tms"] = float(solve_tms(target, fault, relays[3]["pickup"]))
+
+    _, _, trip_times, flc_lv, isc_lv, fault_used = compute_tcc_plot(16.6, 11.0, 33.0, 10.0, fault, relays)
+    _, results = build_coordination_report(trip_times, flc_lv, isc_lv, fault_used)
+    report_ok = {(d, u): ok for d, u, _, _, ok in results}
+
+    mc = coordination_robustness(16.6, 11.0, 33.0, 10.0, fault, relays, n_samples=4, seed=seed, **NO_TOLERANCE)
+    for p in mc["pairs"]:
+        if (p["downstream"], p["upstream"]) in report_ok:
+            assert p["p_violation"] == (0.0 if report_ok[p["downstream"], p["upstream"]] else 1.0)
+
+
+def test_ms_ties_round_like_the_report():
+    # 12.5 ms rounds to 13 ms in the report (np.round gives 12 ms): Q1->Q4 grades 0.149 s
+    relays = copy.deepcopy(_DEFAULT_RELAYS)
+    for r in relays:
+        r.update(idmt_on=False, dt2_on=False)
+    relays[0]["dt1_time"], relays[3]["dt1_time"] = 0.0125, 0.162
+
+    _, _, trip_times, flc_lv, isc_lv, fault_used = compute_tcc_plot(16.6, 11.0, 33.0, 10.0, 5000.0, relays)
+    _, results = build_coordination_report(trip_times, flc_lv, isc_lv, fault_used)
+    assert ("Q1", "Q4", 0.149, 0.15, False) in results
+
+    mc = coordination_robustness(16.6, 11.0, 33.0, 10.0, 5000.0, relays, n_samples=4, seed=0, **NO_TOLERANCE)
+    q1_q4 = next(p for p in mc["pairs"] if (p["downstream"], p["upstream"]) == ("Q1", "Q4"))
+    assert q1_q4["p_violation"] == 1.0
+    assert q1_q4["margin_min"] == pytest.approx(0.149)
@@ -0,0 +1,46 @@
+"""Tests for the coordination sensitivity analysis (engine.sensitivity)."""
+
+import copy
+import random
+
+import pytest
+
+from engine.golden import _DEFAULT_RELAYS
+from engine.inverse import solve_tms
+from engine.sensitivity import coordination_sensitivity, what_to_change
+from engine.tcc_engine import build_coordination_report, compute_tcc_plot
+
+
+def _idmt_only(seed):
+    rng = random.Random(seed)
+    relays = copy.deepcopy(_DEFAULT_RELAYS)
+    for r in relays:
+        r.update(dt1_on=False, dt2_on=False, tms=round(rng.uniform(0.02, 0.3), 3))
+    return relays, rng.uniform(2000.0, 8000.0), rng
+
+
+def test_tms_gradient_matches_finite_difference():
+    relays, fault, _ = _idmt_only(3)
+    sens = coordination_sensitivity(16.6, 11.0, 33.0, 10.0, fault, relays)
+    bumped = copy.deepcopy(relays)
+    bumped[3]["tms"] += 1e-6
+    t1 = coordination_sensitivity(16.6, 11.0, 33.0, 10.0, fault, bumped)["relays"]["Q4"]["t"]
+    assert (t1 - sens["relays"]["Q4"]["t"]) / 1e-6 == pytest.approx(sens["relays"]["Q4"]["d_tms"], rel=1e-5)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_margins_and_hints_follow_the_report(seed):
+    relays, fault, rng = _idmt_only(seed)
+    # put Q4 within half a millisecond of its CTI above Q1, where rounding decides
+    _, _, trip_times, *_ = compute_tcc_plot(16.6, 11.0, 33.0, 10.0, fault, relays)
+    relays[3]["tms"] = float(solve_tms(trip_times["Q1"] + 0.15 + rng.uniform(-0.0005, 0.0005), fault, relays[3]["pickup"]))
+
+    _, _, trip_times, flc, isc, fault_used = compute_tcc_plot(16.6, 11.0, 33.0, 10.0, fault, relays)
+    _, results = build_coordination_report(trip_times, flc, isc, fault_used)
+    sens = coordination_sensitivity(16.6, 11.0, 33.0, 10.0, fault, relays)
+
+    margins = {(p["downstream"], p["upstream"]): p["margin"] for p in sens["pairs"]}
+    for d, u, margin, _, _ in results:
+        assert margins[d, u] == margin
+    hinted = {h.split(" ")[0] for h in what_to_change(sens, relays)}
+    assert hinted == {f"{d}->{u}" for d, u, _, _, ok in results if not ok}
@@ -0,0 +1,181 @@
+"""Integration tests for the local JSON calculation service (engine.service)."""
+
+import http.client
+import json
+import threading
+import time
+import uuid
+
+import pytest
+
+from engine import service
+from engine.service import CalcServer
+
+RELAYS = [
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 220.0, "tms": 0.025, "dt1_pickup": 600.0, "dt1_time": 0.0, "dt2_pickup": 0.0, "dt2_time": 0.0, "curve": "Standard Inverse"},
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 275.0, "tms": 0.025, "dt1_pickup": 750.0, "dt1_time": 0.0, "dt2_pickup": 0.0, "dt2_time": 0.0, "curve": "Standard Inverse"},
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 330.0, "tms": 0.025, "dt1_pickup": 900.0, "dt1_time": 0.0, "dt2_pickup": 0.0, "dt2_time": 0.0, "curve": "Standard Inverse"},
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 825.0, "tms": 0.07, "dt1_pickup": 2250.0, "dt1_time": 0.15, "dt2_pickup": 8000.0, "dt2_time": 0.0, "curve": "Standard Inverse"},
+    {"idmt_on": True, "dt1_on": True, "dt2_on": True, "pickup": 275.0, "tms": 0.12, "dt1_pickup": 750.0, "dt1_time": 0.3, "dt2_pickup": 2666.67, "dt2_time": 0.0, "curve": "Standard Inverse"},
+]
+TCC_BODY = {"mva": 16.6, "lv": 11.0, "hv": 33.0, "z": 10.0, "fault": 7900.0, "relays": RELAYS}
+GRID_BODY = {
+    "mva": 16.6, "hv_kv": 33.0, "lv_kv": 11.0, "z_pct": 10.0, "cti_ms": 150.0, "q4_ct": 900.0, "q5_ct": 300.0,
+    "feeders": [{"load": 200.0, "ct": 400.0}, {"load": 250.0, "ct": 400.0}, {"load": 300.0, "ct": 400.0}],
+}
+OCEF_BODY = {
+    "system": {"mva": 16.6, "hv_kv": 33.0, "lv_kv": 11.0, "z_pct": 10.0, "cti_ms": 150.0, "q4_ct": 900.0, "q5_ct": 300.0},
+    "feeders": [{"load_a": 200.0, "ct_a": 400.0}, {"load_a": 250.0, "ct_a": 400.0}],
+}
+
+
+@pytest.fixture
+def server():
+    srv = CalcServer(port=0, workers=4).start()
+    yield srv
+    srv.stop()
+
+
+def _conn(server) -> http.client.HTTPConnection:
+    host, port = server.server_address[:2]
+    return http.client.HTTPConnection(host, port, timeout=10)
+
+
+def _request(conn, method, path, body=None):
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    conn.request(method, path, body=data, headers={"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read())
+
+
+def _call(server, method, path, body=None):
+    conn = _conn(server)
+    try:
+        return _request(conn, method, path, body)
+    finally:
+        conn.close()
+
+
+def test_health(server):
+    status, out = _call(server, "GET", "/health")
+    assert status == 200
+    assert out["status"] == "ok"
+    assert out["studies"] == ["coordination", "grid", "ocef", "tcc"]
+    assert "coalesced" in out and "cache" in out
+
+
+def test_tcc(server):
+    status, out = _call(server, "POST", "/tcc", dict(TCC_BODY, include_curves=False))
+    assert status == 200
+    assert set(out["trip_times"]) == {"Q1", "Q2", "Q3", "Q4", "Q5"}
+    assert out["report"].startswith("Coordination Report")
+    assert {(r["downstream"], r["upstream"]) for r in out["results"]} >= {("Q1", "Q4"), ("Q4", "Q5")}
+    assert "curves" not in out
+
+
+def test_tcc_curves(server):
+    status, out = _call(server, "POST", "/tcc", TCC_BODY)
+    assert status == 200
+    assert len(out["curves"]) == 5
+    assert len(out["curves"][0]) == len(out["currents"])
+
+
+def test_coordination(server):
+    body = {"trip_times": {"Q1": 0.1, "Q4": 0.2, "Q5": 0.6}, "flc_lv": 871.3, "isc_lv": 8713.0, "fault": 5000.0}
+    status, out = _call(server, "POST", "/coordination", body)
+    assert status == 200
+    q1_q4 = next(r for r in out["results"] if (r["downstream"], r["upstream"]) == ("Q1", "Q4"))
+    assert q1_q4["margin"] == pytest.approx(0.1)
+    assert q1_q4["ok"] is False
+
+
+def test_grid(server):
+    status, out = _call(server, "POST", "/grid", GRID_BODY)
+    assert status == 200
+    assert out["flc_lv"] == 871.27
+    assert "INCOMER Q4 (LV)" in out["oc_report"]
+
+
+def test_ocef(server):
+    status, out = _call(server, "POST", "/ocef", OCEF_BODY)
+    assert status == 200
+    assert out["system"]["flc_lv"] == 871.27
+    assert "FEEDER Q2" in out["oc_report_text"]
+
+
+def test_batch(server):
+    studies = [
+        {"endpoint": "grid", "body": GRID_BODY},
+        {"endpoint": "ocef", "body": OCEF_BODY},
+        {"endpoint": "nope", "body": {}},
+    ]
+    status, out = _call(server, "POST", "/batch", {"studies": studies})
+    assert status == 200
+    assert [r["ok"] for r in out["results"]] == [True, True, False]
+    assert out["results"][0]["result"]["flc_lv"] == 871.27
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/batch", [{"endpoint": "grid", "body": GRID_BODY}]),
+    ("/batch", {"studies": {"endpoint": "grid"}}),
+    ("/grid", dict(GRID_BODY, feeders=None)),
+    ("/tcc", {"mva": 16.6}),
+    ("/ocef", dict(OCEF_BODY, feeders=[{"load_a": 200.0, "ct_a": 0.0}])),
+    ("/ocef", dict(OCEF_BODY, feeders=[{"load_a": 0.0, "ct_a": 400.0}])),
+    ("/grid", dict(GRID_BODY, feeders=[{"load": 0.0, "ct": 400.0}])),
+    ("/grid", dict(GRID_BODY, z_pct=0.0)),
+])
+def test_bad_requests_are_400(server, path, body):
+    status, out = _call(server, "POST", path, body)
+    assert status == 400
+    assert out["error"]
+
+
+def test_unknown_path_is_404(server):
+    assert _call(server, "POST", "/nope", {})[0] == 404
+    assert _call(server, "GET", "/nope")[0] == 404
+
+
+def test_keep_alive_reuses_connection(server):
+    conn = _conn(server)
+    try:
+        assert _request(conn, "GET", "/health")[0] == 200
+        sock = conn.sock
+        assert sock is not None
+        assert _request(conn, "POST", "/grid", GRID_BODY)[0] == 200
+        assert _request(conn, "POST", "/ocef", OCEF_BODY)[0] == 200
+        assert conn.sock is sock
+    finally:
+        conn.close()
+
+
+def test_inflight_requests_are_coalesced(server, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def slow_study(body):
+        calls.append(body)
+        release.wait(10)
+        return {"echo": body["nonce"]}
+
+    monkeypatch.setitem(service.STUDIES, "slow", slow_study)
+    body = {"nonce": uuid.uuid4().hex}   # unique, so the result cache cannot answer
+    results = []
+
+    def post():
+        results.append(_call(server, "POST", "/slow", body))
+
+    threads = [threading.Thread(target=post) for _ in range(3)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 10
+    while server.dispatcher.coalesced < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(10)
+
+    assert server.dispatcher.coalesced == 2
+    assert len(calls) == 1
+    assert results == [(200, {"echo": body["nonce"]})] * 3
+    assert _call(server, "GET", "/health")[1]["coalesced"] == 2
@@ -0,0 +1,66 @@
+"""Tests for the transformer through-fault damage check (engine.transformer_damage)."""
+
+import copy
+import math
+
+import numpy as np
+import pytest
+
+from engine.golden import _DEFAULT_RELAYS
+from engine.transformer_damage import (
+    ANSI_THERMAL_POINTS,
+    ansi_damage_time,
+    damage_check,
+    damage_report,
+    transformer_category,
+)
+
+
+def test_categories():
+    assert list(transformer_category([0.5, 0.6, 5.0, 16.6, 30.0, 31.0])) == [1, 2, 2, 3, 3, 4]
+
+
+@pytest.mark.parametrize("category", [1, 2, 3, 4])
+def test_ansi_thermal_curve_at_the_tabulated_points(category):
+    # Z = 4 % puts 1/Z at 25 pu, so every tabulated point is on the curve;
+    # infrequent faults: thermal curve only
+    for i_pu, t in ANSI_THERMAL_POINTS:
+        assert float(ansi_damage_time(i_pu, 4.0, category, frequent=False)) == pytest.approx(t, rel=1e-12)
+    # above 25 pu the curve continues as I^2t = 1250
+    assert float(ansi_damage_time(40.0, 2.0, category, frequent=False)) == pytest.approx(1250.0 / 40.0 ** 2)
+
+
+def test_ansi_curve_is_nan_off_the_current_range():
+    t = ansi_damage_time([1.99, 2.0, 10.0, 10.01], 10.0, 2)
+    assert math.isnan(t[0]) and math.isnan(t[3])
+    assert t[1] == pytest.approx(1800.0) and not math.isnan(t[2])
+
+
+@pytest.mark.parametrize("category, start_pu", [(2, 7.0), (3, 5.0), (4, 5.0)])
+def test_mechanical_segment_starts_at_70_or_50_percent_of_max_fault(category, start_pu):
+    z = 10.0                                    # 1/Z = 10 pu
+    below, at = ansi_damage_time([start_pu - 0.01, start_pu], z, category)
+    thermal_below, thermal_at = ansi_damage_time([start_pu - 0.01, start_pu], z, category, frequent=False)
+    assert below == thermal_below                        # still thermal just below the start
+    assert at == pytest.approx(2.0 * 10.0 ** 2 / start_pu ** 2)   # I^2t = 2 (1/Z)^2
+    assert at < thermal_at
+
+
+def test_category_one_has_no_mechanical_segment():
+    i_pu = np.linspace(2.0, 10.0, 50)
+    np.testing.assert_array_equal(ansi_damage_time(i_pu, 10.0, 1), ansi_damage_time(i_pu, 10.0, 1, frequent=False))
+
+
+def test_margin_is_none_when_q4_does_not_trip():
+    relays = copy.deepcopy(_DEFAULT_RELAYS)
+    relays[3].update(idmt_on=False, dt1_on=False, dt2_on=False)
+    check = damage_check(16.6, 11.0, 33.0, 10.0, relays)
+    q4, q5 = check["relays"]["Q4"], check["relays"]["Q5"]
+    assert q4["margin"] is None and q4["ok"] is False
+    assert q5["margin"] is not None and math.isfinite(q5["margin"])
+    assert "Q4: does not clear" in damage_report(check)
+
+
+def test_default_settings_clear_before_damage():
+    check = damage_check(16.6, 11.0, 33.0, 10.0, _DEFAULT_RELAYS)
+    assert all(r["ok"] and r["margin"] > 0 for r in check["relays"].values())
@@ -0,0 +1,74 @@
+"""Tests for the live what-if session (engine.whatif)."""
+
+import copy
+import random
+
+import numpy as np
+
+from engine.golden import _DEFAULT_RELAYS
+from engine.tcc_engine import build_coordination_report, compute_tcc_plot
+from engine.whatif import LIVE_BUDGET_MS, WhatIfSession
+
+SYSTEM = (16.6, 11.0, 33.0, 10.0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_overrides_match_compute_tcc_plot_bit_for_bit():
+    rng = random.Random(5)
+    fault = 5000.0
+    session = WhatIfSession(*SYSTEM, fault, _DEFAULT_RELAYS)
+    worst_ms = 0.0
+    for _ in range(300):
+        i = rng.randrange(5)
+        base = _DEFAULT_RELAYS[i]
+        session.set(i, tms=round(rng.uniform(0.01, 1.0), 3),
+                    pickup=round(rng.uniform(0.25, 4.0) * base["pickup"]))
+        res = session.evaluate()
+        worst_ms = max(worst_ms, res["elapsed_ms"])
+
+        relays = session.applied_relays()
+        _, curves, trip_times, flc, isc, fault_used = compute_tcc_plot(*SYSTEM, fault, copy.deepcopy(relays))
+        np.testing.assert_array_equal(res["curves"], np.asarray(curves, dtype=float))
+        assert res["trip_times"] == trip_times
+        report, results = build_coordination_report(trip_times, flc, isc, fault_used)
+        assert (res["report_text"], res["results"]) == (report, results)
+    assert worst_ms <= LIVE_BUDGET_MS
+
+
+def test_burst_of_changes_is_debounced():
+    clock = FakeClock()
+    session = WhatIfSession(*SYSTEM, 5000.0, _DEFAULT_RELAYS, debounce_s=0.125, clock=clock)
+    calls = []
+    evaluate = session.evaluate
+    session.evaluate = lambda: calls.append(clock.now) or evaluate()
+
+    assert session.poll() is not None            # first result straight away
+    for step in range(1, 31):                    # slider events every 1/64 s (exact in binary)
+        clock.now = step / 64
+        session.set(3, tms=0.07 + 0.001 * step)
+        session.poll()
+    assert calls == [0.0, 0.125, 0.25, 0.375] and session.pending
+
+    clock.now += 0.125
+    res = session.poll()                         # trailing poll picks up the last change
+    assert calls[-1] == 30 / 64 + 0.125 and len(calls) == 5
+    assert session.relay(3)["tms"] == 0.07 + 0.001 * 30 and res["changed"] == [3]
+    assert session.poll() is res and len(calls) == 5     # nothing pending: no recompute
+
+
+def test_reset_restores_the_baseline():
+    session = WhatIfSession(*SYSTEM, 5000.0, _DEFAULT_RELAYS)
+    baseline = session.evaluate()
+    session.set(0, pickup=300.0)
+    assert session.evaluate()["changed"] == [0]
+    session.reset()
+    res = session.evaluate()
+    np.testing.assert_array_equal(res["curves"], baseline["curves"])
+    assert res["trip_times"] == baseline["trip_times"] and res["changed"] == []